@@ -0,0 +1,99 @@
+"""
+Section-Parallel Articles
+Splits an outline into H2 sections for concurrent generation and stitches the results back together
+
+Each H2 section (with its H3 subsections) is written by its own LLM call that
+sees the whole outline, so the article's wall time is roughly its slowest
+section and a failed section can be retried alone. Stitching runs a local
+consistency pass: one H1, every section under its own ``##`` heading, stray
+H1s demoted and paragraphs repeated across sections dropped.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from content_plan import apportion
+
+# Smallest word target for a section, however many sections share the article
+MIN_SECTION_WORDS = 80
+
+_OUTLINE_LINE = re.compile(r'^(?:[-*\d.)\s]+)?(?:H([1-3])\s*[:.\-]|(#{1,3})\s)\s*(.+?)\s*$', re.I)
+_HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+_BLANK_RUN = re.compile(r'\n{3,}')
+
+
+@dataclass(slots=True)
+class OutlineSection:
+    """One H2 section of an outline and its H3 subsections"""
+    heading: str
+    subsections: List[str] = field(default_factory=list)
+    word_target: int = 0
+
+    def as_outline(self) -> str:
+        return '\n'.join([f"H2: {self.heading}"] + [f"  H3: {sub}" for sub in self.subsections])
+
+
+def parse_outline(outline: List[str]) -> Tuple[Optional[str], List[OutlineSection]]:
+    """(H1 title, H2 sections) from outline lines in "H2: ..." or markdown ``##`` form"""
+    title, sections = None, []
+    for line in outline:
+        match = _OUTLINE_LINE.match(line.strip())
+        if not match:
+            continue
+        level = int(match.group(1) or len(match.group(2)))
+        text = match.group(3).strip()
+        if level == 1 and title is None:
+            title = text
+        elif level == 2:
+            sections.append(OutlineSection(text))
+        elif level == 3 and sections:
+            sections[-1].subsections.append(text)
+    return title, sections
+
+
+def assign_word_targets(sections: List[OutlineSection], word_count: int) -> List[OutlineSection]:
+    """Split the article's word count across sections, weighted by their subsection count"""
+    weights = {str(i): 1.0 + 0.5 * len(section.subsections) for i, section in enumerate(sections)}
+    targets = apportion(word_count, weights)
+    for i, section in enumerate(sections):
+        section.word_target = max(MIN_SECTION_WORDS, targets.get(str(i), 0))
+    return sections
+
+
+def outline_plan(title: str, sections: List[OutlineSection]) -> str:
+    """The whole outline as shared context for every section call"""
+    return '\n'.join([f"H1: {title}"] + [section.as_outline() for section in sections])
+
+
+def _normalize_section(title: str, heading: str, text: str) -> str:
+    """Put a section under exactly one ``## heading`` and keep its inner headings below H2"""
+    lines = text.strip().split('\n')
+    # Drop the section's own heading (or the article title) if the model repeated it
+    repeated = {title.lower(), heading.lower()}
+    while lines and (_HEADING.sub(r'\2', lines[0]).strip().lower() in repeated or not lines[0].strip()):
+        lines = lines[1:]
+
+    body = []
+    for line in lines:
+        match = _HEADING.match(line)
+        if match and len(match.group(1)) <= 2:
+            # Stray H1/H2 inside a section becomes a subsection
+            line = f"### {match.group(2)}"
+        body.append(line)
+    return f"## {heading}\n\n" + '\n'.join(body).strip()
+
+
+def stitch_sections(title: str, sections: List[OutlineSection], texts: List[str]) -> str:
+    """Join generated sections under one H1, dropping paragraphs already used in an earlier section"""
+    seen = set()
+    parts = [f"# {title}"]
+    for section, text in zip(sections, texts):
+        paragraphs = []
+        for paragraph in _normalize_section(title, section.heading, text).split('\n\n'):
+            key = ' '.join(paragraph.lower().split())
+            if key.startswith('#') or key not in seen:
+                seen.add(key)
+                paragraphs.append(paragraph.strip())
+        parts.append('\n\n'.join(p for p in paragraphs if p))
+    return _BLANK_RUN.sub('\n\n', '\n\n'.join(parts)).strip()
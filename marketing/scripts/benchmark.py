@@ -0,0 +1,274 @@
+"""
+Benchmark Suite for the Marketing Scripts
+Times rendering, layout and generation hot paths and writes machine-readable results
+
+Usage:
+    python scripts/benchmark.py                       # run everything
+    python scripts/benchmark.py --only pin --repeat 10
+    python scripts/benchmark.py --compare reports/benchmarks_20250101_120000.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+MARKETING_DIR = SCRIPTS_DIR.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from llm_clients import FakeClient, default_fake_responder
+
+
+def _keyword_responder(keywords_per_call: int = 15) -> Callable[[Dict], str]:
+    """Fake responder that returns distinct keywords on every expansion call"""
+    counter = iter(range(10 ** 9))
+
+    def respond(request: Dict) -> str:
+        if 'keyword variations' in request['messages'][-1]['content']:
+            call = next(counter)
+            return '\n'.join(f"synthetic long tail keyword idea {call} {i}" for i in range(keywords_per_call))
+        return default_fake_responder(request)
+
+    return respond
+
+
+def _write_temp_config(tmp_dir: Path) -> str:
+    """Copy the example config with every output directory pointed into tmp_dir"""
+    with open(MARKETING_DIR / 'config.example.json', 'r') as f:
+        config = json.load(f)
+
+    for key in config['output']:
+        config['output'][key] = str(tmp_dir / key)
+    config.setdefault('templates', {})['catalog_path'] = str(MARKETING_DIR / 'templates.example.json')
+    # One level per seed, so research_keywords timings stay comparable across sizes
+    config['seo']['keyword_expansion'] = {'max_depth': 1, 'max_calls': 10 ** 6, 'max_tokens': 0}
+
+    config_path = tmp_dir / 'config.json'
+    with open(config_path, 'w') as f:
+        json.dump(config, f)
+    return str(config_path)
+
+
+def measure(fn: Callable, repeat: int, warmup: int = 1) -> Dict:
+    """Run fn repeatedly and summarize wall times in seconds"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+    return {
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'max': max(times)
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=MARKETING_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_benchmarks(config_path: str, llm_latency: float, sizes: List[int]) -> Dict[str, Callable]:
+    """Create benchmark callables keyed by name"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from content_generator import ContentGenerator
+        from pinterest_automator import PinterestAutomator
+        from seo_automator import SEOAutomator
+
+        generator = ContentGenerator(config_path)
+        pinterest = PinterestAutomator(config_path)
+        seo = SEOAutomator(config_path)
+
+    generator.ai_client = FakeClient(latency=llm_latency)
+    seo.ai_client = FakeClient(_keyword_responder(), latency=llm_latency)
+
+    from PIL import Image, ImageDraw
+    canvas = Image.new('RGB', (1080, 1080))
+    draw = ImageDraw.Draw(canvas, 'RGBA')
+    short_caption = "💕 Love is in the little moments ✨"
+    long_caption = ' '.join(["Every love story deserves a page of its own, full of memories"] * 8)
+
+    from caption_scorer import CaptionScorer
+    scorer = CaptionScorer()
+    candidate_captions = [short_caption, long_caption,
+                          "💝 Who are you creating this for? Start your page today! 🌹 #Love"] * 334
+
+    from seo_analyzer import analyze_article
+    # ~10k words in 10 H2 sections
+    article = '# Love Letter Ideas\n\n' + '\n\n'.join(
+        f"## Section {i}\n\n" + ' '.join([long_caption, "Have you tried love letter ideas? [link: templates]"] * 10)
+        for i in range(10)
+    )
+
+    from link_index import LinkIndex
+    # 5000 synthetic posts in an in-memory index
+    link_index = LinkIndex(':memory:')
+    topics = ['love letter', 'anniversary', 'birthday', 'proposal', 'valentine', 'wedding', 'memory book', 'gift']
+    with link_index.conn:
+        for i in range(5000):
+            keyword = f"{topics[i % 8]} ideas {i} for {topics[(i * 3) % 8]}"
+            link_index._upsert({'url': f"/blog/post-{i}", 'kind': 'blog', 'title': keyword.title(),
+                                'keyword': keyword, 'body': long_caption})
+    anchors = ['romantic anniversary ideas', 'birthday gift', 'proposal page', 'love letter templates']
+
+    from ngram_volume import NgramVolumeIndex, build_index
+    # 200k synthetic n-grams over a 5k-word vocabulary; estimate 10k keywords of 2-6 words
+    rng = random.Random(7)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    table = Path(config_path).parent / 'ngrams.tsv'
+    with open(table, 'w', encoding='utf-8') as f:
+        for _ in range(200_000):
+            f.write(' '.join(rng.choices(vocabulary, k=rng.randint(1, 4))) + f"\t{rng.randint(1, 10 ** 6)}\n")
+    build_index(str(table), str(table.with_suffix('.idx')))
+    volume_index = NgramVolumeIndex(str(table.with_suffix('.idx')))
+    volume_keywords = [' '.join(rng.choices(vocabulary, k=rng.randint(2, 6))) for _ in range(10_000)]
+
+    import static_site
+    static_site._init_worker(static_site.load_templates(), {'name': 'Heartful Pages', 'base_url': '', 'year': '2025'}, '')
+    blog_data = {'keyword': 'love letter ideas', 'title': 'Love Letter Ideas', 'meta_description': 'desc',
+                 'content': article, 'created_at': '2025-02-14T09:00:00'}
+
+    # Regenerating a ~10k-word post whose 200 paragraphs are all in the translation cache
+    paragraphs = [f"Paragraph {i}: {long_caption}" for i in range(200)]
+    seo.localizer.localize(paragraphs)
+
+    benchmarks = {
+        'content.create_image': lambda: generator.create_image(short_caption),
+        'content.wrapped_text_short': lambda: generator._add_wrapped_text(draw, short_caption, (1080, 1080), (255, 255, 255)),
+        'content.wrapped_text_long': lambda: generator._add_wrapped_text(draw, long_caption, (1080, 1080), (255, 255, 255)),
+        'content.caption_variations': lambda: generator.generate_caption_variations("Anniversary surprise ideas", count=3),
+        'content.caption_scoring.1000': lambda: scorer.score_groups([candidate_captions[i:i + 4] for i in range(0, 1000, 4)]),
+        'seo.analyze_article.10k': lambda: analyze_article(article, 'love letter ideas', title='t', description='d'),
+        'seo.link_resolve.5000': lambda: link_index.resolve(anchors, source='/blog/post-0'),
+        'seo.volume_estimate.10k': lambda: volume_index.estimate(volume_keywords),
+        'seo.localize_cached.10k': lambda: seo.localizer.localize(paragraphs),
+        'site.render_page.10k': lambda: static_site.render_page('blog', blog_data, '/blog/love-letter-ideas'),
+    }
+
+    for style in ('romantic', 'elegant', 'modern'):
+        benchmarks[f'pin.create_pinterest_pin.{style}'] = (
+            lambda style=style: pinterest.create_pinterest_pin('Romantic Birthday Page', 'desc', style=style)
+        )
+        benchmarks[f'pin.render_only.{style}'] = (
+            lambda style=style: pinterest.renderer.render('Romantic Birthday Page', style=style)
+        )
+
+    # research_keywords yields 15 related + 7 question keywords per seed
+    for size in sizes:
+        seeds = [f"seed keyword {i}" for i in range(max(1, size // 22))]
+        benchmarks[f'seo.research_keywords.{size}'] = lambda seeds=seeds: seo.research_keywords(seeds)
+
+    pins = [
+        {'template_id': f"t{i}", 'title': f"Pin {i}", 'description': 'desc',
+         'pin_image': f"pin_{i}.png", 'link': 'https://example.com', 'hashtags': ['#Love']}
+        for i in range(50)
+    ]
+    for days in (30, 365, 3650):
+        benchmarks[f'pin.create_posting_schedule.{days}d'] = (
+            lambda days=days: pinterest.create_posting_schedule(pins, days=days)
+        )
+
+    return benchmarks
+
+
+def compare(results: Dict, baseline_path: str, threshold: float) -> List[str]:
+    """Return regressions (median slower than baseline by more than threshold)"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)['benchmarks']
+
+    regressions = []
+    print(f"\n📈 Compared with {baseline_path}:")
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['median']
+        change = (stats['median'] - before) / before if before else 0.0
+        marker = '⚠️' if change > threshold else '  '
+        print(f"  {marker} {name:<42} {before * 1000:>10.2f}ms → {stats['median'] * 1000:>10.2f}ms ({change:+.1%})")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the marketing scripts")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument('--only', default='', help="run benchmarks whose name contains this text")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument('--sizes', default='10000,100000', help="synthetic keyword set sizes")
+    parser.add_argument('--output', default=None, help="results file (default: reports/benchmarks_<timestamp>.json)")
+    parser.add_argument('--compare', default=None, help="previous results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="regression threshold for --compare")
+    args = parser.parse_args()
+
+    random.seed(0)
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+
+    print("\n" + "="*70)
+    print("⏱️ Marketing Scripts Benchmark")
+    print("="*70 + "\n")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = _write_temp_config(Path(tmp))
+        benchmarks = build_benchmarks(config_path, args.llm_latency, sizes)
+
+        for name, fn in benchmarks.items():
+            if args.only and args.only not in name:
+                continue
+            # Large keyword sets are slow; a couple of runs is enough
+            repeat = min(args.repeat, 2) if name.startswith('seo.research_keywords') else args.repeat
+            stats = measure(fn, repeat)
+            results[name] = stats
+            print(f"  {name:<42} median {stats['median'] * 1000:>10.2f}ms  (min {stats['min'] * 1000:.2f}ms)")
+
+    output = {
+        'created_at': datetime.now().isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'llm_latency': args.llm_latency,
+        'benchmarks': results
+    }
+
+    output_file = Path(args.output) if args.output else (
+        MARKETING_DIR / 'reports' / f"benchmarks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\n💾 Results saved to: {output_file}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Caption Quality Scorer
+Ranks caption variations locally so the recommended caption is chosen without extra LLM calls
+
+Every caption is reduced to a few counts (characters, emojis, words, sentences,
+syllables, hook/CTA flags, hashtag collisions) with precompiled regexes, and
+scoring runs as NumPy array arithmetic over all variations of a batch at once.
+Each feature scores 0-1, and the weighted sum picks the winner.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from lazy_imports import require
+
+# Target character counts per caption length (shared with the caption prompt)
+CAPTION_LENGTHS = {
+    'short': (50, 100),
+    'medium': (150, 200),
+    'long': (250, 300)
+}
+
+# Target emoji counts per content_strategy.emoji_usage
+EMOJI_TARGETS = {
+    'none': (0, 0),
+    'low': (1, 2),
+    'medium': (2, 4),
+    'high': (3, 5)
+}
+
+FEATURE_WEIGHTS = {
+    'length': 0.25,
+    'emoji': 0.2,
+    'hook': 0.25,
+    'hashtags': 0.1,
+    'readability': 0.2
+}
+
+_EMOJI = re.compile('[\U0001F300-\U0001FAFF\u2600-\u27BF\u2B50]')
+_WORD = re.compile(r"[A-Za-z']+")
+_SENTENCE = re.compile(r'[^.!?]+[.!?]*')
+_VOWEL_GROUP = re.compile(r'[aeiouy]+')
+_SILENT_E = re.compile(r'[^aeiouy\W]e\b')
+_HASHTAG = re.compile(r'#\w+')
+_CTA = re.compile(r'\b(tag|share|comment|save|try|create|start|tell|who|what|which|click|discover)\b', re.I)
+
+
+def caption_counts(caption: str, hashtags: Sequence[str] = ()) -> tuple:
+    """Raw counts for one caption: chars, emojis, words, sentences, syllables, hook, cta, collisions"""
+    words = _WORD.findall(caption)
+    lowered = caption.lower()
+    syllables = max(len(_VOWEL_GROUP.findall(lowered)) - len(_SILENT_E.findall(lowered)), len(words))
+    # Trailing hashtags are not a sentence; the closing line is the one before them
+    prose = _HASHTAG.sub('', caption)
+    sentences = [sentence for sentence in _SENTENCE.findall(prose) if _WORD.search(sentence)] or [prose]
+    opening, closing = sentences[0], sentences[-1]
+
+    post_tags = {tag.lower() for tag in hashtags}
+    collisions = sum(1 for tag in _HASHTAG.findall(caption) if tag.lower() in post_tags)
+    return (
+        len(caption),
+        len(_EMOJI.findall(caption)),
+        len(words),
+        len(sentences),
+        syllables,
+        '?' in opening or '!' in opening,
+        '?' in closing or bool(_CTA.search(closing)),
+        collisions
+    )
+
+
+class CaptionScorer:
+    """Scores caption variations against the content strategy, all variations at once"""
+
+    def __init__(self, length: str = 'medium', emoji_usage: str = 'high', weights: Dict[str, float] = None):
+        self.length_range = CAPTION_LENGTHS.get(length, CAPTION_LENGTHS['medium'])
+        self.emoji_range = EMOJI_TARGETS.get(emoji_usage, EMOJI_TARGETS['high'])
+        self.weights = {**FEATURE_WEIGHTS, **(weights or {})}
+
+    @staticmethod
+    def _in_range(np, values, low: float, high: float, scale: float):
+        """1 inside [low, high], falling linearly to 0 at ``scale`` outside it"""
+        distance = np.maximum(low - values, 0) + np.maximum(values - high, 0)
+        return 1.0 - np.clip(distance / scale, 0.0, 1.0)
+
+    def features(self, captions: Sequence[str], hashtags: Sequence[Sequence[str]] = None):
+        """(n, 5) array of per-feature scores, columns in FEATURE_WEIGHTS order"""
+        np = require('numpy')
+        hashtags = hashtags or [()] * len(captions)
+        counts = np.array([caption_counts(caption, tags) for caption, tags in zip(captions, hashtags)],
+                          dtype=np.float64).reshape(-1, 8)
+        chars, emojis, words, sentences, syllables, hook, cta, collisions = counts.T
+
+        words = np.maximum(words, 1)
+        flesch = 206.835 - 1.015 * (words / sentences) - 84.6 * (syllables / words)
+        emoji_low, emoji_high = self.emoji_range
+        length_low, length_high = self.length_range
+
+        return np.column_stack([
+            self._in_range(np, chars, length_low, length_high, length_high),
+            self._in_range(np, emojis, emoji_low, emoji_high, max(emoji_high, 2)),
+            0.5 * hook + 0.5 * cta,
+            1.0 / (1.0 + collisions),
+            np.clip((flesch - 30.0) / 50.0, 0.0, 1.0)
+        ])
+
+    def score(self, captions: Sequence[str], hashtags: Sequence[Sequence[str]] = None):
+        """Weighted quality score (0-1) per caption"""
+        np = require('numpy')
+        weights = np.array([self.weights[name] for name in FEATURE_WEIGHTS])
+        return self.features(captions, hashtags) @ (weights / weights.sum())
+
+    def pick_best(self, groups: List[List[str]], hashtags: List[Sequence[str]] = None) -> List[Optional[int]]:
+        """Index of the best caption in each group, scoring every group in one pass
+
+        ``hashtags`` holds one hashtag list per group (the post's own tags).
+        """
+        scores = self.score_groups(groups, hashtags)
+        return [int(group_scores.argmax()) if len(group_scores) else None for group_scores in scores]
+
+    def score_groups(self, groups: List[List[str]], hashtags: List[Sequence[str]] = None) -> List:
+        """Scores for each group of variations, computed as one flat array"""
+        np = require('numpy')
+        hashtags = hashtags or [()] * len(groups)
+        flat = [caption for group in groups for caption in group]
+        flat_tags = [tags for group, tags in zip(groups, hashtags) for _ in group]
+        scores = self.score(flat, flat_tags)
+        return np.split(scores, np.cumsum([len(group) for group in groups])[:-1])
@@ -0,0 +1,383 @@
+"""
+Marketing Automation CLI
+One entry point for the content, Pinterest and SEO automators
+
+Each subcommand imports only what it needs, so non-AI commands such as
+``sitemap`` and ``schedule`` start without loading the Anthropic SDK or Pillow.
+
+Usage:
+    python scripts/cli.py sitemap
+    python scripts/cli.py schedule --days 14
+    python scripts/cli.py content-batch --date 2025-02-14
+    python scripts/cli.py engagement exports/pinterest_analytics.csv
+    python scripts/cli.py links --resolve "anniversary templates"
+    python scripts/cli.py site
+    python scripts/cli.py volume-index ngrams.example.tsv --output reports/ngrams.idx
+    python scripts/cli.py run jobs.example.yaml
+    python scripts/cli.py --tenants tenants.example.json --brand all content-batch
+    python scripts/cli.py startup-bench
+    python scripts/cli.py failover-check
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+MARKETING_DIR = SCRIPTS_DIR.parent
+
+STARTUP_TARGET_MS = 100
+
+
+def cmd_content_batch(args):
+    batch = args.pool.get('content', args.config).generate_daily_content_batch(args.date)
+    print(f"\n✨ Successfully generated {len(batch['posts'])} posts!")
+
+
+def cmd_pins(args):
+    pins = args.pool.get('pinterest', args.config).create_pins_for_all_templates(args.type, args.style)
+    print(f"\n✅ Created {len(pins)} pins!")
+
+
+def cmd_schedule(args):
+    automator = args.pool.get('pinterest', args.config)
+    pins_file = args.pins_file
+    if not pins_file:
+        candidates = list(Path(automator.config.output.schedules_directory).glob('pinterest_pins_*.json'))
+        if not candidates:
+            print("❌ No pins found. Run the 'pins' command first!")
+            return 1
+        pins_file = max(candidates, key=lambda path: path.stat().st_mtime)
+
+    with open(pins_file, 'r', encoding='utf-8') as f:
+        pins = json.load(f)
+
+    schedule = automator.create_posting_schedule(pins, args.days)
+    print(f"\n✅ Created {args.days}-day schedule with {len(schedule)} posts!")
+
+
+def cmd_idea_pin(args):
+    idea_pin = args.pool.get('pinterest', args.config).create_idea_pins_content(
+        args.topic,
+        template_image_path=args.image,
+        style=args.style,
+        slideshow=args.slideshow
+    )
+    print(f"\n✅ Rendered {idea_pin['total_pages']} pages to {idea_pin['bundle_dir']}")
+
+
+def cmd_keywords(args):
+    keywords = args.pool.get('seo', args.config).research_keywords(args.seeds or None, resume=args.resume)
+    print(f"\n✓ Found {len(keywords)} keywords")
+
+
+def cmd_blog(args):
+    blog_post = args.pool.get('seo', args.config).generate_blog_post(args.keyword, args.words)
+    print(f"\n✓ Generated {blog_post.get('word_count', 0)} word article")
+
+
+def cmd_landing_pages(args):
+    args.pool.get('seo', args.config).generate_template_landing_pages(args.type)
+    print("\n✓ Template landing pages generated")
+
+
+def cmd_sitemap(args):
+    sitemap = args.pool.get('seo', args.config).generate_sitemap_data()
+    print(f"\n✓ Generated sitemap with {len(sitemap)} URLs")
+
+
+def cmd_links(args):
+    from link_index import LinkIndex
+
+    config = args.pool.config(args.config)
+    index = LinkIndex.for_config(config)
+    try:
+        counts = index.refresh(config.output.content_directory)
+        stats = index.stats()
+        print(f"✓ Indexed {counts['added']} new, {counts['updated']} changed, {counts['removed']} removed pages "
+              f"({counts['unchanged']} unchanged, {counts['skipped']} unreadable)")
+        print(f"🔗 {stats['blog_pages']} posts, {stats['landing_pages']} landing pages, "
+              f"{stats['links']} links, {stats['orphan_posts']} posts without inbound links")
+        for anchor in args.resolve or []:
+            for page in index.search(anchor, args.limit):
+                print(f"  {anchor!r} -> {page['url']} ({page['score']:.2f}) {page['title']}")
+    finally:
+        index.close()
+
+
+def cmd_site(args):
+    from static_site import build_site
+
+    summary = build_site(args.pool.config(args.config), full=args.full, workers=args.workers)
+    print(f"✓ Rendered {summary['rendered']} pages, {summary['unchanged']} unchanged, {summary['removed']} removed, "
+          f"{summary['failed']} failed ({summary['workers']} workers, {summary['seconds']:.2f}s)")
+    print(f"\n🌐 {summary['pages']} pages in {summary['site_directory']}")
+
+
+def cmd_volume_index(args):
+    from ngram_volume import build_index
+
+    output = args.output or args.pool.config(args.config).seo.volume_table
+    if not output:
+        print("❌ Set seo.volume_table in the config or pass --output")
+        return 1
+    summary = build_index(args.source, output)
+    print(f"✓ Indexed {summary['ngrams']:,} n-grams (up to {summary['max_order']} words) from {summary['rows']:,} rows, "
+          f"{summary['skipped']} skipped")
+    print(f"\n📈 {summary['bytes'] / 1e6:.1f} MB -> {output}")
+
+
+def cmd_volume(args):
+    automator = args.pool.get('seo', args.config)
+    if not automator.volume_index:
+        print("❌ No volume table: set seo.volume_table to an index built with 'volume-index'")
+        return 1
+    volumes = automator.volume_index.estimate(args.keywords)
+    for keyword, volume, priority in zip(args.keywords, volumes, automator._score_keywords(args.keywords)):
+        print(f"  {keyword}: ~{volume:,.0f} (priority {priority})")
+
+
+def cmd_engagement(args):
+    from engagement import run_ingest
+
+    summary = run_ingest(args.pool.config(args.config), args.csv, args.source)
+    for path, counts in summary['files'].items():
+        print(f"✓ {path}: {counts['ingested']} rows ingested, {counts['skipped']} skipped")
+    print(f"\n📈 {summary['matched_posts']} posts matched ({summary['metric'] or 'no data'}) "
+          f"-> {summary['insights_path']}")
+
+
+def cmd_run(args):
+    from job_runner import run_forever, run_spec
+
+    options = {'pool': args.pool, 'concurrency': args.concurrency, 'report_path': args.report, 'dry_run': args.dry_run}
+    if args.every:
+        return run_forever(args.spec, args.every, **options)
+    return run_spec(args.spec, **options)
+
+
+def _parse_importtime(stderr: str) -> List[Dict]:
+    """Top-level imports from ``-X importtime`` output, heaviest first"""
+    import re
+
+    imports = []
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)', line)
+        if match and len(match.group(3)) == 1:
+            imports.append({'module': match.group(4), 'cumulative_ms': int(match.group(2)) / 1000})
+    return sorted(imports, key=lambda item: item['cumulative_ms'], reverse=True)
+
+
+def cmd_startup_bench(args):
+    """Time process startup of the non-AI subcommands with ``python -X importtime``"""
+    import subprocess
+    import tempfile
+    import time
+
+    print("\n" + "="*70)
+    print(f"⏱️ CLI startup benchmark (target < {STARTUP_TARGET_MS}ms)")
+    print("="*70 + "\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        with open(args.config if os.path.exists(args.config) else MARKETING_DIR / 'config.example.json') as f:
+            config = json.load(f)
+        for key in config['output']:
+            config['output'][key] = str(tmp / key)
+        config_path = tmp / 'config.json'
+        with open(config_path, 'w') as f:
+            json.dump(config, f)
+
+        pins_file = tmp / 'pins.json'
+        with open(pins_file, 'w') as f:
+            json.dump([{'template_id': 't1', 'title': 'Pin', 'description': 'd', 'pin_image': 'p.png',
+                        'link': 'https://example.com', 'hashtags': ['#Love']}], f)
+
+        commands = {
+            'help': ['--help'],
+            'sitemap': ['--config', str(config_path), 'sitemap'],
+            'schedule': ['--config', str(config_path), 'schedule', '--days', '7', '--pins-file', str(pins_file)]
+        }
+
+        results = {}
+        failed = []
+        for name, cli_args in commands.items():
+            runs = []
+            imports = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                proc = subprocess.run(
+                    [sys.executable, '-X', 'importtime', str(Path(__file__).resolve())] + cli_args,
+                    capture_output=True, text=True, cwd=tmp
+                )
+                runs.append((time.perf_counter() - start) * 1000)
+                imports = _parse_importtime(proc.stderr)
+
+            wall_ms = min(runs)
+            import_ms = sum(item['cumulative_ms'] for item in imports)
+            results[name] = {'wall_ms': round(wall_ms, 1), 'import_ms': round(import_ms, 1), 'top_imports': imports[:5]}
+
+            status = '✓' if wall_ms < STARTUP_TARGET_MS else '⚠️'
+            if wall_ms >= STARTUP_TARGET_MS:
+                failed.append(name)
+            heaviest = ', '.join(f"{item['module']} {item['cumulative_ms']:.1f}ms" for item in imports[:3])
+            print(f"  {status} {name:<10} {wall_ms:>7.1f}ms wall | {import_ms:>6.1f}ms imports | {heaviest}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'target_ms': STARTUP_TARGET_MS, 'commands': results}, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+
+    return 1 if failed else 0
+
+
+def cmd_failover_check(args):
+    """Exercise provider failover, circuit breaking and hedging offline"""
+    from failover_check import run_checks
+
+    checks = run_checks()
+    for name, passed in checks.items():
+        print(f"  {'✓' if passed else '✗'} {name}")
+    failed = [name for name, passed in checks.items() if not passed]
+    print(f"\n{len(checks) - len(failed)}/{len(checks)} failover checks passed")
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Marketing automation for Heartful Pages")
+    parser.add_argument('--config', default='config.json', help="config file (falls back to config.example.json)")
+    parser.add_argument('--tenants', default=None, help="tenants file for multi-brand mode (see tenants.py)")
+    parser.add_argument('--brand', action='append', default=None,
+                        help="run for this brand from --tenants (repeatable, or 'all')")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('content-batch', help="generate a day's social media content")
+    p.add_argument('--date', default=None, help="batch date (YYYY-MM-DD, default today)")
+    p.set_defaults(func=cmd_content_batch)
+
+    p = sub.add_parser('pins', help="create Pinterest pins for the template catalog")
+    p.add_argument('--type', default=None, help="only templates of this type")
+    p.add_argument('--style', default=None, help="only templates of this style")
+    p.set_defaults(func=cmd_pins)
+
+    p = sub.add_parser('schedule', help="create a Pinterest posting schedule")
+    p.add_argument('--days', type=int, default=7)
+    p.add_argument('--pins-file', default=None, help="pins JSON (default: latest pinterest_pins_*.json)")
+    p.set_defaults(func=cmd_schedule)
+
+    p = sub.add_parser('idea-pin', help="render a multi-page Idea Pin")
+    p.add_argument('topic')
+    p.add_argument('--image', default=None, help="template screenshot for 'image_focus' pages")
+    p.add_argument('--style', default='romantic')
+    p.add_argument('--slideshow', choices=['gif', 'mp4'], default=None)
+    p.set_defaults(func=cmd_idea_pin)
+
+    p = sub.add_parser('keywords', help="research long-tail keywords")
+    p.add_argument('seeds', nargs='*', help="seed keywords (default: seo.target_keywords)")
+    p.add_argument('--resume', action='store_true', help="continue a stopped expansion of the same seeds")
+    p.set_defaults(func=cmd_keywords)
+
+    p = sub.add_parser('blog', help="generate an SEO blog post")
+    p.add_argument('keyword')
+    p.add_argument('--words', type=int, default=1500)
+    p.set_defaults(func=cmd_blog)
+
+    p = sub.add_parser('landing-pages', help="generate template landing pages")
+    p.add_argument('--type', default=None, help="only templates of this type")
+    p.set_defaults(func=cmd_landing_pages)
+
+    p = sub.add_parser('sitemap', help="generate sitemap data")
+    p.set_defaults(func=cmd_sitemap)
+
+    p = sub.add_parser('links', help="refresh the internal link index and show link stats")
+    p.add_argument('--resolve', action='append', default=None, help="show the best pages for this anchor text (repeatable)")
+    p.add_argument('--limit', type=int, default=3, help="pages shown per anchor")
+    p.set_defaults(func=cmd_links)
+
+    p = sub.add_parser('site', help="render changed blog posts and landing pages to static HTML")
+    p.add_argument('--full', action='store_true', help="ignore the build manifest and re-render every page")
+    p.add_argument('--workers', type=int, default=None, help="render processes (default: CPU count)")
+    p.set_defaults(func=cmd_site)
+
+    p = sub.add_parser('volume-index', help="build the search-volume index from an n-gram count table")
+    p.add_argument('source', help="text table of 'n-gram<TAB>count' lines (.gz ok)")
+    p.add_argument('--output', default=None, help="index path (default: seo.volume_table)")
+    p.set_defaults(func=cmd_volume_index)
+
+    p = sub.add_parser('volume', help="estimate search volume and priority for keywords")
+    p.add_argument('keywords', nargs='+')
+    p.set_defaults(func=cmd_volume)
+
+    p = sub.add_parser('engagement', help="ingest engagement CSV exports and update insights")
+    p.add_argument('csv', nargs='*', help="exported CSV files (none: just re-aggregate the store)")
+    p.add_argument('--source', default=None, help="source label (default: detected from the columns)")
+    p.set_defaults(func=cmd_engagement)
+
+    p = sub.add_parser('run', help="run a batch of jobs from a JSON/YAML spec")
+    p.add_argument('spec', help="job spec file (.json, .yaml or .yml)")
+    p.add_argument('--concurrency', type=int, default=None, help="parallel jobs (default: spec or 4)")
+    p.add_argument('--report', default=None, help="summary report path (default: reports/job_run_<timestamp>.json)")
+    p.add_argument('--every', type=float, default=None, help="daemon mode: re-run the spec every N seconds")
+    p.add_argument('--dry-run', action='store_true', help="validate and list the expanded jobs only")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser('startup-bench', help="measure startup time of non-AI subcommands")
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--output', default=None, help="write results as JSON")
+    p.set_defaults(func=cmd_startup_bench)
+
+    p = sub.add_parser('failover-check', help="check LLM failover and hedging offline")
+    p.set_defaults(func=cmd_failover_check)
+
+    return parser
+
+
+def _run(parser: argparse.ArgumentParser, args) -> int:
+    from tenants import AutomatorPool
+
+    if args.brand and not args.tenants:
+        parser.error("--brand requires --tenants")
+    if not args.tenants:
+        args.pool = AutomatorPool()
+        return args.func(args) or 0
+
+    from tenants import TenantRegistry
+
+    tenants = TenantRegistry.from_file(args.tenants)
+    args.pool = AutomatorPool(tenants)
+    if args.command in ('run', 'startup-bench', 'failover-check'):
+        return args.func(args) or 0
+
+    brands = tenants.ids if not args.brand or 'all' in args.brand else args.brand
+    unknown = [brand for brand in brands if brand not in tenants]
+    if unknown:
+        parser.error(f"unknown brand(s): {', '.join(unknown)} (expected one of {', '.join(tenants.ids)})")
+
+    # One process, many brands: automators differ per brand, clients and caches do not
+    exit_code = 0
+    for brand in brands:
+        print(f"\n🏷️ Brand: {brand}")
+        args.config = brand
+        exit_code = max(exit_code, args.func(args) or 0)
+    return exit_code
+
+
+def main(argv: List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from settings import ConfigError
+
+    try:
+        return _run(parser, args)
+    except ConfigError as e:
+        # Bad config fails here, before any automator makes an LLM call
+        print(f"❌ {e}")
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
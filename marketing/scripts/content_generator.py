@@ -4,30 +4,103 @@ Generates diverse, engaging content for heartful pages business
 """
 
 import json
-import os
 import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
-import time
 
-try:
-    from anthropic import Anthropic
-    from PIL import Image, ImageDraw, ImageFont
-    import requests
-except ImportError as e:
-    print(f"Missing dependency: {e}")
-    print("Run: pip install -r requirements.txt")
-    exit(1)
+from caption_scorer import CAPTION_LENGTHS, CaptionScorer
+from content_plan import DEFAULT_CAPTION_STYLES, PostSlot, plan_batch, profile_for
+from engagement import load_insights
+from instrumentation import RunMetrics, export_run_metrics
+from lazy_imports import require
+from locales import Localizer, check_focus_locations
+from prompts import PromptRegistry
+from settings import MarketingConfig, load_config
+from topic_history import TopicHistory
+
+# Extra LLM requests allowed to replace topics rejected as near-duplicates
+TOPIC_TOPUP_ROUNDS = 3
+# How much a caption style's engagement lift (clipped to +/-100%) adds to its quality score
+STYLE_FEEDBACK_WEIGHT = 0.1
+
+FALLBACK_TOPICS = [
+    "Why personalized gifts matter most",
+    "Love languages and digital expressions",
+    "Anniversary surprise ideas that work",
+    "Creating memorable birthday moments",
+    "The art of romantic gestures",
+    "Long distance relationship gift ideas",
+    "Proposal ideas that wow",
+    "Celebrating love milestones",
+    "DIY heartful page tutorials",
+    "Love story inspiration",
+    "Valentine's Day alternatives",
+    "Thoughtful gift ideas for partners",
+    "Making ordinary days special",
+    "Digital love letters explained",
+    "Romantic template showcase",
+    "How to choose the perfect photo for your page",
+    "Best quotes about everlasting love",
+    "Tips for planning a memorable anniversary",
+    "Birthdays as new chapters in love stories",
+    "User favorite memory highlights",
+    "Creative ways to say 'I love you' online",
+    "Secrets to keeping romance alive long-distance",
+    "Proposal stories: Community highlights",
+    "Honoring milestones: Anniversaries and beyond",
+    "Gift ideas for every relationship stage",
+    "Spotlight: Real love stories from our users",
+    "Design a page together: Couple challenge",
+    "Making birthdays feel magical",
+    "Anniversary traditions from around the world",
+    "Digital moments that last forever",
+    "From first date to forever: Milestone map",
+    "Top ten romantic gestures in 2024",
+    "Winter romance ideas for couples",
+    "Why digital keepsakes make meaningful gifts",
+    "Valentine’s Day: Beyond the roses",
+    "Cherishing everyday moments with your partner",
+    "How to write an emotional message",
+    "Planning the ultimate surprise for them",
+    "Celebrating love through music and memories",
+    "Favorite love songs for your special page",
+    "Meaningful ways to mark milestones online",
+    "Best practices for group love letters",
+    "New features: What’s possible with our templates",
+    "Monthly couple's challenge: Share your story",
+    "How your love story inspires the world",
+]
 
 
 class ContentGenerator:
     """Generate AI-powered content for social media"""
     
-    def __init__(self, config_path: str = "config.json"):
-        self.config = self._load_config(config_path)
-        self.ai_client = self._init_ai_client()
+    def __init__(self, config_path: str = "config.json", config: MarketingConfig = None, shared=None):
+        # A preloaded config (a brand from tenants.py) wins over config_path;
+        # shared is the tenants.SharedResources every brand in the process reuses
+        self.config = config if config is not None else load_config(config_path)
+        self.shared = shared
+        # Guards the lazily created client and localizer (job_runner shares automators across threads)
+        self._init_lock = threading.RLock()
+        self._ai_client = None
+        self._ai_client_ready = False
+        self._localizer = None
         self._setup_directories()
+        self.metrics = RunMetrics('content_generator')
+        
+        strategy = self.config.content_strategy
+        self.topic_history = TopicHistory(
+            Path(self.config.output.content_directory) / 'topic_history.jsonl',
+            window_days=strategy.topic_history_days,
+            threshold=strategy.topic_similarity
+        ) if strategy.topic_history_days > 0 else None
+        self.caption_scorer = CaptionScorer(emoji_usage=strategy.emoji_usage)
+        self.prompts = PromptRegistry(self.config.business_info, self.metrics, self.config.llm)
+        check_focus_locations(self.config.seo)
         
         # Romantic niche specific emojis
         self.emojis = {
@@ -75,76 +148,93 @@ class ContentGenerator:
                 '👨‍👩‍👧‍👦', '👩‍👧‍👦', '👨‍👧', '👩‍👧', '🧑‍🧑‍🧒', '👨‍👦', '👩‍👧‍👦', '🫶', '❤️'
             ]
         }
+        # Longest first, so a ZWJ sequence or a heart with its variation selector counts as one emoji
+        known = sorted({emoji for emojis in self.emojis.values() for emoji in emojis}, key=len, reverse=True)
+        self._emoji_pattern = re.compile('|'.join(re.escape(emoji).replace('\ufe0f', '\ufe0f?') for emoji in known))
     
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration file"""
-        if not os.path.exists(config_path):
-            config_path = "config.example.json"
-        
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"❌ Config file not found. Please create config.json from config.example.json")
-            exit(1)
+    @property
+    def ai_client(self):
+        """AI client, created on first use so non-AI commands never import the SDK"""
+        if not self._ai_client_ready:
+            self.ensure_ai_client()
+        return self._ai_client
+    
+    def ensure_ai_client(self):
+        """Create the AI client once, even when jobs or worker threads ask for it at the same time"""
+        with self._init_lock:
+            if not self._ai_client_ready:
+                if self.shared is not None:
+                    self._ai_client = self.shared.llm_client(self.config, self._init_ai_client)
+                else:
+                    self._ai_client = self._init_ai_client()
+                self._ai_client_ready = True
+                
+                from llm_providers import provider_stats
+                stats = provider_stats(self._ai_client)
+                if stats is not None:
+                    self.metrics.attach('providers', stats)
+        return self._ai_client
+    
+    @ai_client.setter
+    def ai_client(self, client):
+        with self._init_lock:
+            self._ai_client = client
+            self._ai_client_ready = True
+            self._localizer = None
+    
+    @property
+    def localizer(self) -> Localizer:
+        """Locale fan-out for seo.focus_locations (locales.py), sharing this generator's client"""
+        with self._init_lock:
+            if self._localizer is None:
+                self._localizer = Localizer(self.config, self.ai_client, self.prompts, self.metrics)
+            return self._localizer
     
     def _init_ai_client(self):
-        """Initialize AI client (Anthropic Claude)"""
-        api_key = self.config.get('anthropic_api_key')
-        if not api_key or api_key == "YOUR_ANTHROPIC_API_KEY":
+        """Initialize AI client (Anthropic Claude, or a replay/fake client per llm.mode) behind failover"""
+        from llm_clients import create_offline_client, with_recording
+        from llm_providers import build_provider_chain
+        
+        offline_client = create_offline_client(self.config.llm)
+        if offline_client:
+            print(f"🧪 Using offline LLM client (mode: {self.config.llm.mode})")
+            return build_provider_chain(offline_client, self.config)
+        
+        if not self.config.has_anthropic_key:
             print("⚠️ Warning: Anthropic API key not configured. Using fallback content generation.")
-            return None
+            return build_provider_chain(None, self.config)
         
         try:
-            return Anthropic(api_key=api_key)
+            Anthropic = require('anthropic').Anthropic
+            client = with_recording(Anthropic(api_key=self.config.anthropic_api_key), self.config.llm)
+            return build_provider_chain(client, self.config)
         except Exception as e:
             print(f"⚠️ AI client initialization failed: {e}")
             return None
     
     def _setup_directories(self):
         """Create output directories"""
-        for dir_key in ['content_directory', 'images_directory', 'reports_directory', 'schedules_directory']:
-            dir_path = Path(self.config['output'][dir_key])
-            dir_path.mkdir(parents=True, exist_ok=True)
+        output = self.config.output
+        for directory in (output.content_directory, output.images_directory,
+                          output.reports_directory, output.schedules_directory):
+            Path(directory).mkdir(parents=True, exist_ok=True)
     
-    def generate_caption(self, topic: str, style: str = "romantic", length: str = "medium") -> str:
-        """Generate AI-powered caption"""
+    def generate_caption(self, topic: str, style: str = "romantic", length: str = "medium",
+                         content_type: str = None) -> str:
+        """Generate AI-powered caption (content_type adds that type's goal to the prompt)"""
         
         if not self.ai_client:
             return self._fallback_caption(topic, style)
         
-        business = self.config['business_info']
-        
-        length_guide = {
-            "short": "50-100 characters",
-            "medium": "150-200 characters",
-            "long": "250-300 characters"
-        }
+        low, high = CAPTION_LENGTHS.get(length, CAPTION_LENGTHS['medium'])
+        goal = f"\nContent goal: {profile_for(content_type).caption_goal}" if content_type else ""
+        request = self.prompts.request('caption', style=style, topic=topic,
+                                       length_low=low, length_high=high, goal=goal)
         
-        prompt = f"""Generate a {style} social media caption for: "{topic}"
-
-Business Context:
-- Brand: {business['name']}
-- Niche: {business['niche']}
-- Audience: {business['target_audience']}
-- Tone: {business['tone']}
-
-Requirements:
-- Length: {length_guide.get(length, '150-200 characters')}
-- Include 3-5 relevant emojis
-- Create an emotional hook in the first sentence
-- End with a question or call-to-action to boost engagement
-- Make it shareable and relatable
-- Focus on emotions and relationships
-
-Return ONLY the caption text, no explanations."""
-
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('caption', style=style) as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
             caption = message.content[0].text.strip()
             return caption
@@ -174,24 +264,31 @@ Return ONLY the caption text, no explanations."""
         options = templates.get(style, templates['romantic'])
         return random.choice(options)
     
-    def generate_caption_variations(self, topic: str, count: int = 3) -> List[Dict]:
-        """Generate multiple caption variations for A/B testing"""
-        
-        styles = ['romantic', 'inspirational', 'emotional']
-        variations = []
-        
-        for i, style in enumerate(styles[:count]):
-            caption = self.generate_caption(topic, style)
-            
-            variations.append({
+    def generate_caption_variations(self, topic: str, count: int = 3, content_type: str = None) -> List[Dict]:
+        """Generate multiple caption variations for A/B testing
+        
+        Styles come from the content type's profile and repeat when count exceeds them.
+        """
+        styles = profile_for(content_type).caption_styles if content_type else DEFAULT_CAPTION_STYLES
+        
+        with self.metrics.span('caption_variations'):
+            captions = [(styles[i % len(styles)], self.generate_caption(topic, styles[i % len(styles)],
+                                                                        content_type=content_type))
+                        for i in range(count)]
+        return self._caption_variations(captions)
+    
+    def _caption_variations(self, captions: List[tuple]) -> List[Dict]:
+        """Variation records for (style, caption) pairs"""
+        return [
+            {
                 'id': i + 1,
                 'style': style,
                 'caption': caption,
                 'length': len(caption),
-                'emoji_count': sum(1 for c in caption if c in ''.join([e for emojis in self.emojis.values() for e in emojis]))
-            })
-        
-        return variations
+                'emoji_count': len(self._emoji_pattern.findall(caption))
+            }
+            for i, (style, caption) in enumerate(captions)
+        ]
     
     def generate_hashtags(self, topic: str, count: int = 8) -> List[str]:
         """Generate relevant hashtags"""
@@ -199,27 +296,12 @@ Return ONLY the caption text, no explanations."""
         if not self.ai_client:
             return self._fallback_hashtags(topic, count)
         
-        prompt = f"""Generate {count} relevant, popular hashtags for: "{topic}"
-
-Context: Romantic digital pages, love messages, anniversary gifts
-
-Requirements:
-- Mix of niche-specific and broad hashtags
-- Include # symbol
-- No spaces in hashtags
-- Mix of trending and evergreen tags
-- Include variations like #LoveStory #LoveStories
-
-Example format: #RomanticGifts #AnniversaryIdeas #LoveMessages
-
-Return only the hashtags separated by spaces."""
-
+        request = self.prompts.request('hashtags', count=count, topic=topic)
+        
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=300,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('hashtags') as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
             response = message.content[0].text.strip()
             hashtags = [tag.strip() for tag in response.split() if tag.startswith('#')]
@@ -246,12 +328,16 @@ Return only the hashtags separated by spaces."""
         random.shuffle(all_tags)
         return all_tags[:count]
     
-    def create_image(self, text: str, template_style: str = "romantic", size: tuple = (1080, 1080)) -> str:
-        """Generate branded social media image"""
+    def create_image(self, text: str, template_style: str = "romantic", size: tuple = (1080, 1080),
+                     name: str = None) -> str:
+        """Generate branded social media image (name defaults to a timestamp)"""
+        
+        Image = require('PIL.Image')
+        ImageDraw = require('PIL.ImageDraw')
         
-        output_dir = Path(self.config['output']['images_directory'])
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        image_path = output_dir / f"post_{timestamp}.png"
+        output_dir = Path(self.config.output.images_directory)
+        name = name or datetime.now().strftime("%Y%m%d_%H%M%S")
+        image_path = output_dir / f"post_{name}.png"
         
         # Color schemes based on style
         color_schemes = {
@@ -274,30 +360,33 @@ Return only the hashtags separated by spaces."""
         
         scheme = color_schemes.get(template_style, color_schemes['romantic'])
         
-        # Create image
-        img = Image.new('RGB', size, color=scheme['bg_colors'][0])
-        draw = ImageDraw.Draw(img)
-        
-        # Create gradient background
-        for i in range(size[1]):
-            ratio = i / size[1]
-            color = tuple(
-                int(scheme['bg_colors'][0][j] + (scheme['bg_colors'][1][j] - scheme['bg_colors'][0][j]) * ratio)
-                for j in range(3)
-            )
-            draw.rectangle([(0, i), (size[0], i + 1)], fill=color)
-        
-        # Add decorative elements
-        self._add_decorative_hearts(draw, size, scheme['accent'])
-        
-        # Add text
-        self._add_wrapped_text(draw, text, size, scheme['text_color'])
-        
-        # Add brand logo/name
-        business_name = self.config['business_info']['name']
-        self._add_brand_watermark(draw, business_name, size, scheme['text_color'])
+        with self.metrics.span('image_render', style=template_style):
+            # Create image
+            img = Image.new('RGB', size, color=scheme['bg_colors'][0])
+            # 'RGBA' draw mode blends translucent fills instead of dropping their alpha
+            draw = ImageDraw.Draw(img, 'RGBA')
+            
+            # Create gradient background
+            for i in range(size[1]):
+                ratio = i / size[1]
+                color = tuple(
+                    int(scheme['bg_colors'][0][j] + (scheme['bg_colors'][1][j] - scheme['bg_colors'][0][j]) * ratio)
+                    for j in range(3)
+                )
+                draw.rectangle([(0, i), (size[0], i + 1)], fill=color)
+            
+            # Add decorative elements
+            self._add_decorative_hearts(draw, size, scheme['accent'])
+            
+            # Add text
+            self._add_wrapped_text(draw, text, size, scheme['text_color'])
+            
+            # Add brand logo/name
+            business_name = self.config.business_info.name
+            self._add_brand_watermark(draw, business_name, size, scheme['text_color'])
         
-        img.save(image_path)
+        with self.metrics.span('encode'):
+            img.save(image_path)
         print(f"✓ Image created: {image_path}")
         return str(image_path)
     
@@ -314,12 +403,8 @@ Return only the hashtags separated by spaces."""
     
     def _add_wrapped_text(self, draw, text, size, color):
         """Add word-wrapped text to image"""
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 60)
-            small_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 40)
-        except:
-            font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
+        # Fonts come from the process-wide registry shared with the pin renderers
+        small_font = require('pin_renderer').load_font(40)
         
         # Word wrap
         max_width = size[0] - 150
@@ -352,10 +437,7 @@ Return only the hashtags separated by spaces."""
     
     def _add_brand_watermark(self, draw, brand_name, size, color):
         """Add brand watermark"""
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 45)
-        except:
-            font = ImageFont.load_default()
+        font = require('pin_renderer').load_font(45)
         
         bbox = draw.textbbox((0, 0), brand_name, font=font)
         w = bbox[2] - bbox[0]
@@ -364,44 +446,62 @@ Return only the hashtags separated by spaces."""
         
         draw.text((x, y), brand_name, fill=color, font=font)
     
-    def generate_post_topics(self, count: int = 10) -> List[str]:
-        """Generate post topics for the day"""
-        
-        if not self.ai_client:
-            return self._fallback_topics(count)
-        
-        niche = self.config['business_info']['niche']
-        audience = self.config['business_info']['target_audience']
+    def generate_post_topics(self, count: int = 10, date: str = None, content_type: str = None) -> List[str]:
+        """Generate post topics for the day, skipping near-duplicates of recent posts
+        
+        content_type focuses the prompt on one type from content_strategy. Rejected
+        topics are replaced by asking only for the shortfall, steering the model away
+        from recent topics, before falling back to the built-in list.
+        """
+        history = self.topic_history
+        if history is None:
+            if not self.ai_client:
+                return self._fallback_topics(count)
+            return self._request_topics(count, content_type=content_type)
+        
+        history.load(date)
+        topics: List[str] = []
+        
+        def take(candidates: List[str]):
+            for topic in candidates:
+                if len(topics) < count and history.accept(topic, date):
+                    topics.append(topic)
+        
+        if self.ai_client:
+            for round_number in range(1 + TOPIC_TOPUP_ROUNDS):
+                shortfall = count - len(topics)
+                if shortfall <= 0:
+                    break
+                if round_number:
+                    print(f"  ↳ {shortfall} topic(s) were too similar to recent posts, requesting more...")
+                candidates = self._request_topics(shortfall, avoid=history.recent() if round_number else None,
+                                                  content_type=content_type)
+                if not candidates:
+                    break
+                take(candidates)
+        
+        if len(topics) < count:
+            take(random.sample(FALLBACK_TOPICS, len(FALLBACK_TOPICS)))
+        if len(topics) < count:
+            print(f"⚠️ Only {len(topics)} of {count} topics are new within the last "
+                  f"{history.window_days} days")
+        return topics
+    
+    def _request_topics(self, count: int, avoid: List[str] = None, content_type: str = None) -> List[str]:
+        """Ask the model for topics, or use fallback topics if the request fails"""
+        focus = avoid_text = ""
+        if content_type:
+            focus = (f"\n\nThese are {content_type.replace('_', ' ')} posts: every topic must be about "
+                     f"{profile_for(content_type).topic_focus}.")
+        if avoid:
+            recent = '\n'.join(f"- {topic}" for topic in avoid)
+            avoid_text = f"\n\nDo not repeat or closely paraphrase these recent topics:\n{recent}"
+        request = self.prompts.request('topics', count=count, focus=focus, avoid=avoid_text)
         
-        prompt = f"""Generate {count} engaging post topics for a social media campaign.
-
-Business: Romantic digital pages and love messages
-Niche: {niche}
-Target Audience: {audience}
-
-Topic Categories (mix these):
-1. Emotional storytelling (love stories, memorable moments)
-2. Tips and advice (relationship tips, gift ideas)
-3. Inspirational quotes (about love and relationships)
-4. Product showcases (template examples)
-5. User engagement (questions, polls, challenges)
-6. Seasonal/trending (holidays, awareness days)
-
-Requirements:
-- Each topic should be 3-8 words
-- Make them emotionally engaging
-- Varied content types
-- Some should inspire immediate action
-- Mix educational and entertainment
-
-Return one topic per line, no numbers or bullets."""
-
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=800,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('topics') as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
             topics = [line.strip() for line in message.content[0].text.strip().split('\n') if line.strip()]
             topics = [t.strip('- 0123456789.') for t in topics]
@@ -413,58 +513,15 @@ Return one topic per line, no numbers or bullets."""
     
     def _fallback_topics(self, count: int) -> List[str]:
         """Fallback topics"""
-        topics = [
-            "Why personalized gifts matter most",
-            "Love languages and digital expressions",
-            "Anniversary surprise ideas that work",
-            "Creating memorable birthday moments",
-            "The art of romantic gestures",
-            "Long distance relationship gift ideas",
-            "Proposal ideas that wow",
-            "Celebrating love milestones",
-            "DIY heartful page tutorials",
-            "Love story inspiration",
-            "Valentine's Day alternatives",
-            "Thoughtful gift ideas for partners",
-            "Making ordinary days special",
-            "Digital love letters explained",
-            "Romantic template showcase",
-            "How to choose the perfect photo for your page",
-            "Best quotes about everlasting love",
-            "Tips for planning a memorable anniversary",
-            "Birthdays as new chapters in love stories",
-            "User favorite memory highlights",
-            "Creative ways to say 'I love you' online",
-            "Secrets to keeping romance alive long-distance",
-            "Proposal stories: Community highlights",
-            "Honoring milestones: Anniversaries and beyond",
-            "Gift ideas for every relationship stage",
-            "Spotlight: Real love stories from our users",
-            "Design a page together: Couple challenge",
-            "Making birthdays feel magical",
-            "Anniversary traditions from around the world",
-            "Digital moments that last forever",
-            "From first date to forever: Milestone map",
-            "Top ten romantic gestures in 2024",
-            "Winter romance ideas for couples",
-            "Why digital keepsakes make meaningful gifts",
-            "Valentine’s Day: Beyond the roses",
-            "Cherishing everyday moments with your partner",
-            "How to write an emotional message",
-            "Planning the ultimate surprise for them",
-            "Celebrating love through music and memories",
-            "Favorite love songs for your special page",
-            "Meaningful ways to mark milestones online",
-            "Best practices for group love letters",
-            "New features: What’s possible with our templates",
-            "Monthly couple's challenge: Share your story",
-            "How your love story inspires the world",
-        ]
-        random.shuffle(topics)
-        return topics[:count]
+        return random.sample(FALLBACK_TOPICS, min(count, len(FALLBACK_TOPICS)))
     
     def generate_daily_content_batch(self, date: str = None) -> Dict:
-        """Generate full day's content"""
+        """Generate full day's content
+        
+        The batch is planned up front: post slots are split across content types by the
+        content_strategy ratios, then every topic, caption and hashtag request is issued
+        together (at most llm.max_concurrency at once) before the images are rendered.
+        """
         
         if not date:
             date = datetime.now().strftime('%Y-%m-%d')
@@ -473,40 +530,85 @@ Return one topic per line, no numbers or bullets."""
         print(f"🎨 Generating Content Batch for {date}")
         print(f"{'='*70}\n")
         
-        strategy = self.config['content_strategy']
-        post_count = strategy['daily_content_count']
+        strategy = self.config.content_strategy
+        # Re-read per batch so a long-running daemon picks up the latest ingest
+        insights = load_insights(self.config)
+        slots = plan_batch(
+            strategy.daily_content_count, strategy.content_types, strategy.variation_count,
+            rank_styles=(lambda styles: insights.rank('caption_style', styles)) if insights else None
+        )
+        by_type: Dict[str, List[PostSlot]] = {content_type: [] for content_type in strategy.content_types}
+        for slot in slots:
+            by_type.setdefault(slot.content_type, []).append(slot)
+        by_type = {content_type: type_slots for content_type, type_slots in by_type.items() if type_slots}
+        plan = {content_type: len(type_slots) for content_type, type_slots in by_type.items()}
+        print(f"🗂️ Planned {len(slots)} posts: " + ', '.join(f"{n} {t}" for t, n in plan.items()))
+        
+        # Create the client before fanning out so worker threads share one instance
+        self.ensure_ai_client()
+        with ThreadPoolExecutor(max_workers=self.config.llm.max_concurrency) as pool:
+            print(f"📝 Generating topics for {len(plan)} content types...")
+            topic_jobs = {
+                content_type: pool.submit(self.generate_post_topics, len(type_slots), date, content_type)
+                for content_type, type_slots in by_type.items()
+            }
+            for content_type, job in topic_jobs.items():
+                for slot, topic in zip(by_type[content_type], job.result()):
+                    slot.topic = topic
+            slots = [slot for slot in slots if slot.topic]
+            
+            print(f"✍️ Generating {len(slots) * strategy.variation_count} captions and {len(slots)} hashtag sets...")
+            caption_jobs = {
+                slot.index: [(style, pool.submit(self.generate_caption, slot.topic, style, 'medium', slot.content_type))
+                             for style in slot.caption_styles]
+                for slot in slots
+            }
+            hashtag_jobs = {
+                slot.index: pool.submit(self.generate_hashtags, slot.topic, strategy.hashtag_count)
+                for slot in slots
+            }
+            captions = {index: [(style, job.result()) for style, job in jobs] for index, jobs in caption_jobs.items()}
+            hashtag_sets = {index: job.result() for index, job in hashtag_jobs.items()}
         
-        # Generate topics
-        print(f"📝 Generating {post_count} post topics...")
-        topics = self.generate_post_topics(post_count)
+        # Score every variation in the batch in one pass; the best one per post is recommended
+        np = require('numpy')
+        scores = self.caption_scorer.score_groups(
+            [[caption for _, caption in captions[slot.index]] for slot in slots],
+            [hashtag_sets[slot.index] for slot in slots]
+        )
         
         batch = {
             'date': date,
             'generated_at': datetime.now().isoformat(),
+            'plan': plan,
             'posts': []
         }
         
-        for i, topic in enumerate(topics, 1):
-            print(f"\n[{i}/{post_count}] Creating post: '{topic}'")
-            
-            # Generate caption variations
-            print("  ↳ Generating caption variations...")
-            variations = self.generate_caption_variations(topic, count=3)
+        for i, (slot, post_scores) in enumerate(zip(slots, scores), 1):
+            print(f"\n[{i}/{len(slots)}] Creating {slot.content_type} post: '{slot.topic}'")
+            variations = self._caption_variations(captions[slot.index])
+            if insights is not None:
+                post_scores = post_scores + STYLE_FEEDBACK_WEIGHT * np.clip(
+                    [insights.lift('caption_style', style) for style in slot.caption_styles], -1.0, 1.0
+                )
+            for variation, score in zip(variations, post_scores):
+                variation['score'] = round(float(score), 3)
+            best = variations[int(post_scores.argmax())]
+            best_caption = best['caption']
+            hashtags = hashtag_sets[slot.index]
+            print(f"  ↳ Recommended variation #{best['id']} ({best['style']}, score {best['score']})")
             
-            # Generate hashtags
-            print("  ↳ Generating hashtags...")
-            hashtags = self.generate_hashtags(topic, count=strategy['hashtag_count'])
-            
-            # Create image
-            print("  ↳ Creating image...")
-            best_caption = variations[0]['caption']
-            image_path = self.create_image(best_caption, template_style='romantic')
+            print(f"  ↳ Creating {slot.image_style} image...")
+            image_path = self.create_image(best_caption, template_style=slot.image_style, name=f"{date}_{i}")
             
             # Compile post
             post = {
                 'id': f"{date}_{i}",
-                'topic': topic,
+                'topic': slot.topic,
+                'content_type': slot.content_type,
+                'image_style': slot.image_style,
                 'variations': variations,
+                'recommended_variation': best['id'],
                 'recommended_caption': best_caption,
                 'hashtags': hashtags,
                 'full_post': f"{best_caption}\n\n{' '.join(hashtags)}",
@@ -517,22 +619,40 @@ Return one topic per line, no numbers or bullets."""
             
             batch['posts'].append(post)
             print(f"  ✓ Post #{i} ready!")
-            
-            # Small delay to avoid rate limits
-            time.sleep(0.5)
+        
+        # Recommended captions for the other focus locations, in one fan-out for the
+        # whole batch; topics, images and hashtags are shared by every locale
+        localizer = self.localizer
+        if localizer.enabled and batch['posts']:
+            codes = ', '.join(profile.code for profile in localizer.variants)
+            print(f"🌍 Localizing {len(batch['posts'])} captions for {codes}...")
+            variants = localizer.localize([post['recommended_caption'] for post in batch['posts']])
+            batch['locale'] = localizer.base_code
+            for n, post in enumerate(batch['posts']):
+                post['locales'] = {
+                    code: {'caption': adapted[n], 'full_post': f"{adapted[n]}\n\n{' '.join(post['hashtags'])}"}
+                    for code, adapted in variants.items()
+                }
         
         # Save batch
-        output_dir = Path(self.config['output']['content_directory'])
+        output_dir = Path(self.config.output.content_directory)
         output_file = output_dir / f"content_batch_{date}.json"
         
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(batch, f, indent=2, ensure_ascii=False)
         
+        # Only topics that made it into a saved batch count as posted
+        if self.topic_history is not None:
+            self.topic_history.commit([post['topic'] for post in batch['posts']])
+        
         print(f"\n{'='*70}")
         print(f"✅ Content batch saved: {output_file}")
         print(f"📊 Generated {len(batch['posts'])} posts")
         print(f"{'='*70}\n")
         
+        self.metrics.print_summary()
+        export_run_metrics(self.metrics, self.config)
+        
         return batch
 
 
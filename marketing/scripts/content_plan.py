@@ -0,0 +1,127 @@
+"""
+Daily Batch Planning
+Allocates a day's post slots to content types by the configured ratios before anything is generated
+
+Slots are apportioned with the largest-remainder method, so the mix is as
+close to ``content_strategy.content_types`` as whole posts allow, then
+interleaved so each type is spread across the day instead of bunched together.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+DEFAULT_CAPTION_STYLES = ('romantic', 'inspirational', 'emotional')
+
+
+@dataclass(slots=True)
+class ContentTypeProfile:
+    """How posts of one content type are prompted and styled"""
+    topic_focus: str
+    caption_goal: str
+    caption_styles: Tuple[str, ...]
+    image_style: str
+
+
+CONTENT_TYPE_PROFILES: Dict[str, ContentTypeProfile] = {
+    'educational': ContentTypeProfile(
+        topic_focus="practical tips, how-tos and gift or relationship advice",
+        caption_goal="Teach one specific, useful idea the reader can act on today",
+        caption_styles=('inspirational', 'romantic', 'emotional'),
+        image_style='modern'
+    ),
+    'inspirational': ContentTypeProfile(
+        topic_focus="emotional storytelling, love quotes and memorable moments",
+        caption_goal="Move the reader emotionally and make the post worth sharing",
+        caption_styles=('romantic', 'inspirational', 'emotional'),
+        image_style='romantic'
+    ),
+    'promotional': ContentTypeProfile(
+        topic_focus="template showcases, features and occasions to create a page for",
+        caption_goal="Show what the reader can create and invite them to try it",
+        caption_styles=('promotional', 'romantic', 'inspirational'),
+        image_style='elegant'
+    ),
+    'user_generated': ContentTypeProfile(
+        topic_focus="questions, challenges and invitations for followers to share their own stories",
+        caption_goal="Invite followers to reply, share their story or tag someone",
+        caption_styles=('emotional', 'romantic', 'inspirational'),
+        image_style='romantic'
+    ),
+}
+
+_GENERIC_PROFILE = ContentTypeProfile(
+    topic_focus="a varied mix of engaging topics",
+    caption_goal="Create an emotional hook and a clear call-to-action",
+    caption_styles=DEFAULT_CAPTION_STYLES,
+    image_style='romantic'
+)
+
+
+def profile_for(content_type: str) -> ContentTypeProfile:
+    """Profile for a content type (unknown types get a generic profile)"""
+    return CONTENT_TYPE_PROFILES.get(content_type, _GENERIC_PROFILE)
+
+
+@dataclass(slots=True)
+class PostSlot:
+    """One planned post; the topic is filled in once topics are generated"""
+    index: int
+    content_type: str
+    image_style: str
+    caption_styles: Tuple[str, ...]
+    topic: str = ""
+
+
+def apportion(total: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """Split ``total`` slots by weight with the largest-remainder (Hamilton) method
+
+    Ties on the remainder go to the larger weight, then to the type listed first.
+    """
+    weights = {name: weight for name, weight in weights.items() if weight > 0}
+    weight_sum = sum(weights.values())
+    if total <= 0 or not weights:
+        return {name: 0 for name in weights}
+
+    quotas = {name: total * weight / weight_sum for name, weight in weights.items()}
+    counts = {name: math.floor(quota) for name, quota in quotas.items()}
+    order = list(weights)
+    by_remainder = sorted(
+        weights,
+        key=lambda name: (-(quotas[name] - counts[name]), -weights[name], order.index(name))
+    )
+    for name in by_remainder[:total - sum(counts.values())]:
+        counts[name] += 1
+    return counts
+
+
+def interleave(counts: Dict[str, int]) -> List[str]:
+    """Order slots so each type is spread evenly through the batch"""
+    order = list(counts)
+    positions = [
+        ((k + 0.5) / count, order.index(name), name)
+        for name, count in counts.items()
+        for k in range(count)
+    ]
+    return [name for _, _, name in sorted(positions)]
+
+
+def plan_batch(post_count: int, content_types: Dict[str, float], variation_count: int,
+               rank_styles: Callable[[Sequence[str]], List[str]] = None) -> List[PostSlot]:
+    """Plan a batch: one slot per post with its content type, image style and caption styles
+
+    rank_styles reorders each type's caption styles best first (from engagement
+    insights), which decides the styles generated when variation_count is small.
+    """
+    counts = apportion(post_count, content_types or {'inspirational': 1.0})
+    slots = []
+    for index, content_type in enumerate(interleave(counts), 1):
+        profile = profile_for(content_type)
+        styles = rank_styles(profile.caption_styles) if rank_styles else profile.caption_styles
+        slots.append(PostSlot(
+            index=index,
+            content_type=content_type,
+            image_style=profile.image_style,
+            caption_styles=tuple(styles[i % len(styles)] for i in range(variation_count))
+        ))
+    return slots
@@ -0,0 +1,339 @@
+"""
+Engagement Feedback Loop
+Ingests exported performance CSVs and turns them into insights the generators act on
+
+Exports from Pinterest, Instagram, Buffer or hand-made spreadsheets are streamed
+in chunks into a SQLite store, next to an index of our own posts (content batch
+JSON) and scheduled pins (schedule JSON). Rows are matched by post id, or by
+caption text when an export has no id column or its id is not one of ours (a
+Pinterest export carries Pinterest's own Pin IDs, so pins always match on text). Aggregates per caption style, image
+style, content type, topic and time slot are written to ``insights.json`` in
+``output.analytics_directory``; the content generator and Pinterest scheduler read
+that file (without importing pandas) to rank caption styles and posting times.
+
+Scores are shrunk toward the overall mean (``analytics.prior_weight`` pseudo-posts)
+so a style with two lucky posts does not outrank one with fifty solid ones.
+"""
+
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from lazy_imports import require
+
+STORE_FILE = 'engagement.db'
+INSIGHTS_FILE = 'insights.json'
+DIMENSIONS = ('caption_style', 'image_style', 'content_type', 'topic', 'time_slot')
+
+# Export column names (lowercased) mapped to the fields we keep
+COLUMN_ALIASES = {
+    'post_id': ('post id', 'post_id', 'pin id', 'pin_id', 'id', 'media id', 'external id'),
+    'published_at': ('published_at', 'publish time', 'published', 'date', 'datetime', 'created time',
+                     'sent at', 'posted at'),
+    'impressions': ('impressions', 'reach', 'views'),
+    'engagements': ('engagements', 'total engagements', 'engagement'),
+    'text': ('text', 'caption', 'description', 'title', 'post text'),
+}
+# Summed into engagements when an export has no total column
+ENGAGEMENT_COMPONENTS = ('likes', 'comments', 'saves', 'shares', 'clicks', 'pin clicks',
+                         'outbound clicks', 'reactions', 'repins')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    post_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    topic TEXT,
+    content_type TEXT,
+    caption_style TEXT,
+    image_style TEXT,
+    time_slot TEXT,
+    text_key TEXT,
+    PRIMARY KEY (post_id, date)
+);
+CREATE INDEX IF NOT EXISTS posts_text_key ON posts (text_key);
+CREATE TABLE IF NOT EXISTS engagement (
+    source TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    hour INTEGER,
+    impressions REAL,
+    engagements REAL,
+    PRIMARY KEY (source, post_id, date)
+);
+"""
+
+# Batch posts and schedule items both have unique ids
+_JOINED = """
+SELECT e.post_id, e.date, e.hour, e.impressions, e.engagements,
+       p.topic, p.content_type, p.caption_style, p.image_style, p.time_slot
+FROM engagement e
+JOIN posts p ON p.post_id = e.post_id
+"""
+
+
+def schedule_item_id(template_id: str, date: str, time_slot: str) -> str:
+    """Id of one scheduled pin; a template scheduled in several slots gets one per slot"""
+    return f"{template_id}-{date.replace('-', '')}-{time_slot.replace(':', '')}"
+
+
+def text_key(text: str) -> str:
+    """Normalized caption prefix used to match exports that carry no post id"""
+    return re.sub(r'[^a-z0-9]+', ' ', (text or '').lower()).strip()[:60]
+
+
+def _match_columns(columns: Iterable[str]) -> Dict[str, str]:
+    """Map our field names to the export's actual column names"""
+    lowered = {str(column).strip().lower(): column for column in columns}
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                mapping[field] = lowered[alias]
+                break
+    mapping['components'] = [lowered[name] for name in ENGAGEMENT_COMPONENTS if name in lowered]
+    return mapping
+
+
+def _detect_source(columns: Iterable[str]) -> str:
+    lowered = {str(column).strip().lower() for column in columns}
+    if lowered & {'pin id', 'pin_id', 'repins', 'pin clicks', 'outbound clicks'}:
+        return 'pinterest'
+    if lowered & {'media id', 'reach'}:
+        return 'instagram'
+    if lowered & {'service', 'profile', 'sent at'}:
+        return 'buffer'
+    return 'export'
+
+
+class EngagementStore:
+    """SQLite store of our posts and their exported engagement numbers"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def index_outputs(self, content_directory: str, schedules_directory: str) -> int:
+        """(Re)index posts from content batch JSON and scheduled pins from schedule JSON"""
+        rows = []
+        for batch_file in sorted(Path(content_directory).glob('content_batch_*.json')):
+            with open(batch_file, 'r', encoding='utf-8') as f:
+                batch = json.load(f)
+            for post in batch.get('posts', []):
+                chosen = next((v for v in post.get('variations', [])
+                               if v.get('id') == post.get('recommended_variation')), None)
+                chosen = chosen or (post.get('variations') or [{}])[0]
+                rows.append((post['id'], batch['date'], 'post', post.get('topic'), post.get('content_type'),
+                             chosen.get('style'), post.get('image_style'), None,
+                             text_key(post.get('recommended_caption'))))
+
+        for schedule_file in sorted(Path(schedules_directory).glob('pinterest_schedule_*.json')):
+            with open(schedule_file, 'r', encoding='utf-8') as f:
+                for item in json.load(f):
+                    # Schedules written before items had their own id
+                    item_id = item.get('schedule_id') or schedule_item_id(item['pin_id'], item['date'], item['time'])
+                    rows.append((item_id, item['date'], 'pin', item.get('title'), None,
+                                 None, item.get('style'), item.get('time'), text_key(item.get('description'))))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM posts")
+            self.conn.executemany("INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def ingest_csv(self, path: str, source: str = None, chunksize: int = 5000) -> Dict[str, int]:
+        """Stream one export into the store; re-ingesting the same rows replaces them"""
+        pd = require('pandas')
+        ingested = skipped = 0
+        known_ids = {post_id for post_id, in self.conn.execute("SELECT post_id FROM posts")}
+        # text key -> {date or "date hour": post id}; a pin description repeats in every slot its template fills
+        text_ids: Dict[str, Dict[str, str]] = {}
+        for key, date, time_slot, post_id in self.conn.execute(
+                "SELECT text_key, date, time_slot, post_id FROM posts WHERE text_key != '' ORDER BY date, time_slot"):
+            candidates = text_ids.setdefault(key, {})
+            candidates.setdefault(date, post_id)
+            if time_slot:
+                candidates.setdefault(f"{date} {int(time_slot.split(':')[0])}", post_id)
+
+        def match_text(text, date: str, hour) -> Optional[str]:
+            candidates = text_ids.get(text_key(text)) if isinstance(text, str) else None
+            if not candidates:
+                return None
+            return candidates.get(f"{date} {hour}") or candidates.get(date) or next(iter(candidates.values()))
+
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, skipinitialspace=True):
+            columns = _match_columns(chunk.columns)
+            source = source or _detect_source(chunk.columns)
+
+            if 'post_id' not in columns and 'text' not in columns:
+                raise ValueError(f"{path}: no post id or text column (columns: {', '.join(chunk.columns)})")
+
+            published = pd.to_datetime(chunk[columns['published_at']], errors='coerce', format='mixed') \
+                if 'published_at' in columns else pd.Series(pd.NaT, index=chunk.index)
+            dates = published.dt.strftime('%Y-%m-%d').fillna('')
+            hours = published.dt.hour.astype('Int64')
+
+            by_text = pd.Series([match_text(text, date, hour)
+                                 for text, date, hour in zip(chunk[columns['text']], dates, hours)],
+                                index=chunk.index, dtype=object) if 'text' in columns else None
+            if 'post_id' in columns:
+                post_ids = chunk[columns['post_id']].str.strip()
+                if by_text is not None:
+                    # Ids that are not ours (e.g. Pinterest Pin IDs) match on text instead
+                    post_ids = post_ids.where(post_ids.isin(known_ids) | by_text.isna(), by_text)
+            else:
+                post_ids = by_text
+
+            def numeric(column):
+                return pd.to_numeric(chunk[column].str.replace(',', ''), errors='coerce')
+
+            impressions = numeric(columns['impressions']) if 'impressions' in columns else None
+            if 'engagements' in columns:
+                engagements = numeric(columns['engagements'])
+            elif columns['components']:
+                engagements = sum(numeric(column).fillna(0) for column in columns['components'])
+            else:
+                raise ValueError(f"{path}: no engagement columns (expected one of "
+                                 f"{', '.join(COLUMN_ALIASES['engagements'] + ENGAGEMENT_COMPONENTS)})")
+
+            frame = pd.DataFrame({
+                'post_id': post_ids,
+                'date': dates,
+                'hour': hours,
+                'impressions': impressions,
+                'engagements': engagements
+            }).dropna(subset=['post_id'])
+            skipped += len(chunk) - len(frame)
+            frame = frame.astype(object).where(frame.notna(), None)
+
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO engagement VALUES (?, ?, ?, ?, ?, ?)",
+                    ((source, *row) for row in frame.itertuples(index=False))
+                )
+            ingested += len(frame)
+        return {'ingested': ingested, 'skipped': skipped}
+
+    def frame(self):
+        """Engagement rows joined to the posts they belong to, as a DataFrame"""
+        return require('pandas').read_sql_query(_JOINED, self.conn)
+
+
+def aggregate(frame, prior_weight: float = 5.0) -> Dict:
+    """Per-dimension performance from joined engagement rows
+
+    Rows are first summed per post and day, then each dimension value gets the
+    mean post metric plus a score shrunk toward the overall mean.
+    """
+    np = require('numpy')
+    if frame.empty:
+        return {'metric': None, 'posts': 0, 'overall': None, 'dimensions': {}}
+
+    frame = frame.copy()
+    frame['time_slot'] = frame['time_slot'].where(
+        frame['time_slot'].notna(), frame['hour'].map(lambda hour: f"{int(hour):02d}:00", na_action='ignore')
+    )
+    keys = ['post_id', 'date']
+    posts = frame.groupby(keys, as_index=False).agg(
+        {'impressions': 'sum', 'engagements': 'sum', **{dim: 'first' for dim in DIMENSIONS}}
+    )
+
+    use_rate = bool((posts['impressions'] > 0).any())
+    metric = 'engagement_rate' if use_rate else 'engagements'
+    if use_rate:
+        posts = posts[posts['impressions'] > 0].assign(value=lambda rows: rows['engagements'] / rows['impressions'])
+    else:
+        posts = posts.assign(value=posts['engagements'])
+
+    overall = float(posts['value'].mean())
+    dimensions = {}
+    for dim in DIMENSIONS:
+        grouped = posts.dropna(subset=[dim]).groupby(dim)['value'].agg(['count', 'mean'])
+        scores = (grouped['count'] * grouped['mean'] + prior_weight * overall) / (grouped['count'] + prior_weight)
+        dimensions[dim] = {
+            str(value): {'posts': int(row['count']), 'mean': round(float(row['mean']), 6),
+                         'score': round(float(score), 6)}
+            for (value, row), score in zip(grouped.iterrows(), np.asarray(scores))
+        }
+
+    return {'metric': metric, 'posts': int(len(posts)), 'overall': round(overall, 6), 'dimensions': dimensions}
+
+
+class EngagementInsights:
+    """Aggregates from insights.json, consulted when planning batches and schedules"""
+
+    def __init__(self, data: Dict, min_samples: int = 3):
+        self.data = data
+        self.min_samples = min_samples
+        self.overall = data.get('overall') or 0.0
+
+    @classmethod
+    def load(cls, analytics_directory: str, min_samples: int = 3) -> Optional['EngagementInsights']:
+        path = Path(analytics_directory) / INSIGHTS_FILE
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data, min_samples) if data.get('posts') else None
+
+    def score(self, dimension: str, value: str) -> float:
+        """Shrunk score for a value, or the overall mean when it has too few posts"""
+        entry = self.data.get('dimensions', {}).get(dimension, {}).get(str(value))
+        if not entry or entry['posts'] < self.min_samples:
+            return self.overall
+        return entry['score']
+
+    def lift(self, dimension: str, value: str) -> float:
+        """Relative performance versus the overall mean (0 = average, 0.2 = 20% better)"""
+        if not self.overall:
+            return 0.0
+        return self.score(dimension, value) / self.overall - 1.0
+
+    def rank(self, dimension: str, values: Sequence[str]) -> List[str]:
+        """Values ordered best first; values without enough data keep their relative order"""
+        return sorted(values, key=lambda value: -self.score(dimension, value))
+
+    def rank_time_slots(self, configured: Sequence[str]) -> List[str]:
+        """Configured posting times plus well-sampled observed slots, best first"""
+        observed = [slot for slot, entry in self.data.get('dimensions', {}).get('time_slot', {}).items()
+                    if entry['posts'] >= self.min_samples and slot not in configured]
+        return self.rank('time_slot', list(configured) + sorted(observed))
+
+
+def load_insights(config) -> Optional[EngagementInsights]:
+    """Current insights for a config, or None if feedback is off or nothing was ingested yet"""
+    if not config.analytics.feedback:
+        return None
+    return EngagementInsights.load(config.output.analytics_directory, config.analytics.min_samples)
+
+
+def run_ingest(config, csv_paths: Sequence[str], source: str = None) -> Dict:
+    """Index our outputs, ingest exports, and rewrite insights.json; returns a summary"""
+    output = config.output
+    analytics_dir = Path(output.analytics_directory)
+    store = EngagementStore(analytics_dir / STORE_FILE)
+    try:
+        indexed = store.index_outputs(output.content_directory, output.schedules_directory)
+        files = {str(path): store.ingest_csv(path, source) for path in csv_paths}
+        insights = aggregate(store.frame(), config.analytics.prior_weight)
+    finally:
+        store.close()
+
+    insights['generated_at'] = datetime.now().isoformat()
+    insights_path = analytics_dir / INSIGHTS_FILE
+    # Generators in a running daemon read this file; they only ever see a complete one
+    tmp = insights_path.with_name(f".{INSIGHTS_FILE}.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(insights, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, insights_path)
+
+    return {'indexed_posts': indexed, 'files': files, 'matched_posts': insights['posts'],
+            'metric': insights['metric'], 'insights_path': str(insights_path)}
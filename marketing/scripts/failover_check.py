@@ -0,0 +1,82 @@
+"""
+LLM Failover Check
+Runs provider failover, circuit breaking and hedging against scripted providers offline
+
+Usage:
+    python scripts/cli.py failover-check
+"""
+
+import time
+from types import SimpleNamespace
+from typing import Dict
+
+from llm_clients import make_response
+from llm_providers import CircuitBreaker, Provider, ProviderChain
+
+
+def _scripted_client(*outcomes):
+    """Client whose calls return text, sleep (a number) or raise, in turn; the last outcome repeats"""
+    calls = []
+
+    def create(**request):
+        calls.append(request)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, (int, float)):
+            time.sleep(outcome)
+            outcome = 'slow'
+        return make_response(outcome)
+
+    return SimpleNamespace(messages=SimpleNamespace(create=create), calls=calls)
+
+
+def run_checks() -> Dict[str, bool]:
+    """Run failover, circuit breaking and hedging against scripted providers; check name -> passed"""
+    checks = {}
+    request = {'model': 'primary-model', 'max_tokens': 16, 'messages': []}
+
+    def text(message) -> str:
+        return message.content[0].text
+
+    now = [0.0]
+    down = _scripted_client(ConnectionError("provider down"))
+    primary = Provider('primary', down, breaker=CircuitBreaker(2, 30.0, clock=lambda: now[0]))
+    chain = ProviderChain([primary, Provider('secondary', _scripted_client('secondary'))], max_workers=2)
+    checks['failover answers from the secondary'] = text(chain.messages.create(**request)) == 'secondary'
+    chain.messages.create(**request)
+    checks['breaker opens after consecutive failures'] = primary.breaker.state == 'open'
+    chain.messages.create(**request)
+    checks['open breaker skips the provider'] = len(down.calls) == 2
+
+    now[0] = 31.0
+    checks['breaker half-opens after reset_seconds'] = primary.breaker.state == 'half_open'
+    primary.client = _scripted_client('primary')
+    checks['half-open trial reaches the recovered provider'] = text(chain.messages.create(**request)) == 'primary'
+    checks['successful trial closes the breaker'] = primary.breaker.state == 'closed'
+
+    bad_request = ValueError("bad request")
+    bad_request.status_code = 400
+    flaky = Provider('flaky', _scripted_client(ConnectionError("down"), bad_request, ConnectionError("down")),
+                     breaker=CircuitBreaker(2, 30.0))
+    for _ in range(3):
+        try:
+            flaky.create(request)
+        except Exception:
+            pass
+    checks['request errors do not reset the failure count'] = flaky.breaker.state == 'open'
+
+    timed = Provider('timed', _scripted_client('ok'))
+    for _ in range(3):
+        timed.create(request)
+    checks['latency windows are kept per model'] = (timed.p95(3, 'primary-model') is not None
+                                                    and timed.p95(3, 'other-model') is None)
+
+    hedging = ProviderChain([Provider('slow', _scripted_client(0.5)), Provider('fast', _scripted_client('fast'))],
+                            hedge_delay=0.05, max_workers=2)
+    checks['hedge beats a slow primary'] = (text(hedging.messages.create(hedge=True, **request)) == 'fast'
+                                            and hedging.hedge_wins == 1)
+
+    for pool in (chain, hedging):
+        pool._executor.shutdown(wait=False)
+    return checks
@@ -0,0 +1,254 @@
+"""
+Idea Pin Renderer
+Renders multi-page Pinterest Idea Pins in parallel from page specs
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from pin_renderer import (
+    PIN_COLOR_SCHEMES,
+    PreviewCache,
+    load_font,
+    vertical_gradient,
+)
+
+
+IDEA_PIN_SIZE = (1080, 1920)  # 9:16, Pinterest Idea Pin format
+MIN_PAGES = 2
+MAX_PAGES = 20
+# Bundles with fewer pages render in-process: starting workers and loading their
+# fonts costs more than rendering a handful of pages
+MIN_PARALLEL_PAGES = 8
+
+# Preview box for 'image_focus' pages, fixed so the cached thumbnail is shared by every page
+IMAGE_FOCUS_PREVIEW_SIZE = (920, 1100)
+IMAGE_FOCUS_PREVIEW_Y = 520
+
+
+def wrap_text(draw, text: str, font, max_width: int) -> List[str]:
+    """Greedy word wrap measured with the real font"""
+    lines = []
+    current_line = []
+
+    for word in text.split():
+        current_line.append(word)
+        bbox = draw.textbbox((0, 0), ' '.join(current_line), font=font)
+        if bbox[2] - bbox[0] > max_width and len(current_line) > 1:
+            current_line.pop()
+            lines.append(' '.join(current_line))
+            current_line = [word]
+
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines
+
+
+class IdeaPinRenderer:
+    """Render Idea Pin pages over a shared per-style base layer
+
+    Large bundles render in a worker pool that is started once and reused by
+    every later bundle; ``close()`` shuts it down.
+    """
+
+    def __init__(self, page_size: Tuple[int, int], brand_name: str, preview_cache_dir: Optional[str] = None):
+        self.page_size = page_size
+        self.brand_name = brand_name
+        self.preview_cache = PreviewCache(preview_cache_dir) if preview_cache_dir else None
+        self._base_layers: Dict[str, Image.Image] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+
+    def _worker_pool(self, workers: int) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers < workers:
+                if self._pool is not None:
+                    self._pool.shutdown()
+                cache_dir = str(self.preview_cache.cache_dir) if self.preview_cache else None
+                self._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(self.page_size, self.brand_name, cache_dir)
+                )
+                self._pool_workers = workers
+            return self._pool
+
+    def close(self):
+        """Shut down the worker pool, if one was started"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+                self._pool_workers = 0
+
+    def colors_for(self, style: str) -> Dict:
+        """Get the color scheme for a style"""
+        return PIN_COLOR_SCHEMES.get(style, PIN_COLOR_SCHEMES['romantic'])
+
+    def base_layer(self, style: str) -> Image.Image:
+        """Gradient, corner accents and watermark shared by every page of a style"""
+        base = self._base_layers.get(style)
+        if base is not None:
+            return base
+
+        colors = self.colors_for(style)
+        width, height = self.page_size
+        base = vertical_gradient(self.page_size, colors['bg_top'], colors['bg_bottom'])
+        draw = ImageDraw.Draw(base, 'RGBA')
+
+        # Translucent corner accents
+        for x, y in [(60, 60), (width - 140, 60), (60, height - 220), (width - 140, height - 220)]:
+            draw.ellipse([x, y, x + 80, y + 80], fill=colors['accent'] + (120,))
+
+        # Watermark
+        watermark_font = load_font(40)
+        bbox = draw.textbbox((0, 0), self.brand_name, font=watermark_font)
+        draw.text(((width - (bbox[2] - bbox[0])) // 2, height - 90), self.brand_name,
+                  fill=colors['text'], font=watermark_font)
+
+        self._base_layers[style] = base
+        return base
+
+    def _draw_centered_lines(self, draw, lines: List[str], font, y: int, line_height: int, color) -> int:
+        """Draw centered lines starting at y, returning the y below the last line"""
+        for line in lines:
+            bbox = draw.textbbox((0, 0), line, font=font)
+            x = (self.page_size[0] - (bbox[2] - bbox[0])) // 2
+            draw.text((x + 3, y + 3), line, fill=(0, 0, 0, 90), font=font)
+            draw.text((x, y), line, fill=color, font=font)
+            y += line_height
+        return y
+
+    def render_page(self, page: Dict, total_pages: int, style: str = "romantic",
+                    preview_path: Optional[str] = None) -> Image.Image:
+        """Render one page spec ({'page', 'type', 'text', 'style'}) to an RGB image"""
+        colors = self.colors_for(style)
+        width, height = self.page_size
+        max_text_width = width - 160
+
+        img = self.base_layer(style).copy()
+        draw = ImageDraw.Draw(img, 'RGBA')
+        layout = page.get('style', 'text_heavy')
+        text = page.get('text', '')
+
+        if layout == 'bold_title':
+            font = load_font(96)
+            lines = wrap_text(draw, text, font, max_text_width)[:6]
+            y = (height - len(lines) * 120) // 2
+            self._draw_centered_lines(draw, lines, font, y, 120, colors['text'])
+
+        elif layout == 'image_focus':
+            font = load_font(64)
+            lines = wrap_text(draw, text, font, max_text_width)[:3]
+            self._draw_centered_lines(draw, lines, font, 220, 84, colors['text'])
+
+            if preview_path and self.preview_cache and os.path.exists(preview_path):
+                preview, margin = self.preview_cache.get(preview_path, IMAGE_FOCUS_PREVIEW_SIZE)
+                x = (width - preview.width) // 2
+                img.paste(preview, (x, IMAGE_FOCUS_PREVIEW_Y - margin), preview)
+
+        elif layout == 'call_to_action':
+            font = load_font(80)
+            lines = wrap_text(draw, text, font, max_text_width - 120)[:4]
+            block_height = len(lines) * 100
+            top = (height - block_height) // 2
+            draw.rounded_rectangle(
+                [80, top - 60, width - 80, top + block_height + 60],
+                radius=40, fill=colors['accent'] + (230,)
+            )
+            self._draw_centered_lines(draw, lines, font, top, 100, colors['text'])
+
+        else:  # text_heavy and unknown layouts
+            font = load_font(56)
+            lines = wrap_text(draw, text, font, max_text_width)[:18]
+            self._draw_centered_lines(draw, lines, font, 320, 76, colors['text'])
+
+        # Page indicator
+        indicator = f"{page.get('page', 1)} / {total_pages}"
+        indicator_font = load_font(36)
+        bbox = draw.textbbox((0, 0), indicator, font=indicator_font)
+        draw.text((width - (bbox[2] - bbox[0]) - 60, 60), indicator, fill=colors['text'], font=indicator_font)
+
+        return img
+
+    def render_bundle(self, pages: List[Dict], output_dir: str, style: str = "romantic",
+                      preview_path: Optional[str] = None, workers: Optional[int] = None) -> List[str]:
+        """Render all pages (in parallel for large bundles) and return their paths in page order"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        jobs = [
+            (page, len(pages), style, preview_path, str(output_dir / f"page_{index:02d}.png"))
+            for index, page in enumerate(pages, 1)
+        ]
+
+        # Warm the preview cache once so workers only read the cached thumbnail
+        if preview_path and self.preview_cache and os.path.exists(preview_path):
+            self.preview_cache.get(preview_path, IMAGE_FOCUS_PREVIEW_SIZE)
+
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers <= 1 or len(jobs) < MIN_PARALLEL_PAGES:
+            return [_save_page(self, job) for job in jobs]
+
+        # map() preserves submission order, so the bundle stays ordered
+        return list(self._worker_pool(workers).map(_render_page_job, jobs))
+
+
+_worker_renderer: Optional[IdeaPinRenderer] = None
+
+
+def _init_worker(page_size: Tuple[int, int], brand_name: str, preview_cache_dir: Optional[str]):
+    """Build one renderer per worker process so base layers are cached per process"""
+    global _worker_renderer
+    _worker_renderer = IdeaPinRenderer(page_size, brand_name, preview_cache_dir)
+
+
+def _render_page_job(job: Tuple) -> str:
+    """Process pool entry point"""
+    return _save_page(_worker_renderer, job)
+
+
+def _save_page(renderer: IdeaPinRenderer, job: Tuple) -> str:
+    """Render and encode a page (encoding is done in the worker too)"""
+    page, total_pages, style, preview_path, out_path = job
+    renderer.render_page(page, total_pages, style, preview_path).save(out_path, optimize=True)
+    return out_path
+
+
+def write_slideshow(page_paths: List[str], output_path: str, seconds_per_page: float = 3.0) -> Optional[str]:
+    """Write an ordered GIF or MP4 slideshow of the rendered pages (format from the extension)"""
+    output_path = str(output_path)
+
+    if output_path.lower().endswith('.gif'):
+        frames = []
+        for path in page_paths:
+            with Image.open(path) as img:
+                frames.append(img.convert('RGB').reduce(2).quantize(colors=128))
+        frames[0].save(
+            output_path,
+            save_all=True,
+            append_images=frames[1:],
+            duration=int(seconds_per_page * 1000),
+            loop=0,
+            optimize=True
+        )
+        return output_path
+
+    try:
+        try:
+            from moviepy import ImageSequenceClip
+        except ImportError:
+            from moviepy.editor import ImageSequenceClip
+    except ImportError:
+        print("  ⚠️ moviepy not installed, skipping MP4 slideshow")
+        return None
+
+    clip = ImageSequenceClip(list(page_paths), durations=[seconds_per_page] * len(page_paths))
+    clip.write_videofile(output_path, fps=24, codec='libx264', audio=False, logger=None)
+    return output_path
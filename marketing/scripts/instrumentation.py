@@ -0,0 +1,323 @@
+"""
+Run Instrumentation
+Per-stage timing and token-usage spans with JSON and Prometheus textfile export
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class Span:
+    """A single timed stage, optionally carrying LLM token usage"""
+
+    __slots__ = (
+        'stage', 'attrs', 'started_at', 'duration', 'input_tokens', 'output_tokens',
+        'cache_read_tokens', 'cache_creation_tokens', 'cache_hits', 'retries', 'error'
+    )
+
+    def __init__(self, stage: str, attrs: Dict):
+        self.stage = stage
+        self.attrs = attrs
+        self.started_at = time.perf_counter()
+        self.duration = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.error = None
+
+    def record_usage(self, message) -> None:
+        """Add the token usage of an Anthropic ``messages.create`` response"""
+        usage = getattr(message, 'usage', None)
+        if usage is None:
+            return
+        self.input_tokens += getattr(usage, 'input_tokens', 0) or 0
+        self.output_tokens += getattr(usage, 'output_tokens', 0) or 0
+        self.cache_read_tokens += getattr(usage, 'cache_read_input_tokens', 0) or 0
+        self.cache_creation_tokens += getattr(usage, 'cache_creation_input_tokens', 0) or 0
+
+    def cache_hit(self, count: int = 1) -> None:
+        """Count a local cache hit that saved work in this stage"""
+        self.cache_hits += count
+
+    def retry(self, count: int = 1) -> None:
+        """Count a retried attempt in this stage"""
+        self.retries += count
+
+
+class StageStats:
+    """Aggregated spans for one stage"""
+
+    __slots__ = (
+        'calls', 'errors', 'total_seconds', 'min_seconds', 'max_seconds', 'durations',
+        'input_tokens', 'output_tokens', 'cache_read_tokens', 'cache_creation_tokens',
+        'cache_hits', 'retries'
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.min_seconds = float('inf')
+        self.max_seconds = 0.0
+        self.durations: List[float] = []
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_creation_tokens = 0
+        self.cache_hits = 0
+        self.retries = 0
+
+    def add(self, span: Span) -> None:
+        self.calls += 1
+        self.errors += 1 if span.error else 0
+        self.total_seconds += span.duration
+        self.min_seconds = min(self.min_seconds, span.duration)
+        self.max_seconds = max(self.max_seconds, span.duration)
+        self.durations.append(span.duration)
+        self.input_tokens += span.input_tokens
+        self.output_tokens += span.output_tokens
+        self.cache_read_tokens += span.cache_read_tokens
+        self.cache_creation_tokens += span.cache_creation_tokens
+        self.cache_hits += span.cache_hits
+        self.retries += span.retries
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile of span durations"""
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[rank - 1]
+
+    def to_dict(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_seconds': round(self.total_seconds, 6),
+            'mean_seconds': round(self.total_seconds / self.calls, 6) if self.calls else 0.0,
+            'min_seconds': round(self.min_seconds, 6) if self.calls else 0.0,
+            'p50_seconds': round(self.percentile(0.50), 6),
+            'p95_seconds': round(self.percentile(0.95), 6),
+            'max_seconds': round(self.max_seconds, 6),
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cache_read_tokens': self.cache_read_tokens,
+            'cache_creation_tokens': self.cache_creation_tokens,
+            'cache_hits': self.cache_hits,
+            'retries': self.retries
+        }
+
+
+class RunMetrics:
+    """Collects spans for one automator run; safe to use from worker threads"""
+
+    def __init__(self, component: str):
+        self.component = component
+        self.run_id = f"{component}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        self._stages: Dict[str, StageStats] = {}
+        self._prompts: Dict[str, str] = {}
+        self._routes: Dict[str, Dict] = {}
+        self._sources: Dict[str, Callable[[], Dict]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str, **attrs) -> Iterator[Span]:
+        """Time a stage; exceptions are recorded and re-raised"""
+        span = Span(stage, attrs)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span.started_at
+            with self._lock:
+                stats = self._stages.get(stage)
+                if stats is None:
+                    stats = self._stages[stage] = StageStats()
+                stats.add(span)
+
+    def use_prompt(self, name: str, key: str, route: Optional[Dict] = None) -> None:
+        """Note the version (and model route) of a prompt used in this run (see prompts.py)"""
+        if self._prompts.get(name) != key or self._routes.get(name) != route:
+            with self._lock:
+                self._prompts[name] = key
+                if route is not None:
+                    self._routes[name] = route
+
+    def attach(self, name: str, source: Callable[[], Dict]) -> None:
+        """Include ``source()`` under ``name`` in every report (e.g. LLM provider health)"""
+        with self._lock:
+            self._sources[name] = source
+
+    def stage(self, stage: str) -> Optional[StageStats]:
+        """Aggregates for a stage, if it ran"""
+        return self._stages.get(stage)
+
+    def report(self) -> Dict:
+        """Per-run summary with per-stage aggregates and token totals"""
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in sorted(self._stages.items())}
+            prompts = dict(sorted(self._prompts.items()))
+            # A task's stage has the same name as its prompt
+            routes = {
+                name: {**route, **self._route_latency(name, route.get('max_latency'))}
+                for name, route in sorted(self._routes.items())
+            }
+            sources = dict(self._sources)
+
+        totals = {
+            key: sum(stage[key] for stage in stages.values())
+            for key in ('calls', 'errors', 'input_tokens', 'output_tokens', 'cache_read_tokens',
+                        'cache_creation_tokens', 'cache_hits', 'retries')
+        }
+        # input_tokens counts only uncached input; cache reads and writes are billed separately
+        prompt_tokens = totals['input_tokens'] + totals['cache_read_tokens'] + totals['cache_creation_tokens']
+        totals['cached_input_ratio'] = round(totals['cache_read_tokens'] / prompt_tokens, 4) if prompt_tokens else 0.0
+        return {
+            'run_id': self.run_id,
+            'component': self.component,
+            'started_at': self.started_at,
+            'wall_seconds': round(time.perf_counter() - self._start, 6),
+            'totals': totals,
+            'stages': stages,
+            'prompts': prompts,
+            'routes': routes,
+            **{name: source() for name, source in sources.items()}
+        }
+
+    def _route_latency(self, stage: str, budget: Optional[float]) -> Dict:
+        """Achieved latency of a routed task's stage against its budget"""
+        stats = self._stages.get(stage)
+        if stats is None:
+            return {'calls': 0}
+        return {
+            'calls': stats.calls,
+            'errors': stats.errors,
+            'p50_seconds': round(stats.percentile(0.50), 6),
+            'p95_seconds': round(stats.percentile(0.95), 6),
+            'over_budget': sum(1 for d in stats.durations if budget and d > budget)
+        }
+
+    def write_report(self, reports_dir: str, prometheus_path: Optional[str] = None) -> str:
+        """Write the JSON report (one file per run, rewritten as the run progresses)"""
+        reports_dir = Path(reports_dir)
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        report = self.report()
+
+        report_file = reports_dir / f"metrics_{self.run_id}.json"
+        atomic_write(report_file, json.dumps(report, indent=2))
+
+        if prometheus_path:
+            atomic_write(Path(prometheus_path), self.to_prometheus(report))
+
+        return str(report_file)
+
+    def to_prometheus(self, report: Optional[Dict] = None) -> str:
+        """Render the report in Prometheus text exposition format (node_exporter textfile)"""
+        report = report or self.report()
+        metrics = [
+            ('stage_calls_total', 'calls', 'Stage executions'),
+            ('stage_errors_total', 'errors', 'Stage executions that raised'),
+            ('stage_duration_seconds_total', 'total_seconds', 'Wall time spent in stage'),
+            ('stage_duration_seconds_p95', 'p95_seconds', 'p95 wall time per stage execution'),
+            ('stage_input_tokens_total', 'input_tokens', 'LLM input tokens'),
+            ('stage_output_tokens_total', 'output_tokens', 'LLM output tokens'),
+            ('stage_cache_read_tokens_total', 'cache_read_tokens', 'LLM input tokens read from prompt cache'),
+            ('stage_cache_creation_tokens_total', 'cache_creation_tokens', 'LLM input tokens written to prompt cache'),
+            ('stage_cache_hits_total', 'cache_hits', 'Local cache hits'),
+            ('stage_retries_total', 'retries', 'Retried attempts')
+        ]
+
+        lines = []
+        for name, key, help_text in metrics:
+            metric = f"marketing_{name}"
+            metric_type = 'gauge' if key == 'p95_seconds' else 'counter'
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for stage, stats in report['stages'].items():
+                lines.append(
+                    f'{metric}{{component="{report["component"]}",stage="{stage}"}} {stats[key]}'
+                )
+
+        providers = report.get('providers', {}).get('providers', {})
+        if providers:
+            lines.append("# HELP marketing_llm_provider_failures_total LLM provider calls that failed")
+            lines.append("# TYPE marketing_llm_provider_failures_total counter")
+            for name, stats in providers.items():
+                lines.append(f'marketing_llm_provider_failures_total{{component="{report["component"]}",'
+                             f'provider="{name}"}} {stats["failures"]}')
+            lines.append("# HELP marketing_llm_provider_circuit_open Whether a provider's circuit breaker is open")
+            lines.append("# TYPE marketing_llm_provider_circuit_open gauge")
+            for name, stats in providers.items():
+                lines.append(f'marketing_llm_provider_circuit_open{{component="{report["component"]}",'
+                             f'provider="{name}"}} {int(stats["circuit"] != "closed")}')
+
+        lines.append("# HELP marketing_run_wall_seconds Wall time of the run so far")
+        lines.append("# TYPE marketing_run_wall_seconds gauge")
+        lines.append(f'marketing_run_wall_seconds{{component="{report["component"]}"}} {report["wall_seconds"]}')
+        return '\n'.join(lines) + '\n'
+
+    def print_summary(self) -> None:
+        """Print the slowest stages and token totals"""
+        report = self.report()
+        print(f"\n📊 Stage timings ({report['wall_seconds']:.1f}s total):")
+        ordered = sorted(report['stages'].items(), key=lambda item: item[1]['total_seconds'], reverse=True)
+        for stage, stats in ordered:
+            route = report['routes'].get(stage)
+            model = f" [{route['model']}]" if route else ''
+            tokens = ''
+            if stats['input_tokens'] or stats['output_tokens']:
+                cached = stats['cache_read_tokens'] + stats['cache_creation_tokens']
+                cached = f" (+{stats['cache_read_tokens']} cached, {stats['cache_creation_tokens']} written)" if cached else ''
+                tokens = f" | {stats['input_tokens']} in{cached} / {stats['output_tokens']} out tokens"
+            print(f"  {stage:<20} {stats['calls']:>4}x  {stats['total_seconds']:>8.2f}s{model}{tokens}")
+        totals = report['totals']
+        if totals['cache_read_tokens'] or totals['cache_creation_tokens']:
+            print(f"  prompt cache: {totals['cached_input_ratio']:.0%} of input tokens read from cache")
+        providers = report.get('providers')
+        if providers and (providers['short_circuited'] or providers['hedged']
+                          or any(stats['failures'] for stats in providers['providers'].values())):
+            health = ', '.join(f"{name} {stats['calls']} calls/{stats['failures']} failed ({stats['circuit']})"
+                               for name, stats in providers['providers'].items())
+            print(f"  providers: {health}; {providers['short_circuited']} short-circuited, "
+                  f"{providers['hedged']} hedged ({providers['hedge_wins']} won)")
+
+
+def export_run_metrics(metrics: RunMetrics, config) -> str:
+    """Write a run's metrics to the configured reports directory (and Prometheus textfile)"""
+    report_file = metrics.write_report(
+        config.output.reports_directory,
+        config.instrumentation.prometheus_textfile or None
+    )
+    print(f"📊 Metrics report: {report_file}")
+    return report_file
+
+
+def atomic_write(path: Path, content: str) -> None:
+    """Write via a temp file and rename so readers never see a partial file
+
+    The temp name is unique per process and thread, so concurrent writers of the
+    same file never rename each other's half-written data into place.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
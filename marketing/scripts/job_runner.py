@@ -0,0 +1,440 @@
+"""
+Batch Job Runner
+Runs many automation jobs from one JSON/YAML spec in a single process
+
+Automators are created once per config and reused across jobs, so API clients,
+connection pools, fonts and render caches stay warm. Independent jobs run
+concurrently; ``depends_on`` orders the rest and passes results along.
+
+Example spec (YAML or the equivalent JSON):
+
+    concurrency: 4
+    defaults:
+      config: config.json
+    jobs:
+      - id: pins
+        task: pins
+      - id: schedule
+        task: schedule
+        days: 14
+        depends_on: [pins]
+      - id: daily
+        task: content-batch
+        configs: [config.json, brand_b.json]
+        dates: [2025-02-13, 2025-02-14]
+
+With ``tenants: tenants.json`` at the top level, ``brands: [heartful, lovenotes]``
+(or ``brands: all``) expands a job per brand instead of per config file; all
+brands share LLM clients, rate limits and render caches (see tenants.py).
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from lazy_imports import require
+from settings import ConfigError, ConfigWatcher, load_config
+from tenants import AutomatorPool, TenantRegistry
+
+
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_INVALID_SPEC = 2
+
+
+class JobSpecError(ValueError):
+    """The job spec is malformed (unknown task, bad dependency, cycle...)"""
+
+
+class Job:
+    """One expanded unit of work"""
+
+    __slots__ = ('id', 'base_id', 'task', 'config', 'params', 'depends_on',
+                 'status', 'seconds', 'summary', 'result', 'error')
+
+    def __init__(self, job_id: str, base_id: str, task: str, config: str, params: Dict, depends_on: List[str]):
+        self.id = job_id
+        self.base_id = base_id
+        self.task = task
+        self.config = config
+        self.params = params
+        self.depends_on = depends_on
+        self.status = 'pending'
+        self.seconds = 0.0
+        self.summary: Dict = {}
+        self.result = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'task': self.task,
+            'config': self.config,
+            'params': self.params,
+            'depends_on': self.depends_on,
+            'status': self.status,
+            'seconds': round(self.seconds, 3),
+            'summary': self.summary,
+            'error': self.error
+        }
+
+
+# --- Tasks -------------------------------------------------------------------
+# Each task takes (pool, job, dependency results) and returns (summary, result).
+
+def _dependency_results(deps: List[Job], task: str) -> List:
+    return [dep.result for dep in deps if dep.task == task and dep.result is not None]
+
+
+def _task_content_batch(pool: AutomatorPool, job: Job, deps: List[Job]):
+    batch = pool.get('content', job.config).generate_daily_content_batch(job.params.get('date'))
+    return {'posts': len(batch['posts']), 'date': batch['date']}, batch
+
+
+def _task_pins(pool: AutomatorPool, job: Job, deps: List[Job]):
+    pins = pool.get('pinterest', job.config).create_pins_for_all_templates(
+        job.params.get('type'), job.params.get('style'), run_name=job.id
+    )
+    return {'pins': len(pins)}, pins
+
+
+def _task_schedule(pool: AutomatorPool, job: Job, deps: List[Job]):
+    automator = pool.get('pinterest', job.config)
+    pins = [pin for result in _dependency_results(deps, 'pins') for pin in result]
+
+    if not pins:
+        pins_file = job.params.get('pins_file')
+        if not pins_file:
+            candidates = list(Path(automator.config.output.schedules_directory).glob('pinterest_pins_*.json'))
+            if not candidates:
+                raise RuntimeError("No pins found; add a 'pins' job or set pins_file")
+            pins_file = max(candidates, key=lambda path: path.stat().st_mtime)
+        with open(pins_file, 'r', encoding='utf-8') as f:
+            pins = json.load(f)
+
+    schedule = automator.create_posting_schedule(pins, int(job.params.get('days', 7)), run_name=job.id)
+    return {'scheduled': len(schedule)}, schedule
+
+
+def _task_idea_pin(pool: AutomatorPool, job: Job, deps: List[Job]):
+    idea_pin = pool.get('pinterest', job.config).create_idea_pins_content(
+        job.params['topic'],
+        pages=job.params.get('pages'),
+        template_image_path=job.params.get('image'),
+        style=job.params.get('style', 'romantic'),
+        slideshow=job.params.get('slideshow')
+    )
+    return {'pages': idea_pin['total_pages'], 'bundle_dir': idea_pin['bundle_dir']}, idea_pin
+
+
+def _task_keywords(pool: AutomatorPool, job: Job, deps: List[Job]):
+    keywords = pool.get('seo', job.config).research_keywords(job.params.get('seeds'), resume=bool(job.params.get('resume')))
+    return {'keywords': len(keywords)}, keywords
+
+
+def _task_blog(pool: AutomatorPool, job: Job, deps: List[Job]):
+    seo = pool.get('seo', job.config)
+    keywords = job.params.get('keywords') or ([job.params['keyword']] if job.params.get('keyword') else [])
+
+    # 'top: N' takes the best keywords from a 'keywords' dependency
+    if not keywords and job.params.get('top'):
+        researched = [kw for result in _dependency_results(deps, 'keywords') for kw in result]
+        researched.sort(key=lambda kw: kw['priority'], reverse=True)
+        keywords = [kw['keyword'] for kw in researched[:int(job.params['top'])]]
+    if not keywords:
+        raise RuntimeError("blog job needs 'keyword', 'keywords' or 'top' with a keywords dependency")
+
+    posts = [seo.generate_blog_post(keyword, int(job.params.get('words', 1500))) for keyword in keywords]
+    return {'posts': len(posts), 'words': sum(post.get('word_count', 0) for post in posts)}, posts
+
+
+def _task_landing_pages(pool: AutomatorPool, job: Job, deps: List[Job]):
+    pool.get('seo', job.config).generate_template_landing_pages(job.params.get('type'))
+    return {}, None
+
+
+def _task_sitemap(pool: AutomatorPool, job: Job, deps: List[Job]):
+    sitemap = pool.get('seo', job.config).generate_sitemap_data()
+    return {'urls': len(sitemap)}, sitemap
+
+
+def _task_site(pool: AutomatorPool, job: Job, deps: List[Job]):
+    from static_site import build_site
+
+    summary = build_site(pool.config(job.config), full=bool(job.params.get('full')), workers=job.params.get('workers'))
+    return {'rendered': summary['rendered'], 'pages': summary['pages']}, summary
+
+
+def _task_engagement(pool: AutomatorPool, job: Job, deps: List[Job]):
+    from engagement import run_ingest
+
+    files = job.params.get('files') or ([job.params['file']] if job.params.get('file') else [])
+    summary = run_ingest(pool.config(job.config), files, job.params.get('source'))
+    return {'matched_posts': summary['matched_posts'], 'files': len(files)}, summary
+
+
+TASKS: Dict[str, Callable] = {
+    'content-batch': _task_content_batch,
+    'pins': _task_pins,
+    'schedule': _task_schedule,
+    'idea-pin': _task_idea_pin,
+    'keywords': _task_keywords,
+    'blog': _task_blog,
+    'landing-pages': _task_landing_pages,
+    'sitemap': _task_sitemap,
+    'site': _task_site,
+    'engagement': _task_engagement,
+}
+
+
+# --- Spec loading --------------------------------------------------------------
+
+def load_spec(path: str) -> Dict:
+    """Read a JSON or YAML job spec"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if str(path).lower().endswith(('.yaml', '.yml')):
+            spec = require('yaml').safe_load(f)
+        else:
+            spec = json.load(f)
+
+    if not isinstance(spec, dict) or not isinstance(spec.get('jobs'), list):
+        raise JobSpecError("Job spec must be a mapping with a 'jobs' list")
+    return spec
+
+
+def expand_jobs(spec: Dict, brands: List[str] = None) -> List[Job]:
+    """Expand configs/brands × dates matrices into concrete jobs and validate dependencies"""
+    defaults = spec.get('defaults', {})
+    jobs: List[Job] = []
+    seen_base_ids = set()
+
+    for index, entry in enumerate(spec['jobs'], 1):
+        entry = {**defaults, **entry}
+        task = entry.pop('task', None)
+        if task not in TASKS:
+            raise JobSpecError(f"Job #{index}: unknown task '{task}' (expected one of {', '.join(TASKS)})")
+
+        base_id = str(entry.pop('id', f"{task}-{index}"))
+        if base_id in seen_base_ids:
+            raise JobSpecError(f"Duplicate job id '{base_id}'")
+        seen_base_ids.add(base_id)
+
+        job_brands = entry.pop('brands', None)
+        if job_brands is not None:
+            if brands is None:
+                raise JobSpecError(f"Job '{base_id}' lists brands but the spec has no 'tenants' file")
+            job_brands = brands if job_brands == 'all' else [str(brand) for brand in job_brands]
+            unknown = [brand for brand in job_brands if brand not in brands]
+            if unknown:
+                raise JobSpecError(f"Job '{base_id}' uses unknown brand(s): {', '.join(unknown)}")
+            entry.pop('configs', None)
+        configs = job_brands or entry.pop('configs', None) or [entry.pop('config', 'config.json')]
+        entry.pop('config', None)
+        dates = entry.pop('dates', None) or [entry.pop('date', None)]
+        depends_on = entry.pop('depends_on', [])
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+
+        for config in configs:
+            for date in dates:
+                job_id = base_id
+                if len(configs) > 1:
+                    job_id += f"[{Path(config).stem}]"
+                if len(dates) > 1:
+                    job_id += f"[{date}]"
+                params = dict(entry)
+                if date is not None:
+                    params['date'] = str(date)
+                jobs.append(Job(job_id, base_id, task, str(config), params, list(depends_on)))
+
+    for job in jobs:
+        for dep in job.depends_on:
+            if dep not in seen_base_ids:
+                raise JobSpecError(f"Job '{job.id}' depends on unknown job '{dep}'")
+
+    _check_cycles(jobs)
+    return jobs
+
+
+def _resolve_dependencies(job: Job, jobs: List[Job]) -> List[Job]:
+    """Expanded jobs a job waits for: same-config expansions when they exist, else all"""
+    resolved = []
+    for dep in job.depends_on:
+        candidates = [other for other in jobs if other.base_id == dep]
+        same_config = [other for other in candidates if other.config == job.config]
+        resolved.extend(same_config or candidates)
+    return resolved
+
+
+def _check_cycles(jobs: List[Job]):
+    graph = {}
+    for job in jobs:
+        graph.setdefault(job.base_id, set()).update(job.depends_on)
+
+    visiting, done = set(), set()
+
+    def visit(node: str, path: List[str]):
+        if node in done:
+            return
+        if node in visiting:
+            raise JobSpecError(f"Dependency cycle: {' -> '.join(path + [node])}")
+        visiting.add(node)
+        for dep in graph.get(node, ()):
+            visit(dep, path + [node])
+        visiting.discard(node)
+        done.add(node)
+
+    for node in graph:
+        visit(node, [])
+
+
+# --- Execution ----------------------------------------------------------------
+
+def _run_job(pool: AutomatorPool, job: Job, deps: List[Job]) -> Job:
+    start = time.perf_counter()
+    try:
+        job.summary, job.result = TASKS[job.task](pool, job, deps)
+        job.status = 'succeeded'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = f"{type(e).__name__}: {e}"
+        print(f"❌ Job '{job.id}' failed: {job.error}")
+    finally:
+        job.seconds = time.perf_counter() - start
+    return job
+
+
+def run_jobs(jobs: List[Job], pool: AutomatorPool, concurrency: int = 4) -> List[Job]:
+    """Run jobs as their dependencies complete; dependents of failed jobs are skipped"""
+    dependencies = {job.id: _resolve_dependencies(job, jobs) for job in jobs}
+    pending = list(jobs)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        while pending or running:
+            for job in list(pending):
+                deps = dependencies[job.id]
+                if any(dep.status in ('failed', 'skipped') for dep in deps):
+                    job.status = 'skipped'
+                    job.error = "dependency did not succeed"
+                    pending.remove(job)
+                elif all(dep.status == 'succeeded' for dep in deps):
+                    job.status = 'running'
+                    running[executor.submit(_run_job, pool, job, deps)] = job
+                    pending.remove(job)
+
+            if not running:
+                # Nothing runnable is left (only possible with unresolvable dependencies)
+                for job in pending:
+                    job.status = 'skipped'
+                    job.error = "dependencies never became runnable"
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                running.pop(future)
+
+    return jobs
+
+
+def write_summary(jobs: List[Job], report_path: Optional[str], wall_seconds: float,
+                  shared_stats: Dict = None) -> str:
+    """Print a summary table and write the JSON report"""
+    counts = {status: sum(1 for job in jobs if job.status == status) for status in ('succeeded', 'failed', 'skipped')}
+
+    print(f"\n{'='*70}")
+    print(f"📋 Job run summary ({wall_seconds:.1f}s)")
+    print(f"{'='*70}")
+    icons = {'succeeded': '✅', 'failed': '❌', 'skipped': '⏭️'}
+    for job in jobs:
+        detail = job.error or ', '.join(f"{k}={v}" for k, v in job.summary.items())
+        print(f"  {icons.get(job.status, '•')} {job.id:<36} {job.seconds:>7.1f}s  {detail}")
+    print(f"\n  {counts['succeeded']} succeeded, {counts['failed']} failed, {counts['skipped']} skipped")
+
+    report_path = Path(report_path or Path('reports') / f"job_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'finished_at': datetime.now().isoformat(),
+            'wall_seconds': round(wall_seconds, 3),
+            'counts': counts,
+            'shared_resources': shared_stats or {},
+            'jobs': [job.to_dict() for job in jobs]
+        }, f, indent=2, ensure_ascii=False)
+    print(f"💾 Report saved to: {report_path}")
+    return str(report_path)
+
+
+def _config_paths(jobs: List[Job], pool: AutomatorPool) -> List[str]:
+    """Distinct config files used by jobs (brand ids are validated with the tenants file)"""
+    return sorted({job.config for job in jobs if not (pool.tenants and job.config in pool.tenants)})
+
+
+def run_spec(spec_path, pool: AutomatorPool = None, concurrency: int = None,
+             report_path: str = None, dry_run: bool = False, watcher: ConfigWatcher = None) -> int:
+    """Load (from a path, or use a spec dict as-is), validate and run; returns an exit code
+
+    Every config the jobs use is validated before the first job starts.
+    """
+    source = 'inline spec' if isinstance(spec_path, dict) else spec_path
+    try:
+        spec = spec_path if isinstance(spec_path, dict) else load_spec(spec_path)
+        pool = pool or AutomatorPool()
+        if spec.get('tenants') and pool.tenants is None:
+            pool.use_tenants(TenantRegistry.from_file(spec['tenants']))
+        jobs = expand_jobs(spec, pool.tenants.ids if pool.tenants else None)
+        for config_path in _config_paths(jobs, pool):
+            # Watched configs were validated already; a bad edit keeps the last good one running
+            if watcher is None or config_path not in watcher:
+                load_config(config_path)
+    except ConfigError as e:
+        print(f"❌ {e}")
+        return EXIT_INVALID_SPEC
+    except (OSError, ValueError) as e:
+        print(f"❌ Invalid job spec {source}: {e}")
+        return EXIT_INVALID_SPEC
+
+    if watcher is not None:
+        for config_path in _config_paths(jobs, pool):
+            watcher.watch(config_path, lambda path, _config: pool.invalidate(path))
+        if spec.get('tenants'):
+            watcher.watch(spec['tenants'], lambda _path, tenants: pool.reload_tenants(tenants),
+                          loader=TenantRegistry.from_file)
+
+    concurrency = concurrency or int(spec.get('concurrency', 4))
+    print(f"\n🗂️ {len(jobs)} job(s) from {source} (concurrency {concurrency})")
+
+    if dry_run:
+        for job in jobs:
+            deps = f" after {', '.join(job.depends_on)}" if job.depends_on else ''
+            print(f"  • {job.id}: {job.task} [{job.config}] {job.params}{deps}")
+        return EXIT_OK
+
+    start = time.perf_counter()
+    run_jobs(jobs, pool, concurrency)
+    write_summary(jobs, report_path, time.perf_counter() - start, pool.shared.stats())
+
+    return EXIT_OK if all(job.status == 'succeeded' for job in jobs) else EXIT_JOB_FAILED
+
+
+def run_forever(spec_path: str, every: float, pool: AutomatorPool = None, **kwargs) -> int:
+    """Daemon mode: re-run the spec every N seconds, keeping automators warm
+
+    Config and tenants files are hot reloaded between cycles; an invalid edit is
+    reported and the last good config keeps running.
+    """
+    pool = pool or AutomatorPool()
+    watcher = ConfigWatcher()
+    exit_code = EXIT_OK
+    try:
+        while True:
+            started = time.monotonic()
+            watcher.check()
+            exit_code = run_spec(spec_path, pool=pool, watcher=watcher, **kwargs)
+            # The spec is re-read every cycle, so edits apply without a restart
+            time.sleep(max(0.0, every - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("\n👋 Stopping job runner")
+    return exit_code
@@ -0,0 +1,264 @@
+"""
+Recursive Keyword Expansion
+Breadth-first long-tail keyword discovery with a deduplicated frontier and a hard LLM budget
+
+Seeds are expanded into related keywords, and promising results (priority at
+least ``min_priority``) are expanded again, up to ``max_depth`` levels. The
+frontier is a priority queue ordered by depth, then priority, so each level is
+finished best-first before the next starts; every keyword is normalized and
+seen at most once. Expansion calls run concurrently, and a call is only issued
+if it fits the remaining budget of calls and tokens (in-flight calls reserve
+the largest per-call token count seen so far).
+
+Every expansion is appended to a JSON-lines journal (flushed every
+``checkpoint_every`` calls, and when the run stops), so a long expansion can
+stop - spent budget, Ctrl-C, a crash - and later resume where it left off,
+with a raised budget, by replaying the journal. A failed call is neither spent
+nor journaled as an expansion, so its keyword is expanded again on resume.
+Each set of seeds (and
+frontier settings) has its own journal, so researching other seeds in between
+does not overwrite a stopped run.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CHECKPOINT_PREFIX = 'keyword_frontier'
+CHECKPOINT_VERSION = 1
+
+_LIST_MARKER = re.compile(r'^\s*(?:[-*•]+|\d+[.)])\s*')
+_NON_WORD = re.compile(r"[^a-z0-9']+")
+
+
+def normalize_keyword(text: str) -> str:
+    """Dedup key: lowercase words without punctuation or extra spaces"""
+    return ' '.join(_NON_WORD.sub(' ', text.lower()).split())
+
+
+def parse_keyword_lines(text: str) -> List[str]:
+    """Keywords from a one-per-line LLM response, without list markers or quotes"""
+    keywords = []
+    for line in text.strip().split('\n'):
+        keyword = _LIST_MARKER.sub('', line).strip().strip('"\'').strip().lower()
+        if keyword:
+            keywords.append(keyword)
+    return keywords
+
+
+def checkpoint_name(seeds: Sequence[str], settings) -> str:
+    """Journal file name for an expansion of ``seeds``
+
+    Hashes the normalized seeds and the settings that shape the frontier; the
+    budget (``max_calls``, ``max_tokens``) is left out so a run can resume with
+    a raised one.
+    """
+    key = json.dumps([[normalize_keyword(seed) for seed in seeds], settings.max_depth, settings.min_priority])
+    return f"{CHECKPOINT_PREFIX}_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]}.jsonl"
+
+
+class KeywordExpander:
+    """Frontier, budget and checkpoint journal for one expansion run
+
+    ``expand(keyword, depth)`` returns (related keywords, tokens used), with
+    tokens None if the call failed, and is called from worker threads; ``score(keywords)`` gives the priorities of a
+    batch of keywords.
+    All frontier state is only touched by the thread calling ``run``.
+    """
+
+    def __init__(self, expand: Callable[[str, int], Tuple[List[str], Optional[int]]], score: Callable[[List[str]], List[int]],
+                 settings, checkpoint_path: str, max_workers: int = 4, token_estimate: int = 0):
+        self.expand = expand
+        self.score = score
+        self.settings = settings
+        self.checkpoint_path = Path(checkpoint_path)
+        self.max_workers = max(1, max_workers)
+        self.seeds: List[str] = []
+        self.seen = set()
+        self.results: List[Dict] = []
+        # Keywords whose expansion call failed this run; still unexpanded in the journal
+        self.failed: List[Dict] = []
+        self.calls = 0
+        self.tokens = 0
+        # Largest tokens per call so far; reserved for each in-flight call
+        self.call_tokens = token_estimate
+        self._queue: List[Tuple] = []
+        self._counter = 0
+        self._journal = None
+        self._unflushed = 0
+
+    # --- Frontier ---------------------------------------------------------------
+
+    def _push(self, item: Dict):
+        self._counter += 1
+        heapq.heappush(self._queue, (item['depth'], -item['priority'], self._counter, item))
+
+    def _new_keywords(self, keywords: Iterable[str]) -> List[str]:
+        new = []
+        for keyword in keywords:
+            key = normalize_keyword(keyword)
+            if key and key not in self.seen:
+                self.seen.add(key)
+                new.append(keyword)
+        return new
+
+    def _add_seeds(self, seeds: Iterable[str]):
+        new = self._new_keywords(seeds)
+        self.seeds.extend(new)
+        for seed, priority in zip(new, self.score(new)):
+            self._push({'keyword': seed, 'seed': seed, 'parent': None, 'depth': 0, 'priority': int(priority)})
+
+    def _apply(self, parent: Dict, keywords: Iterable[str], expandable: bool, tokens: Optional[int]) -> int:
+        if tokens is not None:
+            self.calls += 1
+            self.tokens += tokens
+            self.call_tokens = max(self.call_tokens, tokens)
+
+        depth = parent['depth'] + 1
+        new = self._new_keywords(keywords)
+        for keyword, priority in zip(new, self.score(new) if new else []):
+            item = {'keyword': keyword, 'seed': parent['seed'], 'parent': parent['keyword'],
+                    'depth': depth, 'priority': int(priority)}
+            self.results.append(item)
+            if expandable and depth < self.settings.max_depth and item['priority'] >= self.settings.min_priority:
+                self._push(item)
+        return len(new)
+
+    def discover(self, parent: Dict, keywords: List[str], expandable: bool = True, tokens: Optional[int] = None) -> int:
+        """Record keywords found from ``parent`` (by an expansion call if ``tokens`` is given)
+
+        Promising new keywords join the frontier. Returns how many were new.
+        """
+        self._write({'parent': {key: parent[key] for key in ('keyword', 'seed', 'depth')},
+                     'found': list(keywords), 'expandable': expandable, 'tokens': tokens})
+        return self._apply(parent, keywords, expandable, tokens)
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    # --- Budget -----------------------------------------------------------------
+
+    def _affordable(self, in_flight: int) -> bool:
+        if self.calls + in_flight >= self.settings.max_calls:
+            return False
+        if self.settings.max_tokens:
+            return self.tokens + (in_flight + 1) * self.call_tokens <= self.settings.max_tokens
+        return True
+
+    # --- Running ----------------------------------------------------------------
+
+    def run(self) -> List[Dict]:
+        """Expand until the frontier is empty or the budget is spent; returns all keywords found"""
+        futures: Dict = {}
+        pool = ThreadPoolExecutor(self.max_workers)
+        try:
+            while True:
+                while self._queue and len(futures) < self.max_workers and self._affordable(len(futures)):
+                    item = heapq.heappop(self._queue)[-1]
+                    futures[pool.submit(self.expand, item['keyword'], item['depth'])] = item
+
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = futures.pop(future)
+                    keywords, tokens = future.result()
+                    if tokens is None:
+                        # Stand-in keywords (if any) are kept but never expanded; the keyword
+                        # itself is retried by a resumed run rather than again in this one
+                        self.failed.append(item)
+                        if keywords:
+                            self.discover(item, keywords, expandable=False)
+                        continue
+                    self.discover(item, keywords, tokens=tokens)
+        finally:
+            # On Ctrl-C or a failed call, keywords still in flight were never journaled
+            # as expanded, so a resumed run queues them again
+            pool.shutdown(wait=not futures, cancel_futures=True)
+            self._flush()
+        return self.results
+
+    # --- Checkpoint journal -----------------------------------------------------
+    #
+    # JSON lines: a header with the seeds, then one entry per discover() call.
+    # Appending keeps checkpointing linear in the number of calls; resuming
+    # replays the entries to rebuild the frontier, results and spend.
+
+    def _write(self, entry: Dict):
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._unflushed += 1
+        if self._unflushed >= self.settings.checkpoint_every:
+            self._flush()
+
+    def _flush(self):
+        if self._journal is not None and self._unflushed:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._unflushed = 0
+
+    def begin(self, seeds: Sequence[str], resume: bool = False) -> bool:
+        """Start a fresh journal for ``seeds``, or with ``resume`` replay the existing one
+
+        Returns True if a journal for the same seeds was resumed.
+        """
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        entries, size = read_checkpoint(self.checkpoint_path) if resume else (None, 0)
+        if entries and [normalize_keyword(s) for s in entries[0]['seeds']] == [normalize_keyword(s) for s in seeds]:
+            self._add_seeds(entries[0]['seeds'])
+            expanded = set()
+            for entry in entries[1:]:
+                if entry['tokens'] is not None:
+                    expanded.add(normalize_keyword(entry['parent']['keyword']))
+                self._apply(entry['parent'], entry['found'], entry['expandable'], entry['tokens'])
+            self._queue = [queued for queued in self._queue if normalize_keyword(queued[-1]['keyword']) not in expanded]
+            heapq.heapify(self._queue)
+            self._journal = open(self.checkpoint_path, 'a', encoding='utf-8')
+            # Drop a line cut off by a crash, so new entries start on a fresh line
+            self._journal.truncate(size)
+            return True
+
+        self._journal = open(self.checkpoint_path, 'w', encoding='utf-8')
+        self._write({'version': CHECKPOINT_VERSION, 'started_at': datetime.now().isoformat(), 'seeds': list(seeds)})
+        self._add_seeds(seeds)
+        return False
+
+    def finish(self):
+        """Close the journal; it is removed once the frontier is exhausted
+
+        A spent budget or failed calls keep it for resuming.
+        """
+        if self._journal is not None:
+            self._flush()
+            self._journal.close()
+            self._journal = None
+        if not self._queue and not self.failed and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+
+
+def read_checkpoint(path: Path) -> Tuple[Optional[List[Dict]], int]:
+    """(journal entries with the header first, bytes of intact lines), or (None, 0) if there is no usable journal"""
+    if not Path(path).exists():
+        return None, 0
+    entries, size = [], 0
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError("incomplete line")
+                entries.append(json.loads(line))
+            except ValueError:
+                # A line cut off by a crash mid-write; everything before it is intact
+                break
+            size += len(line)
+    if not entries or entries[0].get('version') != CHECKPOINT_VERSION:
+        return None, 0
+    return entries, size
@@ -0,0 +1,20 @@
+"""
+Lazy Dependency Imports
+Heavy third-party packages are imported on the code paths that need them, not at startup
+"""
+
+import importlib
+
+
+def require(module_name: str):
+    """Import a dependency on first use, exiting with install instructions if it is missing
+
+    Goes through importlib even when the module is already in sys.modules: a
+    module another thread is still importing must be waited for, not returned.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        print(f"Missing dependency: {e}")
+        print("Run: pip install -r requirements.txt")
+        exit(1)
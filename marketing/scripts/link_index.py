@@ -0,0 +1,267 @@
+"""
+Internal Link Index
+SQLite FTS5 index over generated blog posts and landing pages, for resolving internal links
+
+Every ``blog_*.json`` and ``landing_*.json`` in ``output.content_directory`` is a
+page with a site URL (``/blog/<slug>``, ``/templates/<id>``). Pages are indexed
+in an FTS5 table; files are tracked by mtime and size, so a refresh only reads
+new or changed outputs and drops pages whose files are all gone. Anchors (``[link: anchor text]``
+in articles, or a post's keyword) resolve to the best matching pages by BM25,
+with titles and keywords weighted above body text. Resolved links are kept as a
+graph (source URL -> target URL), replaced per source page when it is re-linked.
+"""
+
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+INDEX_FILE = 'link_index.db'
+PAGE_PATTERNS = ('blog_*.json', 'landing_*.json')
+
+# bm25() column weights: url (unindexed), title, keyword, body
+BM25_WEIGHTS = (0.0, 10.0, 6.0, 1.0)
+
+LINK_PLACEHOLDER = re.compile(r'\[link:\s*([^\]]+?)\s*\]', re.I)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    title TEXT,
+    keyword TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(url UNINDEXED, title, keyword, body,
+                                                        tokenize='porter unicode61');
+CREATE TABLE IF NOT EXISTS links (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    anchor TEXT NOT NULL,
+    score REAL,
+    PRIMARY KEY (source, anchor)
+);
+CREATE INDEX IF NOT EXISTS links_target ON links (target);
+"""
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_MARKDOWN = re.compile(r'[#*_>`]+')
+_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in', 'is', 'it', 'of',
+    'on', 'or', 'our', 'that', 'the', 'this', 'to', 'with', 'you', 'your'
+})
+
+
+def slugify(text: str) -> str:
+    return '-'.join(_TOKEN.findall(text.lower()))[:80] or 'page'
+
+
+def blog_url(keyword: str) -> str:
+    return f"/blog/{slugify(keyword)}"
+
+
+def item_text(item) -> str:
+    """Text of one LLM-written field or list item: a string as is, a dict's string values joined"""
+    if item is None:
+        return ''
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return ' '.join(value for value in item.values() if isinstance(value, str))
+    return str(item)
+
+
+def item_texts(items) -> List[str]:
+    """``item_text`` of each item of an LLM-written list (a lone value counts as one item)"""
+    if items is None:
+        return []
+    return [item_text(item) for item in (items if isinstance(items, list) else [items])]
+
+
+def page_from_file(path: Path) -> Optional[Dict]:
+    """URL, kind, title, keyword and body text of a blog post or landing page output"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if path.name.startswith('blog_'):
+        keyword = item_text(data.get('keyword'))
+        body = LINK_PLACEHOLDER.sub(r'\1', item_text(data.get('content')))
+        return {'url': data.get('url') or blog_url(keyword or path.stem[5:]), 'kind': 'blog',
+                'title': item_text(data.get('title')) or keyword, 'keyword': keyword,
+                'body': _MARKDOWN.sub(' ', body)}
+    if path.name.startswith('landing_'):
+        title = item_text(data.get('title'))
+        body = ' '.join([item_text(data.get('hero_description')), *item_texts(data.get('features')),
+                         *item_texts(data.get('use_cases'))])
+        return {'url': f"/templates/{path.stem[len('landing_'):]}", 'kind': 'landing',
+                'title': title, 'keyword': title, 'body': body}
+    return None
+
+
+def match_query(text: str) -> Optional[str]:
+    """FTS5 query matching any meaningful word of ``text`` (BM25 ranks pages matching more of them)"""
+    terms = [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+    return ' OR '.join(f'"{term}"' for term in dict.fromkeys(terms)) or None
+
+
+class LinkIndex:
+    """Full-text index of our pages plus the internal link graph between them"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_config(cls, config) -> 'LinkIndex':
+        return cls(Path(config.output.content_directory) / INDEX_FILE)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def refresh(self, content_directory: str) -> Dict[str, int]:
+        """Index new and changed page files and drop deleted ones; unchanged files are not read
+
+        A file that cannot be read or parsed is reported, counted as skipped and
+        left out of the index (it is retried on the next refresh). Several files can hold the same URL (a keyword regenerated on a later day);
+        as in ``static_site.collect_sources`` the newest (last sorted) file is the
+        page, and a URL is only dropped once none of its files remain.
+        """
+        known = {path: (mtime, size, url) for path, mtime, size, url in self.conn.execute(
+            "SELECT path, mtime_ns, size, url FROM files")}
+        counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0, 'skipped': 0}
+        present: Dict[str, str] = {}
+        read: Dict[str, Dict] = {}
+        changed_urls = set()
+
+        with self.conn:
+            for pattern in PAGE_PATTERNS:
+                for path in sorted(Path(content_directory).glob(pattern)):
+                    key = str(path)
+                    stat = path.stat()
+                    cached = known.get(key)
+                    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                        present[key] = cached[2]
+                        counts['unchanged'] += 1
+                        continue
+                    page = self._read(path, counts)
+                    if page is None:
+                        continue
+                    self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                      (key, stat.st_mtime_ns, stat.st_size, page['url']))
+                    present[key] = page['url']
+                    read[key] = page
+                    changed_urls.add(page['url'])
+                    if cached:
+                        changed_urls.add(cached[2])
+                    counts['updated' if cached else 'added'] += 1
+
+            for key in set(known) - set(present):
+                self.conn.execute("DELETE FROM files WHERE path = ?", (key,))
+                changed_urls.add(known[key][2])
+                counts['removed'] += 1
+
+            newest = {url: key for key, url in present.items()}
+            for url in changed_urls:
+                key = newest.get(url)
+                page = None if key is None else read.get(key) or self._read(Path(key), counts)
+                if page is None:
+                    self._remove(url)
+                else:
+                    self._upsert(page)
+        return counts
+
+    @staticmethod
+    def _read(path: Path, counts: Dict[str, int]) -> Optional[Dict]:
+        """``page_from_file``, or None (reported and counted as skipped) if the file is unreadable"""
+        try:
+            return page_from_file(path)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"⚠️ Link index: skipping {path.name} ({type(e).__name__}: {e})")
+            counts['skipped'] += 1
+            return None
+
+    def _upsert(self, page: Dict):
+        row = self.conn.execute("SELECT id FROM pages WHERE url = ?", (page['url'],)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM pages_fts WHERE rowid = ?", row)
+            self.conn.execute("UPDATE pages SET kind = ?, title = ?, keyword = ? WHERE id = ?",
+                              (page['kind'], page['title'], page['keyword'], row[0]))
+            page_id = row[0]
+        else:
+            page_id = self.conn.execute("INSERT INTO pages (url, kind, title, keyword) VALUES (?, ?, ?, ?)",
+                                        (page['url'], page['kind'], page['title'], page['keyword'])).lastrowid
+        self.conn.execute("INSERT INTO pages_fts (rowid, url, title, keyword, body) VALUES (?, ?, ?, ?, ?)",
+                          (page_id, page['url'], page['title'], page['keyword'], page['body']))
+
+    def _remove(self, url: str):
+        row = self.conn.execute("SELECT id FROM pages WHERE url = ?", (url,)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM pages_fts WHERE rowid = ?", row)
+            self.conn.execute("DELETE FROM pages WHERE id = ?", row)
+        self.conn.execute("DELETE FROM links WHERE source = ? OR target = ?", (url, url))
+
+    def search(self, text: str, limit: int = 5, exclude: Sequence[str] = ()) -> List[Dict]:
+        """Best matching pages for some text, best first (score is BM25; higher is better)"""
+        query = match_query(text)
+        if query is None:
+            return []
+        placeholders = ', '.join('?' * len(exclude))
+        sql = f"""
+            SELECT p.url, p.kind, p.title, -bm25(pages_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS score
+            FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid
+            WHERE pages_fts MATCH ? {f'AND p.url NOT IN ({placeholders})' if exclude else ''}
+            ORDER BY score DESC LIMIT ?
+        """
+        rows = self.conn.execute(sql, (query, *exclude, limit))
+        return [{'url': url, 'kind': kind, 'title': title, 'score': round(score, 4)}
+                for url, kind, title, score in rows]
+
+    def resolve(self, anchors: Sequence[str], source: str = None) -> Dict[str, Optional[Dict]]:
+        """Best page for each anchor (None if nothing matches), never the source page itself"""
+        exclude = (source,) if source else ()
+        return {anchor: next(iter(self.search(anchor, 1, exclude)), None) for anchor in dict.fromkeys(anchors)}
+
+    def set_links(self, source: str, links: Dict[str, Optional[Dict]]):
+        """Replace a page's outbound links with resolved anchors (anchor -> page)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM links WHERE source = ?", (source,))
+            self.conn.executemany(
+                "INSERT INTO links VALUES (?, ?, ?, ?)",
+                [(source, page['url'], anchor, page['score']) for anchor, page in links.items() if page]
+            )
+
+    def outbound(self, url: str) -> List[Tuple[str, str]]:
+        """(anchor, target URL) pairs linked from a page"""
+        return self.conn.execute("SELECT anchor, target FROM links WHERE source = ? ORDER BY anchor", (url,)).fetchall()
+
+    def inbound(self, url: str) -> List[Tuple[str, str]]:
+        """(source URL, anchor) pairs linking to a page"""
+        return self.conn.execute("SELECT source, anchor FROM links WHERE target = ? ORDER BY source", (url,)).fetchall()
+
+    def stats(self) -> Dict[str, int]:
+        pages = dict(self.conn.execute("SELECT kind, COUNT(*) FROM pages GROUP BY kind"))
+        links = self.conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+        orphans = self.conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE kind = 'blog' AND url NOT IN (SELECT target FROM links)"
+        ).fetchone()[0]
+        return {'blog_pages': pages.get('blog', 0), 'landing_pages': pages.get('landing', 0),
+                'links': links, 'orphan_posts': orphans}
+
+
+def resolve_placeholders(article: str, links: Dict[str, Optional[Dict]]) -> str:
+    """Turn ``[link: anchor]`` placeholders into markdown links (unresolved ones become plain text)"""
+    def replace(match):
+        page = links.get(match.group(1))
+        return f"[{match.group(1)}]({page['url']})" if page else match.group(1)
+    return LINK_PLACEHOLDER.sub(replace, article)
@@ -0,0 +1,395 @@
+"""
+Pluggable LLM Clients
+Record/replay and fake stand-ins for the Anthropic client, for offline runs and load tests
+
+All clients expose ``client.messages.create(model=..., max_tokens=..., messages=[...])``
+and return objects with ``.content[0].text`` and ``.usage``, like the Anthropic SDK.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+
+class SimulatedAPIError(Exception):
+    """Raised by replay/fake clients to simulate API failures"""
+
+
+class CassetteMiss(KeyError):
+    """A replayed request has no recorded response"""
+
+
+def make_response(text: str, usage: Optional[Dict] = None):
+    """Build an SDK-shaped response object"""
+    usage = usage or {}
+    return SimpleNamespace(
+        content=[SimpleNamespace(type='text', text=text)],
+        usage=SimpleNamespace(
+            input_tokens=usage.get('input_tokens', 0),
+            output_tokens=usage.get('output_tokens', 0),
+            cache_read_input_tokens=usage.get('cache_read_input_tokens', 0),
+            cache_creation_input_tokens=usage.get('cache_creation_input_tokens', 0)
+        )
+    )
+
+
+def request_key(request: Dict) -> str:
+    """Stable hash of the parts of a request that determine the response"""
+    relevant = {k: request.get(k) for k in ('model', 'max_tokens', 'system', 'messages', 'temperature')}
+    encoded = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _usage_dict(message) -> Dict:
+    usage = getattr(message, 'usage', None)
+    return {
+        key: getattr(usage, key, 0) or 0
+        for key in ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+    }
+
+
+class _SimulatedFaults:
+    """Shared latency and error-rate simulation"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self, base_latency: Optional[float] = None, timeout: Optional[float] = None):
+        """Sleep for the simulated latency, then maybe raise a simulated error
+
+        A latency beyond the request's ``timeout`` raises after ``timeout`` seconds,
+        like the SDK's request timeout.
+        """
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            fail = self.error_rate and self._random.random() < self.error_rate
+
+        delay = (self.latency if base_latency is None else base_latency) + jitter
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise SimulatedAPIError(f"Simulated timeout after {timeout}s")
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise SimulatedAPIError("Simulated API error")
+
+
+class RecordingClient:
+    """Wrap a live client and append every request/response pair to a cassette file"""
+
+    def __init__(self, client, cassette_path: str):
+        self.client = client
+        self.cassette_path = Path(cassette_path)
+        self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **request):
+        start = time.perf_counter()
+        message = self.client.messages.create(**request)
+        latency = time.perf_counter() - start
+
+        entry = {
+            'key': request_key(request),
+            'request': request,
+            'response': {
+                'text': ''.join(getattr(block, 'text', '') for block in message.content),
+                'usage': _usage_dict(message)
+            },
+            'latency': round(latency, 4)
+        }
+        with self._lock:
+            with open(self.cassette_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+
+        return message
+
+
+class ReplayClient:
+    """Answer requests from a cassette, optionally with simulated latency and errors
+
+    Repeated identical requests replay their recorded responses in order, cycling
+    when exhausted. ``latency='recorded'`` sleeps for the recorded latency times
+    ``latency_scale``.
+    """
+
+    def __init__(self, cassette_path: str, latency=0.0, latency_scale: float = 1.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, seed: int = None,
+                 fallback: Optional[Callable[[Dict], str]] = None):
+        self.latency_mode = 'recorded' if latency == 'recorded' else 'fixed'
+        self.latency_scale = latency_scale
+        self.faults = _SimulatedFaults(0.0 if latency == 'recorded' else float(latency), jitter, error_rate, seed)
+        self.fallback = fallback
+        self.calls = 0
+        self.misses = 0
+
+        self._entries: Dict[str, List[Dict]] = {}
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load(cassette_path)
+
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _load(self, cassette_path: str):
+        with open(cassette_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry['key'], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _create(self, **request):
+        key = request_key(request)
+        with self._lock:
+            self.calls += 1
+            entries = self._entries.get(key)
+            if entries:
+                position = self._positions.get(key, 0)
+                self._positions[key] = position + 1
+                entry = entries[position % len(entries)]
+            else:
+                self.misses += 1
+                entry = None
+
+        if entry is None:
+            if self.fallback is None:
+                raise CassetteMiss(f"No recorded response for request {key[:12]}")
+            self.faults.apply(timeout=request.get('timeout'))
+            return make_response(self.fallback(request))
+
+        recorded_latency = entry.get('latency', 0.0) * self.latency_scale if self.latency_mode == 'recorded' else None
+        self.faults.apply(recorded_latency, request.get('timeout'))
+        return make_response(entry['response']['text'], entry['response'].get('usage'))
+
+
+class RateLimiter:
+    """Token bucket shared by every caller drawing on one API quota"""
+
+    def __init__(self, requests_per_minute: float, burst: int = 5):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.waited = 0.0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.waited += waited
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimitedClient:
+    """Wrap a client so every request first takes a token from a shared RateLimiter"""
+
+    def __init__(self, client, limiter: RateLimiter):
+        self.client = client
+        self.limiter = limiter
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **request):
+        self.limiter.acquire()
+        return self.client.messages.create(**request)
+
+
+_FAKE_TOPIC_OPENERS = ['Cozy', 'Surprise', 'Handwritten', 'Budget-friendly', 'Last-minute', 'Long-distance',
+                       'Vintage', 'Seasonal', 'Playful', 'Heartfelt', 'Weekend', 'Milestone']
+_FAKE_TOPIC_SUBJECTS = ['anniversary playlists', 'birthday scavenger hunts', 'love letter prompts',
+                        'photo memory pages', 'date night menus', 'proposal stories', 'gift wrapping ideas',
+                        'couple challenges', 'memory timelines', 'friendship tributes', 'family keepsakes',
+                        'travel scrapbooks']
+_FAKE_TOPIC_ANGLES = ['for busy couples', 'that feel personal', 'on a small budget', 'for new parents',
+                      'to share online', 'for first dates', 'that spark conversation', 'for long marriages']
+
+
+def _fake_topics(prompt: str, count: int = 20) -> List[str]:
+    """Varied topics, deterministic per prompt, so dedup and top-up paths get exercised offline"""
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+    return [f"{rng.choice(_FAKE_TOPIC_OPENERS)} {rng.choice(_FAKE_TOPIC_SUBJECTS)} {rng.choice(_FAKE_TOPIC_ANGLES)}"
+            for _ in range(count)]
+
+
+_FAKE_SENTENCES = ['Small words can mean a lot.', 'Write what you feel, not what sounds grand.',
+                   'A short note can make a whole day.', 'Keep it simple and honest.',
+                   'Share a memory you both still laugh about.', 'Add a photo to make the moment real.']
+
+
+def _fake_section(prompt: str) -> str:
+    """A readable section of about the requested length that uses the keyword, a hook and a CTA"""
+    heading = re.search(r'Start with "## (.+?)"', prompt)
+    keyword = re.search(r'Target Keyword: "(.+?)"', prompt)
+    words = re.search(r'about (\d+) words', prompt)
+    heading = heading.group(1) if heading else 'Synthetic Section'
+    keyword = keyword.group(1) if keyword else 'love'
+    count = max(2, int(words.group(1)) // 7) if words else 40
+
+    sentences = [_FAKE_SENTENCES[i % len(_FAKE_SENTENCES)] for i in range(count)]
+    for i in range(0, count, 25):
+        sentences[i] = f"These {keyword} help you say it well."
+    if 'opens the article' in prompt:
+        sentences[0] = f"Have you ever wanted to try {keyword}?"
+    if 'closes the article' in prompt:
+        sentences.append("Create your own page today and see our [link: romantic templates].")
+    return f"## {heading}\n\n" + ' '.join(sentences)
+
+
+# US -> Commonwealth spellings the fake localizer applies, so variants visibly differ offline
+_FAKE_SPELLINGS = {'color': 'colour', 'favorite': 'favourite', 'personalized': 'personalised',
+                   'personalize': 'personalise', 'organize': 'organise', 'center': 'centre',
+                   'honor': 'honour', 'jewelry': 'jewellery', 'mom': 'mum', 'vacation': 'holiday'}
+_FAKE_SPELLING = re.compile(r'\b(' + '|'.join(_FAKE_SPELLINGS) + r')(?=s?\b)', re.I)
+
+
+def _fake_localize(prompt: str) -> str:
+    """Echo each marked segment back with Commonwealth spellings and the target currency symbol"""
+    symbol = re.search(r'^Currency: \w+ \((.+?)\)$', prompt, re.M)
+    american = 'Spelling and vocabulary: American' in prompt
+    segments = re.split(r'^(<<<\d+>>>)$', prompt[prompt.find('<<<1>>>'):], flags=re.M)
+
+    def respell(match):
+        word = _FAKE_SPELLINGS[match.group(1).lower()]
+        return word.capitalize() if match.group(1)[0].isupper() else word
+
+    out = []
+    for marker, text in zip(segments[1::2], segments[2::2]):
+        text = text.strip()
+        if not american:
+            text = _FAKE_SPELLING.sub(respell, text)
+        if symbol:
+            text = text.replace('$', symbol.group(1))
+        out.append(f"{marker}\n{text}")
+    return '\n\n'.join(out)
+
+
+def default_fake_responder(request: Dict) -> str:
+    """Plausible canned text for each prompt type used by the automators"""
+    content = request['messages'][-1]['content']
+    prompt = content if isinstance(content, str) else json.dumps(content, default=str)
+
+    # First: segments being localized can contain any other prompt's phrases
+    if 'text segments from' in prompt:
+        return _fake_localize(prompt)
+    if 'section of an SEO-optimized article' in prompt:
+        return _fake_section(prompt)
+    if 'keyword variations' in prompt:
+        return '\n'.join(f"synthetic long tail keyword idea {i}" for i in range(15))
+    if 'hashtags' in prompt:
+        return '#Love #Romance #Anniversary #LoveStory #CoupleGoals #GiftIdeas #Romantic #Forever'
+    if 'post topics' in prompt:
+        return '\n'.join(_fake_topics(prompt))
+    if 'outline' in prompt:
+        return "H1: Synthetic Title\nH2: Introduction\n  H3: Why it matters\nH2: How to\n  H3: Step one\nH2: Conclusion"
+    if 'meta data' in prompt:
+        keyword = re.search(r'article about "(.+?)"', prompt)
+        keyword = keyword.group(1) if keyword else 'synthetic pages'
+        title = f"{keyword.title()}: Simple Ideas, Tips and Examples"
+        description = (f"Discover {keyword} with simple steps and real examples. "
+                       f"Create a heartfelt page in minutes and share it with someone you love today. Start free.")
+        return f"TITLE: {title[:60]}\nDESCRIPTION: {description[:160]}"
+    if 'landing page' in prompt:
+        return '{"title": "Synthetic Landing Page", "hero_description": "Offline content.", "features": [], "use_cases": [], "cta": "Create", "meta_description": "Offline."}'
+    if 'blog post' in prompt:
+        return "# Synthetic Article\n\n" + ' '.join(["Love deserves a beautiful page."] * 200)
+    return "💕 Love is in the little moments ✨ Make today special 🌹 What's your story? 👇"
+
+
+# Smallest prefix the API will cache for Sonnet models
+MIN_CACHE_TOKENS = 1024
+
+
+def _split_cached_prefix(request: Dict):
+    """(cacheable prefix text, remaining text) at the last cache_control breakpoint in ``system``"""
+    system = request.get('system') or []
+    if isinstance(system, str):
+        system = [{'type': 'text', 'text': system}]
+    breakpoint_index = max((i for i, block in enumerate(system) if block.get('cache_control')), default=-1)
+    prefix = ''.join(block.get('text', '') for block in system[:breakpoint_index + 1])
+    rest = ''.join(block.get('text', '') for block in system[breakpoint_index + 1:])
+    rest += ''.join(str(m.get('content', '')) for m in request.get('messages', []))
+    return prefix, rest
+
+
+class FakeClient:
+    """Generate canned responses without a cassette, for load tests and benchmarks
+
+    Simulates prompt caching: a system prefix marked with ``cache_control`` and at
+    least ``min_cache_tokens`` long is billed as a cache write the first time and a
+    cache read afterwards, so offline runs report realistic cached token counts.
+    """
+
+    def __init__(self, responder: Callable[[Dict], str] = default_fake_responder, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, seed: int = None,
+                 min_cache_tokens: int = MIN_CACHE_TOKENS):
+        self.responder = responder
+        self.faults = _SimulatedFaults(latency, jitter, error_rate, seed)
+        self.min_cache_tokens = min_cache_tokens
+        self.calls = 0
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **request):
+        prefix, rest = _split_cached_prefix(request)
+        prefix_tokens = len(prefix) // 4
+        usage = {'input_tokens': len(rest) // 4}
+        with self._lock:
+            self.calls += 1
+            if prefix_tokens and prefix_tokens >= self.min_cache_tokens:
+                digest = hashlib.sha256(prefix.encode('utf-8')).digest()
+                cache_field = 'cache_read_input_tokens' if digest in self._cached_prefixes else 'cache_creation_input_tokens'
+                self._cached_prefixes.add(digest)
+                usage[cache_field] = prefix_tokens
+            else:
+                usage['input_tokens'] += prefix_tokens
+        self.faults.apply(timeout=request.get('timeout'))
+
+        text = self.responder(request)
+        usage['output_tokens'] = len(text) // 4
+        return make_response(text, usage)
+
+
+def create_offline_client(llm):
+    """Build a replay or fake client from the validated ``llm`` settings, or None for live/record"""
+    fault_args = {'jitter': llm.latency_jitter, 'error_rate': llm.error_rate, 'seed': llm.seed}
+
+    if llm.mode == 'replay':
+        return ReplayClient(
+            llm.cassette_path,
+            latency=llm.latency,
+            latency_scale=llm.latency_scale,
+            fallback=default_fake_responder if llm.replay_miss == 'fake' else None,
+            **fault_args
+        )
+    if llm.mode == 'fake':
+        return FakeClient(latency=float(llm.latency), **fault_args)
+    return None
+
+
+def with_recording(client, llm):
+    """Wrap a live client in a RecordingClient when ``llm.mode`` is 'record'"""
+    if client is not None and llm.mode == 'record':
+        return RecordingClient(client, llm.cassette_path)
+    return client
@@ -0,0 +1,328 @@
+"""
+LLM Provider Failover
+Circuit breakers, a secondary provider and hedged requests in front of the LLM client
+
+``ProviderChain`` exposes the same ``messages.create`` interface as the Anthropic
+client. Each provider has a circuit breaker: after ``failure_threshold``
+consecutive failures it opens and calls go straight to the next provider (or,
+with none left, raise ``CircuitOpenError`` at once so the caller uses its local
+fallback content) instead of each waiting out its own timeout. After
+``reset_seconds`` one trial call is let through; success closes the circuit.
+
+Requests flagged ``hedge`` (see ``PromptTemplate.hedge``) fire a second request
+if the first has not answered within the provider's observed p95 latency for
+that model (or ``llm.failover.hedge_delay``), to the secondary provider when
+there is one, and the first answer wins. ``failover_check`` runs these paths
+against scripted providers (``cli.py failover-check``).
+
+Secondary providers: ``openai`` (chat completions, using ``openai_api_key``)
+and ``fake`` (a local FakeClient, for testing failover offline).
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from lazy_imports import require
+from llm_clients import CassetteMiss, FakeClient, make_response
+
+# Secondary model per tier when llm.failover.models does not name one
+DEFAULT_OPENAI_MODELS = {
+    'fast': "gpt-4o-mini",
+    'standard': "gpt-4o"
+}
+
+# Latencies kept per provider and model for the hedging p95
+LATENCY_WINDOW = 200
+
+
+class CircuitOpenError(Exception):
+    """Every provider's circuit is open; the caller should use its fallback"""
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """Whether an error says something about the provider's health
+
+    Cassette misses and 4xx request errors (other than timeouts and rate
+    limits) are the request's fault and do not count against the circuit.
+    """
+    if isinstance(error, CassetteMiss):
+        return False
+    status = getattr(error, 'status_code', None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+
+class CircuitBreaker:
+    """Closed, open after ``failure_threshold`` consecutive failures, half-open after ``reset_seconds``"""
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.trips = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            return 'half_open' if self.clock() - self._opened_at >= self.reset_seconds else 'open'
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (only one trial call while half-open)"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self.clock() - self._opened_at < self.reset_seconds or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release(self):
+        """End a call that said nothing about health; frees the half-open trial without closing"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or (self._opened_at is None and self.failures >= self.failure_threshold):
+                self._opened_at = self.clock()
+                self.trips += 1
+            self._trial_running = False
+
+
+class Provider:
+    """One LLM backend with its circuit breaker and recent latencies
+
+    ``models`` maps the requested (primary) model to this provider's model;
+    unmapped models are sent unchanged. Latencies are kept per requested model,
+    since a fast-tier call and a long article take very different times.
+    """
+
+    def __init__(self, name: str, client, models: Optional[Dict[str, str]] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.client = client
+        self.models = models or {}
+        self.breaker = breaker or CircuitBreaker()
+        self.calls = 0
+        self.failures = 0
+        self._latencies: Dict[Optional[str], deque] = {}
+        self._lock = threading.Lock()
+
+    def create(self, request: Dict):
+        """Send a request, recording its latency and outcome on the breaker"""
+        model = request.get('model')
+        if model in self.models:
+            request = {**request, 'model': self.models[model]}
+        with self._lock:
+            self.calls += 1
+        start = time.perf_counter()
+        try:
+            message = self.client.messages.create(**request)
+        except Exception as e:
+            if _is_provider_failure(e):
+                with self._lock:
+                    self.failures += 1
+                self.breaker.record_failure()
+            else:
+                # The caller's fault: neither a failure nor proof the provider is healthy
+                self.breaker.release()
+            raise
+        with self._lock:
+            latencies = self._latencies.get(model)
+            if latencies is None:
+                latencies = self._latencies[model] = deque(maxlen=LATENCY_WINDOW)
+            latencies.append(time.perf_counter() - start)
+        self.breaker.record_success()
+        return message
+
+    def p95(self, min_samples: int, model: Optional[str] = None) -> Optional[float]:
+        """p95 of recent successful latencies for ``model``, or None with fewer than ``min_samples``"""
+        with self._lock:
+            latencies = self._latencies.get(model, ())
+            if len(latencies) < min_samples:
+                return None
+            ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def stats(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'circuit': self.breaker.state,
+            'trips': self.breaker.trips
+        }
+
+
+class ProviderChain:
+    """Client that tries providers in order, skipping open circuits, with optional hedging"""
+
+    def __init__(self, providers: List[Provider], hedge_delay: Optional[float] = None,
+                 hedge_min_samples: int = 10, max_workers: int = 8):
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.short_circuited = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-hedge')
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, hedge: bool = False, **request):
+        # Lazily filtered, so a half-open provider's trial call is only claimed when it is used
+        available = (provider for provider in self.providers if provider.breaker.allow())
+        primary = next(available, None)
+        if primary is None:
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpenError(f"All LLM providers unavailable ({', '.join(p.name for p in self.providers)})")
+
+        delay = self._hedge_after(primary, request.get('model')) if hedge else None
+        if delay is None:
+            return self._failover(itertools.chain([primary], available), request)
+        return self._hedged(primary, available, request, delay)
+
+    def _hedge_after(self, provider: Provider, model: Optional[str]) -> Optional[float]:
+        return self.hedge_delay or provider.p95(self.hedge_min_samples, model)
+
+    @staticmethod
+    def _failover(providers: Iterable[Provider], request: Dict, error: Exception = None):
+        """Try each provider in turn; raise the last error if all fail"""
+        for provider in providers:
+            try:
+                return provider.create(request)
+            except Exception as e:
+                error = e
+        raise error
+
+    def _hedged(self, primary: Provider, available: Iterator[Provider], request: Dict, delay: float):
+        """Start on the primary; if it is slower than ``delay``, race a second request"""
+        first = self._executor.submit(primary.create, request)
+        if wait([first], timeout=delay).done:
+            error = first.exception()
+            return first.result() if error is None else self._failover(available, request, error)
+
+        second = self._executor.submit((next(available, None) or primary).create, request)
+        with self._lock:
+            self.hedged += 1
+
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        return self._failover(available, request, error)
+
+    def stats(self) -> Dict:
+        """Per-provider health plus hedging and short-circuit counts"""
+        return {
+            'providers': {provider.name: provider.stats() for provider in self.providers},
+            'short_circuited': self.short_circuited,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins
+        }
+
+
+class OpenAIMessages:
+    """Anthropic-style ``messages.create`` on top of OpenAI chat completions"""
+
+    def __init__(self, client):
+        self.client = client
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **request):
+        system = request.get('system') or []
+        if not isinstance(system, str):
+            system = ''.join(block.get('text', '') for block in system)
+        messages = [{'role': 'system', 'content': system}] if system else []
+        messages.extend({'role': m['role'], 'content': m['content']} for m in request['messages'])
+
+        completion = self.client.chat.completions.create(
+            model=request['model'],
+            max_tokens=request.get('max_tokens'),
+            messages=messages,
+            timeout=request.get('timeout')
+        )
+        usage = completion.usage
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = getattr(details, 'cached_tokens', 0) or 0
+        return make_response(completion.choices[0].message.content or '', {
+            'input_tokens': usage.prompt_tokens - cached,
+            'output_tokens': usage.completion_tokens,
+            'cache_read_input_tokens': cached
+        })
+
+
+def _secondary_client(config):
+    """The configured secondary provider's client, or None"""
+    secondary = config.llm.failover.secondary
+    if secondary == 'fake':
+        return FakeClient(seed=config.llm.seed)
+    if secondary == 'openai':
+        if not config.openai_api_key or config.openai_api_key == "YOUR_OPENAI_API_KEY":
+            print("⚠️ Warning: llm.failover.secondary is 'openai' but openai_api_key is not configured")
+            return None
+        OpenAI = require('openai').OpenAI
+        return OpenAIMessages(OpenAI(api_key=config.openai_api_key))
+    return None
+
+
+def build_provider_chain(primary, config) -> Optional[ProviderChain]:
+    """Put the primary client (if any) and the configured secondary behind a ProviderChain"""
+    from settings import DEFAULT_MODEL_TIERS
+
+    llm = config.llm
+    failover = llm.failover
+
+    def breaker():
+        return CircuitBreaker(failover.failure_threshold, failover.reset_seconds)
+
+    providers = []
+    if primary is not None:
+        name = 'anthropic' if llm.mode in ('live', 'record') else f"anthropic-{llm.mode}"
+        providers.append(Provider(name, primary, breaker=breaker()))
+
+    secondary = _secondary_client(config)
+    if secondary is not None:
+        models = {}
+        if failover.secondary == 'openai':
+            tier_models = {**DEFAULT_OPENAI_MODELS, **failover.models}
+            models = {model: tier_models[tier]
+                      for tier, model in {**DEFAULT_MODEL_TIERS, **llm.model_tiers}.items()
+                      if tier in tier_models}
+        providers.append(Provider(failover.secondary, secondary, models, breaker()))
+
+    if not providers:
+        return None
+    return ProviderChain(providers, failover.hedge_delay, failover.hedge_min_samples,
+                         max_workers=2 * llm.max_concurrency)
+
+
+def provider_stats(client) -> Optional[Callable[[], Dict]]:
+    """``stats`` of the ProviderChain inside (possibly wrapped) client, if there is one"""
+    while client is not None and not isinstance(client, ProviderChain):
+        client = getattr(client, 'client', None)
+    return client.stats if client is not None else None
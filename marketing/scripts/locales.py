@@ -0,0 +1,336 @@
+"""
+Locale Variants
+Fans generated content out to the markets in ``seo.focus_locations``, with a segment-level translation cache
+
+The first focus location is the locale content is generated in; every other
+one gets a variant adapted for its spelling, currency, holidays and date
+format. Only locale-specific text is adapted: outlines, images, hashtags and
+links are generated once and shared by every variant.
+
+Text is adapted per segment (a markdown paragraph, a title, a list item).
+Segments are cached in SQLite by (locale, prompt key, source hash), so
+regenerating a post only sends the paragraphs that changed; the misses for all
+locales are packed into batches of about ``BATCH_WORDS`` words and sent
+concurrently (up to ``llm.max_concurrency`` calls).
+
+The automators check focus locations with ``check_focus_locations`` when they
+are created, so the config schema does not depend on this module.
+SQLite and the thread pool are only imported once content is localized.
+"""
+
+import difflib
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from prompts import PROMPTS
+from settings import ConfigError
+
+CACHE_FILE = 'translations.db'
+# Source words per localization call; keeps replies well inside the prompt's max_tokens
+BATCH_WORDS = 900
+
+_SEGMENT_BREAK = re.compile(r'\n\s*\n')
+_MARKER = re.compile(r'^\s*<<<(\d+)>>>\s*$', re.M)
+_LETTER = re.compile(r'[^\W\d_]')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    locale TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (locale, prompt, source_hash)
+);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class LocaleProfile:
+    """A market: language, spelling, currency and the holidays that differ from other markets"""
+    code: str
+    name: str
+    spelling: str
+    currency: str
+    symbol: str
+    date_format: str
+    holidays: str
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def notes(self) -> str:
+        return (f"Spelling and vocabulary: {self.spelling}\n"
+                f"Currency: {self.currency} ({self.symbol})\n"
+                f"Date format: {self.date_format}\n"
+                f"Holidays: {self.holidays}")
+
+
+LOCALES: Dict[str, LocaleProfile] = {profile.code: profile for profile in (
+    LocaleProfile('en-US', 'English (United States)', 'American English', 'USD', '$', 'MM/DD/YYYY',
+                  "Mother's Day and Father's Day in May and June; Thanksgiving in late November",
+                  ('united states', 'us', 'usa', 'america')),
+    LocaleProfile('en-GB', 'English (United Kingdom)', 'British English', 'GBP', '£', 'DD/MM/YYYY',
+                  "Mother's Day (Mothering Sunday) in March; no Thanksgiving; Boxing Day on 26 December",
+                  ('united kingdom', 'uk', 'gb', 'great britain', 'britain', 'england')),
+    LocaleProfile('en-CA', 'English (Canada)', 'Canadian English', 'CAD', 'C$', 'YYYY-MM-DD',
+                  "Thanksgiving on the second Monday of October; Canada Day on 1 July; Boxing Day",
+                  ('canada', 'ca')),
+    LocaleProfile('en-AU', 'English (Australia)', 'Australian English', 'AUD', 'A$', 'DD/MM/YYYY',
+                  "Seasons are reversed (summer is December to February); Mother's Day in May; no Thanksgiving",
+                  ('australia', 'au')),
+    LocaleProfile('en-NZ', 'English (New Zealand)', 'New Zealand English', 'NZD', 'NZ$', 'DD/MM/YYYY',
+                  "Seasons are reversed (summer is December to February); Mother's Day in May; no Thanksgiving",
+                  ('new zealand', 'nz')),
+    LocaleProfile('en-IE', 'English (Ireland)', 'Irish English', 'EUR', '€', 'DD/MM/YYYY',
+                  "Mother's Day in March; St Patrick's Day on 17 March; no Thanksgiving",
+                  ('ireland', 'ie')),
+    LocaleProfile('de-DE', 'German (Germany)', 'German', 'EUR', '€', 'DD.MM.YYYY',
+                  "Muttertag in May; Valentinstag is smaller than in the US; no Thanksgiving",
+                  ('germany', 'de', 'deutschland')),
+    LocaleProfile('fr-FR', 'French (France)', 'French', 'EUR', '€', 'DD/MM/YYYY',
+                  "Fête des mères at the end of May or in June; no Thanksgiving",
+                  ('france', 'fr')),
+    LocaleProfile('es-ES', 'Spanish (Spain)', 'Spanish (Spain)', 'EUR', '€', 'DD/MM/YYYY',
+                  "Día de la Madre on the first Sunday of May; Sant Jordi (23 April) in Catalonia; no Thanksgiving",
+                  ('spain', 'es', 'españa')),
+)}
+
+_ALIASES = {alias: profile for profile in LOCALES.values()
+            for alias in (profile.code.lower(), profile.name.lower(), *profile.aliases)}
+
+
+def resolve_locale(location: str) -> Optional[LocaleProfile]:
+    """Profile for a focus location given as a locale code, country name or country code"""
+    return _ALIASES.get(location.strip().lower().replace('_', '-'))
+
+
+def locale_names() -> List[str]:
+    return sorted(_ALIASES)
+
+
+def check_focus_locations(seo):
+    """Raise ConfigError for unknown ``seo.focus_locations`` names (with a suggestion)"""
+    problems = []
+    for i, location in enumerate(seo.focus_locations):
+        if resolve_locale(location) is None:
+            suggestion = difflib.get_close_matches(location.strip().lower(), locale_names(), n=1, cutoff=0.75)
+            hint = f" (did you mean '{suggestion[0]}'?)" if suggestion else " (use a country name or locale code)"
+            problems.append(f"focus_locations[{i}]: unknown location '{location}'{hint}")
+    if problems:
+        raise ConfigError('seo.focus_locations', problems)
+
+
+def locale_plan(locations: Sequence[str]) -> Tuple[Optional[LocaleProfile], List[LocaleProfile]]:
+    """(base locale, variant locales) for ``seo.focus_locations``; duplicates and unknowns are dropped"""
+    profiles = []
+    for location in locations:
+        profile = resolve_locale(location)
+        if profile is not None and profile not in profiles:
+            profiles.append(profile)
+    if not profiles:
+        return None, []
+    return profiles[0], profiles[1:]
+
+
+def locale_url(code: str, url: str) -> str:
+    """Site URL of a page's variant: ``/en-gb/blog/<slug>``"""
+    return f"/{code.lower()}{url}"
+
+
+def split_segments(text: str) -> List[str]:
+    """Markdown paragraphs (blank-line separated), the unit of caching"""
+    return [segment.strip() for segment in _SEGMENT_BREAK.split(text) if segment.strip()]
+
+
+def join_segments(segments: Sequence[str]) -> str:
+    return '\n\n'.join(segments)
+
+
+def segment_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+class TranslationCache:
+    """Adapted segments per locale and prompt version, keyed by a hash of the source text"""
+
+    def __init__(self, path: str):
+        import sqlite3
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_config(cls, config) -> 'TranslationCache':
+        return cls(Path(config.output.content_directory) / CACHE_FILE)
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, locale: str, prompt: str, hashes: Sequence[str]) -> Dict[str, str]:
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT source_hash, text FROM segments WHERE locale = ? AND prompt = ? "
+                f"AND source_hash IN ({', '.join('?' * len(chunk))})", (locale, prompt, *chunk))
+            found.update(rows)
+        return found
+
+    def put_many(self, locale: str, prompt: str, texts: Dict[str, str]):
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)",
+                                  [(locale, prompt, digest, text, now) for digest, text in texts.items()])
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+
+def parse_marked_segments(text: str, count: int) -> Optional[List[str]]:
+    """Segments of a ``<<<n>>>``-marked reply, or None unless markers 1..count each appear once, in order"""
+    parts = _MARKER.split(text)
+    numbers = [int(number) for number in parts[1::2]]
+    if numbers != list(range(1, count + 1)):
+        return None
+    return [part.strip() for part in parts[2::2]]
+
+
+def _batches(segments: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """(hash, text) pairs packed into batches of about BATCH_WORDS words"""
+    batches, current, words = [], [], 0
+    for item in segments:
+        size = len(item[1].split())
+        if current and words + size > BATCH_WORDS:
+            batches.append(current)
+            current, words = [], 0
+        current.append(item)
+        words += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+Fields = Dict[str, Union[str, List[str]]]
+
+
+class Localizer:
+    """Adapts generated text for each variant locale through the LLM, reusing cached segments
+
+    Shared per automator; ``localize`` runs on the caller's thread and fans its
+    LLM calls out to a thread pool. Segments that fail (an error, or a reply
+    whose markers don't line up) keep the source text for that run and are not
+    cached, so the next run retries them.
+    """
+
+    def __init__(self, config, client, prompts, metrics):
+        self.config = config
+        self.client = client
+        self.prompts = prompts
+        self.base, self.variants = locale_plan(config.seo.focus_locations) if config.seo.localize else (None, [])
+        self.counts = {'segments': 0, 'cached': 0, 'adapted': 0, 'failed': 0, 'calls': 0}
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        if self.enabled:
+            metrics.attach('localization', self.stats)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.variants) and self.client is not None
+
+    @property
+    def base_code(self) -> Optional[str]:
+        return self.base.code if self.base else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+        return {'base': self.base_code, 'variants': [profile.code for profile in self.variants], **counts}
+
+    def localize(self, segments: Sequence[str]) -> Dict[str, List[str]]:
+        """Variant locale code -> ``segments`` adapted for it (same length and order)"""
+        if not self.enabled or not segments:
+            return {}
+        prompt_key = PROMPTS['localize'].key
+        hashes = [segment_hash(segment) for segment in segments]
+        results: Dict[str, Dict[str, str]] = {}
+        jobs = []
+
+        cache = TranslationCache.for_config(self.config)
+        try:
+            for profile in self.variants:
+                known = cache.get_many(profile.code, prompt_key, hashes)
+                # Text without letters (a link list, a number) needs no adapting
+                known.update({digest: segment for digest, segment in zip(hashes, segments)
+                              if not _LETTER.search(segment)})
+                results[profile.code] = known
+                misses = {digest: segment for digest, segment in zip(hashes, segments) if digest not in known}
+                jobs += [(profile, batch) for batch in _batches(list(misses.items()))]
+                with self._lock:
+                    self.counts['segments'] += len(segments)
+                    self.counts['cached'] += sum(digest in known for digest in hashes)
+
+            if jobs:
+                from concurrent.futures import ThreadPoolExecutor
+                workers = min(len(jobs), self.config.llm.max_concurrency)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    replies = list(executor.map(lambda job: self._adapt(*job), jobs))
+                for (profile, batch), adapted in zip(jobs, replies):
+                    if adapted is None:
+                        continue
+                    fresh = {digest: text for (digest, _), text in zip(batch, adapted)}
+                    results[profile.code].update(fresh)
+                    cache.put_many(profile.code, prompt_key, fresh)
+        finally:
+            cache.close()
+
+        return {code: [known.get(digest, segment) for digest, segment in zip(hashes, segments)]
+                for code, known in results.items()}
+
+    def localize_fields(self, fields: Fields) -> Dict[str, Fields]:
+        """Variant locale code -> ``fields`` (strings, or lists of strings) adapted for it"""
+        flat, shape = [], []
+        for name, value in fields.items():
+            items = value if isinstance(value, list) else [value or '']
+            shape.append((name, isinstance(value, list), len(items)))
+            flat.extend(items)
+
+        variants = {}
+        for code, adapted in self.localize(flat).items():
+            position, variant = 0, {}
+            for name, is_list, size in shape:
+                items = adapted[position:position + size]
+                variant[name] = items if is_list else items[0]
+                position += size
+            variants[code] = variant
+        return variants
+
+    def _adapt(self, profile: LocaleProfile, batch: List[Tuple[str, str]]) -> Optional[List[str]]:
+        marked = '\n\n'.join(f"<<<{i}>>>\n{text}" for i, (_, text) in enumerate(batch, 1))
+        request = self.prompts.request('localize', source=self.base.name, target=profile.name,
+                                       notes=profile.notes, count=len(batch), segments=marked)
+        try:
+            with self.metrics.span('localize', locale=profile.code) as span:
+                message = self.client.messages.create(**request)
+                span.record_usage(message)
+            adapted = parse_marked_segments(message.content[0].text, len(batch))
+            if adapted is None:
+                raise ValueError("reply segments don't match the request")
+        except Exception as e:
+            print(f"  ⚠️ Localization error ({profile.code}): {e}")
+            with self._lock:
+                self.counts['calls'] += 1
+                self.counts['failed'] += len(batch)
+            return None
+
+        with self._lock:
+            self.counts['calls'] += 1
+            self.counts['adapted'] += len(batch)
+        return adapted
@@ -0,0 +1,225 @@
+"""
+Offline Search Volume
+Estimates keyword demand from a local n-gram frequency table through a memory-mapped index
+
+An n-gram table (text lines of ``n-gram<TAB>count``, optionally gzipped, such
+as a web or query-log n-gram export) is compiled once by ``build_index``, an
+external sort that never holds the whole table in memory, into a binary file:
+a header, then the sorted 64-bit hashes of every normalized n-gram, then their
+counts. ``NgramVolumeIndex`` maps that file with
+``numpy.memmap``; opening it reads only the header, and a lookup binary-searches
+the hashes, so only the pages a batch touches are read, whatever the table's size.
+
+A keyword found as a whole n-gram gets its count. Otherwise it is estimated in
+the spirit of stupid backoff: at the longest order where any of its n-grams is
+in the table, the rarest of those found, discounted by ``BACKOFF`` per word of
+order backed off and again per n-gram of that order that is missing. Volumes feed keyword
+priority as ``seo.volume_weight`` points per factor of 10.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from lazy_imports import require
+
+MAGIC = b'NGRAMIX1'
+# magic, n-gram count, highest order, unused
+HEADER = struct.Struct('<8sQII')
+# Stupid backoff discount per order backed off (Brants et al., 2007)
+BACKOFF = 0.4
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def ngram_tokens(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def ngram_hash(ngram: str) -> int:
+    """64-bit key of a normalized n-gram (words joined by single spaces)"""
+    return int.from_bytes(hashlib.blake2b(ngram.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _open_text(path: str):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _sorted_totals(np, keys, counts):
+    """Sorted distinct keys and the summed counts of each"""
+    order = np.argsort(keys, kind='stable')
+    keys, counts = keys[order], counts[order]
+    unique, starts = np.unique(keys, return_index=True)
+    return unique, (np.add.reduceat(counts, starts) if len(keys) else counts)
+
+
+def build_index(source: str, output: str, chunk_rows: int = 1_000_000) -> Dict:
+    """Compile an ``n-gram<TAB>count`` table into a sorted, hashed binary index
+
+    Counts of n-grams that normalize to the same words are summed. The build is
+    an external sort: every ``chunk_rows`` rows are hashed, sorted and spilled to
+    a temporary run file, and the runs are then merged block by block into the
+    index, so memory stays around ``chunk_rows`` n-grams whatever the table's size.
+    """
+    np = require('numpy')
+    run_dtype = np.dtype([('key', '<u8'), ('count', '<u8')])
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    keys, counts = [], []
+    rows = skipped = max_order = 0
+
+    with tempfile.TemporaryDirectory(prefix=f".{output.name}.runs-", dir=output.parent) as run_dir:
+        runs: List[Path] = []
+
+        def spill():
+            if keys:
+                unique, totals = _sorted_totals(np, np.array(keys, dtype=np.uint64), np.array(counts, dtype=np.uint64))
+                run = np.empty(len(unique), dtype=run_dtype)
+                run['key'], run['count'] = unique, totals
+                runs.append(Path(run_dir) / f"run{len(runs)}.bin")
+                run.tofile(runs[-1])
+                keys.clear()
+                counts.clear()
+
+        with _open_text(source) as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                ngram, _, count = line.rstrip('\n').rpartition('\t')
+                tokens = ngram_tokens(ngram)
+                count = count.strip().replace(',', '')
+                if not tokens or not count.isdigit():
+                    skipped += 1
+                    continue
+                rows += 1
+                max_order = max(max_order, len(tokens))
+                keys.append(ngram_hash(' '.join(tokens)))
+                counts.append(int(count))
+                if len(keys) >= chunk_rows:
+                    spill()
+        spill()
+
+        tmp = output.with_name(f".{output.name}.tmp")
+        size = _merge_runs(np, [np.memmap(path, dtype=run_dtype, mode='r') for path in runs], tmp,
+                           Path(run_dir) / 'counts.bin', max_order, block=max(1024, chunk_rows // max(1, len(runs))))
+    os.replace(tmp, output)
+    return {'ngrams': size, 'rows': rows, 'skipped': skipped, 'max_order': max_order,
+            'bytes': output.stat().st_size}
+
+
+def _merge_runs(np, runs: List, output: Path, counts_path: Path, max_order: int, block: int) -> int:
+    """K-way merge of sorted runs into an index file, summing keys found in several runs
+
+    Each step takes up to ``block`` entries per run and emits every key up to the
+    smallest of their last keys; no run holds a smaller key beyond its block, so
+    each key is complete when emitted. Keys go straight to ``output`` and counts
+    to ``counts_path`` (appended once the number of keys is known).
+    Returns the number of distinct keys.
+    """
+    positions = [0] * len(runs)
+    size = 0
+    with open(output, 'wb') as out, open(counts_path, 'w+b') as counts_file:
+        out.write(HEADER.pack(MAGIC, 0, max_order, 0))
+        while True:
+            live = [i for i, run in enumerate(runs) if positions[i] < len(run)]
+            if not live:
+                break
+            bound = min(runs[i]['key'][min(positions[i] + block, len(runs[i])) - 1] for i in live)
+            pieces = []
+            for i in live:
+                start = positions[i]
+                end = start + int(np.searchsorted(runs[i]['key'][start:start + block], bound, side='right'))
+                pieces.append(runs[i][start:end])
+                positions[i] = end
+            merged = np.concatenate(pieces)
+            unique, totals = _sorted_totals(np, merged['key'], merged['count'])
+            unique.astype('<u8').tofile(out)
+            totals.astype('<u8').tofile(counts_file)
+            size += len(unique)
+
+        counts_file.seek(0)
+        shutil.copyfileobj(counts_file, out, 1 << 20)
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, size, max_order, 0))
+    return size
+
+
+class NgramVolumeIndex:
+    """Read-only view of a built index; lookups read only the pages they touch"""
+
+    def __init__(self, path: str):
+        np = require('numpy')
+        self.path = str(path)
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an n-gram volume index (build one with 'cli.py volume-index')")
+        _, self.size, self.max_order, _ = HEADER.unpack(header)
+        if self.size:
+            self.keys = np.memmap(path, dtype='<u8', mode='r', offset=HEADER.size, shape=(self.size,))
+            self.counts = np.memmap(path, dtype='<u8', mode='r', offset=HEADER.size + 8 * self.size,
+                                    shape=(self.size,))
+        else:
+            self.keys = self.counts = np.zeros(0, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def lookup(self, ngrams: Sequence[str]):
+        """Counts for normalized n-grams (0 if absent), as a NumPy array"""
+        np = require('numpy')
+        hashes = np.fromiter((ngram_hash(ngram) for ngram in ngrams), dtype=np.uint64, count=len(ngrams))
+        if not self.size or not len(hashes):
+            return np.zeros(len(hashes), dtype=np.uint64)
+        positions = np.minimum(np.searchsorted(self.keys, hashes), self.size - 1)
+        found = self.keys[positions] == hashes
+        return np.where(found, self.counts[positions], 0)
+
+    def estimate(self, keywords: Sequence[str]):
+        """Estimated volume per keyword (float array); the batch's distinct n-grams are looked up at once"""
+        np = require('numpy')
+        # Every keyword's n-grams, longest order first, in groups of one (keyword, order)
+        ids: Dict[str, int] = {}
+        ngram_ids, group_keyword, group_order, group_starts, lengths = [], [], [], [], []
+        for k, keyword in enumerate(keywords):
+            tokens = ngram_tokens(keyword)
+            lengths.append(len(tokens))
+            for order in range(min(len(tokens), self.max_order), 0, -1):
+                group_keyword.append(k)
+                group_order.append(order)
+                group_starts.append(len(ngram_ids))
+                for i in range(len(tokens) - order + 1):
+                    ngram_ids.append(ids.setdefault(' '.join(tokens[i:i + order]), len(ids)))
+
+        volumes = np.zeros(len(keywords), dtype=np.float64)
+        if not ngram_ids:
+            return volumes
+        counts = self.lookup(list(ids)).astype(np.float64)[np.asarray(ngram_ids)]
+        starts = np.asarray(group_starts)
+        found = np.add.reduceat((counts > 0).astype(np.int64), starts)
+        rarest = np.minimum.reduceat(np.where(counts > 0, counts, np.inf), starts)
+        sizes = np.diff(np.append(starts, len(counts)))
+
+        # Per keyword, the first (longest-order) group with any n-gram in the table
+        usable = np.flatnonzero(found > 0)
+        group_keyword = np.asarray(group_keyword)[usable]
+        keyword_ids, first = np.unique(group_keyword, return_index=True)
+        chosen = usable[first]
+        backoff = np.asarray(lengths)[keyword_ids] - np.asarray(group_order)[chosen] + (sizes - found)[chosen]
+        volumes[keyword_ids] = rarest[chosen] * BACKOFF ** backoff
+        return volumes
+
+
+def volume_points(volumes, weight: float):
+    """Priority points for estimated volumes: ``weight`` per factor of 10"""
+    np = require('numpy')
+    return np.rint(weight * np.log10(1.0 + np.asarray(volumes, dtype=np.float64))).astype(int)
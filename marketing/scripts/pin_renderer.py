@@ -0,0 +1,271 @@
+"""
+Layered Pin Renderer
+Renders Pinterest pins from cached per-style static layers plus per-pin dynamic layers
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+
+FONT_PATH = "/System/Library/Fonts/Helvetica.ttc"
+EMOJI_FONT_PATH = "/System/Library/Fonts/Apple Color Emoji.ttc"
+
+PIN_COLOR_SCHEMES = {
+    'romantic': {
+        'bg_top': (255, 192, 203),
+        'bg_bottom': (255, 105, 180),
+        'text': (255, 255, 255),
+        'accent': (255, 20, 147)
+    },
+    'elegant': {
+        'bg_top': (147, 112, 219),
+        'bg_bottom': (75, 0, 130),
+        'text': (255, 255, 255),
+        'accent': (186, 85, 211)
+    },
+    'modern': {
+        'bg_top': (255, 182, 193),
+        'bg_bottom': (255, 105, 180),
+        'text': (60, 60, 60),
+        'accent': (255, 20, 147)
+    }
+}
+
+HEART_POSITIONS = [
+    (100, 150), (850, 200), (120, 1300), (880, 1350),
+    (50, 700), (920, 750)
+]
+
+CTA_TEXT = "✨ Create Yours Now ✨"
+
+# Drop shadow behind template previews
+SHADOW_OFFSET = (8, 12)
+SHADOW_BLUR = 12
+SHADOW_ALPHA = 110
+SHADOW_MARGIN = SHADOW_BLUR * 2 + max(SHADOW_OFFSET)
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int, path: str = FONT_PATH):
+    """Load a TrueType font once per (path, size), falling back to the default font"""
+    try:
+        return ImageFont.truetype(path, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _load_emoji_font(size: int):
+    """Load the color emoji font, or None if unavailable at this size"""
+    try:
+        return ImageFont.truetype(EMOJI_FONT_PATH, size)
+    except Exception:
+        return None
+
+
+def vertical_gradient(size: Tuple[int, int], top: Tuple[int, int, int], bottom: Tuple[int, int, int]) -> Image.Image:
+    """Build a top-to-bottom RGB gradient from a single column instead of per-row rectangles"""
+    width, height = size
+    column = Image.new('RGB', (1, height))
+    column.putdata([
+        tuple(int(top[i] + (bottom[i] - top[i]) * (y / height)) for i in range(3))
+        for y in range(height)
+    ])
+    return column.resize((width, height), Image.Resampling.NEAREST)
+
+
+@lru_cache(maxsize=32)
+def shared_gradient(size: Tuple[int, int], top: Tuple[int, int, int], bottom: Tuple[int, int, int]) -> Image.Image:
+    """Gradient shared by every renderer in the process; copy it before drawing on it"""
+    return vertical_gradient(size, top, bottom)
+
+
+class PinRenderer:
+    """Render pins by compositing dynamic layers over cached static layers"""
+
+    def __init__(self, pin_size: Tuple[int, int], brand_name: str):
+        self.pin_size = pin_size
+        self.brand_name = brand_name
+
+        # style -> (background RGB layer, overlay RGBA layer)
+        self._static_layers: Dict[str, Tuple[Image.Image, Image.Image]] = {}
+
+    def colors_for(self, style: str) -> Dict:
+        """Get the color scheme for a style"""
+        return PIN_COLOR_SCHEMES.get(style, PIN_COLOR_SCHEMES['romantic'])
+
+    def static_layers(self, style: str) -> Tuple[Image.Image, Image.Image]:
+        """Get (background, overlay) for a style, building them on first use"""
+        layers = self._static_layers.get(style)
+        if layers is None:
+            colors = self.colors_for(style)
+            layers = (self._build_background(colors), self._build_overlay(colors))
+            self._static_layers[style] = layers
+        return layers
+
+    def _build_background(self, colors: Dict) -> Image.Image:
+        """Gradient background shared by every pin of a style (and every brand)"""
+        return shared_gradient(self.pin_size, colors['bg_top'], colors['bg_bottom'])
+
+    def _build_overlay(self, colors: Dict) -> Image.Image:
+        """CTA, decorative hearts and watermark drawn once on a transparent layer"""
+        overlay = Image.new('RGBA', self.pin_size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+        width, height = self.pin_size
+
+        # CTA at bottom
+        cta_font = load_font(60)
+        cta_bbox = draw.textbbox((0, 0), CTA_TEXT, font=cta_font)
+        cta_width = cta_bbox[2] - cta_bbox[0]
+        cta_x = (width - cta_width) // 2
+        cta_y = height - 150
+
+        padding = 30
+        cta_bg_box = [
+            cta_x - padding,
+            cta_y - padding,
+            cta_x + cta_width + padding,
+            cta_y + 80
+        ]
+        draw.rounded_rectangle(cta_bg_box, radius=20, fill=colors['accent'])
+        draw.text((cta_x, cta_y), CTA_TEXT, fill=colors['text'], font=cta_font)
+
+        # Decorative hearts
+        heart_size = 40
+        emoji_font = _load_emoji_font(heart_size)
+        for x, y in HEART_POSITIONS:
+            if emoji_font:
+                draw.text((x, y), "❤️", font=emoji_font, embedded_color=True)
+            else:
+                # Fallback: translucent circles (alpha is kept because the layer is RGBA)
+                draw.ellipse([x, y, x + heart_size, y + heart_size], fill=colors['accent'] + (150,))
+
+        # Watermark
+        watermark_font = load_font(40)
+        watermark_bbox = draw.textbbox((0, 0), self.brand_name, font=watermark_font)
+        watermark_width = watermark_bbox[2] - watermark_bbox[0]
+        watermark_x = (width - watermark_width) // 2
+        watermark_y = height - 50
+        draw.text((watermark_x, watermark_y), self.brand_name, fill=colors['text'], font=watermark_font)
+
+        return overlay
+
+    def render(self, title: str, style: str = "romantic", preview: Optional[Image.Image] = None,
+               preview_y: int = 200, preview_margin: int = 0) -> Image.Image:
+        """Render a single pin and return it as an RGB image
+
+        ``preview_margin`` is the transparent border around a shadowed preview,
+        so the preview itself still lands at ``preview_y``.
+        """
+        background, overlay = self.static_layers(style)
+        colors = self.colors_for(style)
+
+        pin = background.copy()
+
+        # Template preview sits between the background and the text
+        if preview is not None:
+            x = (self.pin_size[0] - preview.width) // 2
+            y = preview_y - preview_margin
+            if preview.mode == 'RGBA':
+                pin.paste(preview, (x, y), preview)
+            else:
+                pin.paste(preview, (x, y))
+
+        # Title with a translucent shadow ('RGBA' draw mode blends onto the RGB canvas)
+        draw = ImageDraw.Draw(pin, 'RGBA')
+        title_font = load_font(80)
+        title_text = title.upper()
+        title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
+        title_width = title_bbox[2] - title_bbox[0]
+
+        shadow_offset = 3
+        title_x = (self.pin_size[0] - title_width) // 2
+        title_y = 50
+
+        draw.text((title_x + shadow_offset, title_y + shadow_offset), title_text, fill=(0, 0, 0, 128), font=title_font)
+        draw.text((title_x, title_y), title_text, fill=colors['text'], font=title_font)
+
+        # Static overlay last, so CTA, hearts and watermark stay on top
+        pin.paste(overlay, (0, 0), overlay)
+
+        return pin
+
+
+class PreviewCache:
+    """Decode, resize and shadow template previews once, caching the result on disk"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._memory: Dict[str, Image.Image] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_key(self, source_path: str, max_size: Tuple[int, int]) -> str:
+        """Key on absolute path, modification time and target size"""
+        source = os.path.abspath(source_path)
+        mtime = os.stat(source).st_mtime_ns
+        raw = f"{source}|{mtime}|{max_size[0]}x{max_size[1]}|shadow{SHADOW_OFFSET}{SHADOW_BLUR}{SHADOW_ALPHA}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, source_path: str, max_size: Tuple[int, int]) -> Tuple[Image.Image, int]:
+        """Return (shadowed RGBA preview, margin around the preview)"""
+        key = self._cache_key(source_path, max_size)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, SHADOW_MARGIN
+
+        cache_file = self.cache_dir / f"{key}.png"
+        if cache_file.exists():
+            try:
+                with Image.open(cache_file) as img:
+                    img.load()
+                    preview = img.convert('RGBA')
+                self._memory[key] = preview
+                self.hits += 1
+                return preview, SHADOW_MARGIN
+            except Exception:
+                # Corrupt cache entry, rebuild it below
+                pass
+
+        self.misses += 1
+        preview = with_drop_shadow(decode_thumbnail(source_path, max_size))
+        preview.save(cache_file, compress_level=1)
+        self._memory[key] = preview
+        return preview, SHADOW_MARGIN
+
+
+def decode_thumbnail(source_path: str, max_size: Tuple[int, int]) -> Image.Image:
+    """Decode at reduced size where the format allows it, then resize to fit"""
+    with Image.open(source_path) as img:
+        # JPEG: let the decoder downscale by 1/2, 1/4 or 1/8 before pixels are produced
+        img.draft('RGB', max_size)
+        # Other formats: box-reduce by an integer factor before the final LANCZOS pass
+        img.thumbnail(max_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        return img.convert('RGBA')
+
+
+def with_drop_shadow(image: Image.Image) -> Image.Image:
+    """Place an image on a transparent canvas with a soft shadow beneath it"""
+    margin = SHADOW_MARGIN
+    canvas_size = (image.width + margin * 2, image.height + margin * 2)
+
+    shadow = Image.new('RGBA', canvas_size, (0, 0, 0, 0))
+    shadow_box = [
+        margin + SHADOW_OFFSET[0],
+        margin + SHADOW_OFFSET[1],
+        margin + SHADOW_OFFSET[0] + image.width,
+        margin + SHADOW_OFFSET[1] + image.height
+    ]
+    ImageDraw.Draw(shadow).rectangle(shadow_box, fill=(0, 0, 0, SHADOW_ALPHA))
+    shadow = shadow.filter(ImageFilter.GaussianBlur(SHADOW_BLUR))
+
+    shadow.alpha_composite(image, (margin, margin))
+    return shadow
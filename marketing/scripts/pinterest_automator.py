@@ -5,43 +5,83 @@ Automates pin creation and scheduling for maximum reach
 
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List
-import time
 
-try:
-    from PIL import Image, ImageDraw, ImageFont, ImageFilter
-    import requests
-except ImportError as e:
-    print(f"Missing dependency: {e}")
-    exit(1)
+from engagement import load_insights, schedule_item_id
+from instrumentation import RunMetrics, export_run_metrics
+from lazy_imports import require
+from settings import MarketingConfig, load_config
+from template_catalog import get_catalog
 
 
 class PinterestAutomator:
     """Automate Pinterest marketing for templates"""
     
-    def __init__(self, config_path: str = "config.json"):
-        self.config = self._load_config(config_path)
+    def __init__(self, config_path: str = "config.json", config: MarketingConfig = None, shared=None):
+        # A preloaded config (a brand from tenants.py) wins over config_path;
+        # shared is the tenants.SharedResources every brand in the process reuses
+        self.config = config if config is not None else load_config(config_path)
+        self.shared = shared
         self._setup_directories()
+        self.metrics = RunMetrics('pinterest_automator')
+        # Guards the lazily built renderers and cache (job_runner shares automators across threads)
+        self._init_lock = threading.RLock()
         
         # Pinterest-specific settings
         self.pin_size = (1000, 1500)  # Optimal Pinterest size
         
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration"""
-        if not os.path.exists(config_path):
-            config_path = "config.example.json"
-        
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        # Rendering needs Pillow; built on first use so scheduling stays lightweight
+        self._renderer = None
+        self._preview_cache = None
+        self._idea_pin_renderer = None
+    
+    @property
+    def renderer(self):
+        """Layered pin renderer (static layers cached per style)"""
+        with self._init_lock:
+            if self._renderer is None:
+                brand_name = self.config.business_info.name
+                if self.shared is not None:
+                    self._renderer = self.shared.pin_renderer(self.pin_size, brand_name)
+                else:
+                    self._renderer = require('pin_renderer').PinRenderer(self.pin_size, brand_name)
+            return self._renderer
     
+    @property
+    def idea_pin_renderer(self):
+        """Idea Pin page renderer, kept so its base layers and worker pool serve every Idea Pin"""
+        with self._init_lock:
+            if self._idea_pin_renderer is None:
+                idea_pins = require('idea_pin_renderer')
+                self._idea_pin_renderer = idea_pins.IdeaPinRenderer(
+                    idea_pins.IDEA_PIN_SIZE,
+                    self.config.business_info.name,
+                    self.preview_cache.cache_dir
+                )
+            return self._idea_pin_renderer
+    
+    @property
+    def preview_cache(self):
+        """On-disk cache of shadowed template preview thumbnails"""
+        with self._init_lock:
+            if self._preview_cache is None and self.shared is not None:
+                self._preview_cache = self.shared.preview_cache
+            if self._preview_cache is None:
+                PreviewCache = require('pin_renderer').PreviewCache
+                self._preview_cache = PreviewCache(
+                    Path(self.config.output.images_directory) / '.cache' / 'previews'
+                )
+            return self._preview_cache
+        
     def _setup_directories(self):
         """Create output directories"""
-        pinterest_dir = Path(self.config['output']['images_directory']) / 'pinterest'
+        pinterest_dir = Path(self.config.output.images_directory) / 'pinterest'
         pinterest_dir.mkdir(parents=True, exist_ok=True)
         
-        schedules_dir = Path(self.config['output']['schedules_directory'])
+        schedules_dir = Path(self.config.output.schedules_directory)
         schedules_dir.mkdir(parents=True, exist_ok=True)
     
     def create_pinterest_pin(
@@ -55,145 +95,36 @@ class PinterestAutomator:
         
         print(f"📌 Creating Pinterest pin for: {template_name}")
         
-        # Create pin image
-        pin = Image.new('RGB', self.pin_size, color=(255, 255, 255))
-        draw = ImageDraw.Draw(pin)
-        
-        # Color schemes for different styles
-        color_schemes = {
-            'romantic': {
-                'bg_top': (255, 192, 203),
-                'bg_bottom': (255, 105, 180),
-                'text': (255, 255, 255),
-                'accent': (255, 20, 147)
-            },
-            'elegant': {
-                'bg_top': (147, 112, 219),
-                'bg_bottom': (75, 0, 130),
-                'text': (255, 255, 255),
-                'accent': (186, 85, 211)
-            },
-            'modern': {
-                'bg_top': (255, 182, 193),
-                'bg_bottom': (255, 105, 180),
-                'text': (60, 60, 60),
-                'accent': (255, 20, 147)
-            }
-        }
-        
-        colors = color_schemes.get(style, color_schemes['romantic'])
-        
-        # Create gradient background
-        for y in range(self.pin_size[1]):
-            ratio = y / self.pin_size[1]
-            color = tuple(
-                int(colors['bg_top'][i] + (colors['bg_bottom'][i] - colors['bg_top'][i]) * ratio)
-                for i in range(3)
-            )
-            draw.rectangle([(0, y), (self.pin_size[0], y + 1)], fill=color)
-        
-        # Add template preview if available
-        preview_height = 800
-        if template_image_path and os.path.exists(template_image_path):
-            try:
-                template_img = Image.open(template_image_path)
-                # Resize to fit
-                template_img.thumbnail((900, preview_height), Image.Resampling.LANCZOS)
-                
-                # Center and paste
-                x = (self.pin_size[0] - template_img.width) // 2
-                y = 200
-                
-                # Add shadow effect
-                pin.paste(template_img, (x, y))
-            except Exception as e:
-                print(f"  ⚠️ Could not add template preview: {e}")
-        
-        # Add text overlay
-        try:
-            title_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 80)
-            subtitle_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 50)
-            cta_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 60)
-        except:
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-            cta_font = ImageFont.load_default()
-        
-        # Add title at top
-        title_text = template_name.upper()
-        title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
-        title_width = title_bbox[2] - title_bbox[0]
-        
-        # Text with shadow for better visibility
-        shadow_offset = 3
-        title_x = (self.pin_size[0] - title_width) // 2
-        title_y = 50
-        
-        # Shadow
-        draw.text((title_x + shadow_offset, title_y + shadow_offset), title_text, fill=(0, 0, 0, 128), font=title_font)
-        # Text
-        draw.text((title_x, title_y), title_text, fill=colors['text'], font=title_font)
-        
-        # Add CTA at bottom
-        cta_text = "✨ Create Yours Now ✨"
-        cta_bbox = draw.textbbox((0, 0), cta_text, font=cta_font)
-        cta_width = cta_bbox[2] - cta_bbox[0]
-        cta_x = (self.pin_size[0] - cta_width) // 2
-        cta_y = self.pin_size[1] - 150
-        
-        # CTA background
-        padding = 30
-        cta_bg_box = [
-            cta_x - padding,
-            cta_y - padding,
-            cta_x + cta_width + padding,
-            cta_y + 80
-        ]
-        draw.rounded_rectangle(cta_bg_box, radius=20, fill=colors['accent'])
-        
-        # CTA text
-        draw.text((cta_x, cta_y), cta_text, fill=colors['text'], font=cta_font)
-        
-        # Add decorative elements
-        self._add_decorative_hearts(draw, colors['accent'])
-        
-        # Add watermark
-        watermark = self.config['business_info']['name']
-        watermark_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 40)
-        watermark_bbox = draw.textbbox((0, 0), watermark, font=watermark_font)
-        watermark_width = watermark_bbox[2] - watermark_bbox[0]
-        watermark_x = (self.pin_size[0] - watermark_width) // 2
-        watermark_y = self.pin_size[1] - 50
-        draw.text((watermark_x, watermark_y), watermark, fill=colors['text'], font=watermark_font)
+        with self.metrics.span('pin_render', style=style) as span:
+            # Add template preview if available (decoded, resized and shadowed once, then cached)
+            preview = None
+            preview_margin = 0
+            preview_height = 800
+            if template_image_path and os.path.exists(template_image_path):
+                hits_before = self.preview_cache.hits
+                try:
+                    preview, preview_margin = self.preview_cache.get(template_image_path, (900, preview_height))
+                except Exception as e:
+                    print(f"  ⚠️ Could not add template preview: {e}")
+                    preview = None
+                    preview_margin = 0
+                span.cache_hit(self.preview_cache.hits - hits_before)
+            
+            # Static layers (gradient, CTA, hearts, watermark) are cached per style
+            pin = self.renderer.render(template_name, style=style, preview=preview, preview_margin=preview_margin)
         
         # Save pin
-        pinterest_dir = Path(self.config['output']['images_directory']) / 'pinterest'
+        pinterest_dir = Path(self.config.output.images_directory) / 'pinterest'
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_name = template_name.replace(' ', '_').lower()
         pin_path = pinterest_dir / f"pin_{safe_name}_{timestamp}.png"
         
-        pin.save(pin_path, quality=95, optimize=True)
+        with self.metrics.span('encode'):
+            pin.save(pin_path, quality=95, optimize=True)
         print(f"  ✓ Pin created: {pin_path}")
         
         return str(pin_path)
     
-    def _add_decorative_hearts(self, draw, color):
-        """Add decorative heart elements"""
-        heart_positions = [
-            (100, 150), (850, 200), (120, 1300), (880, 1350),
-            (50, 700), (920, 750)
-        ]
-        
-        for x, y in heart_positions:
-            size = 40
-            # Simple heart using text emoji
-            try:
-                emoji_font = ImageFont.truetype("/System/Library/Fonts/Apple Color Emoji.ttc", size)
-                draw.text((x, y), "❤️", font=emoji_font, embedded_color=True)
-            except:
-                # Fallback: draw circles
-                draw.ellipse([x, y, x + size, y + size], fill=color + (150,))
-    
     def generate_pin_description(self, template_name: str, template_type: str) -> Dict:
         """Generate Pinterest pin description with keywords"""
         
@@ -224,125 +155,103 @@ class PinterestAutomator:
             'title': f"{template_name} | Create Your Own",
             'description': description,
             'hashtags': hashtags[:10],
-            'link': f"{self.config['business_info']['website']}/templates/{template_name.lower().replace(' ', '-')}"
+            'link': f"{self.config.business_info.website}/templates/{template_name.lower().replace(' ', '-')}"
         }
     
-    def create_pins_for_all_templates(self) -> List[Dict]:
-        """Create Pinterest pins for all templates"""
+    def create_pins_for_all_templates(
+        self,
+        template_type: str = None,
+        style: str = None,
+        chunk_size: int = 50,
+        run_name: str = None
+    ) -> List[Dict]:
+        """Create Pinterest pins for all templates in the catalog
+        
+        run_name (a job id) goes in the output file name, so concurrent runs on one day keep separate files.
+        """
         
         print("\n" + "="*70)
         print("📌 Creating Pinterest Pins for All Templates")
         print("="*70 + "\n")
         
-        # Template definitions
-        templates = [
-            {
-                'name': 'Romantic Birthday Page',
-                'type': 'birthday',
-                'description': 'Perfect birthday surprise for your loved one',
-                'style': 'romantic'
-            },
-            {
-                'name': 'Anniversary Love Story',
-                'type': 'anniversary',
-                'description': 'Celebrate your journey together',
-                'style': 'elegant'
-            },
-            {
-                'name': 'Valentine Special',
-                'type': 'valentine',
-                'description': 'Express your love this Valentine\'s Day',
-                'style': 'romantic'
-            },
-            {
-                'name': 'Proposal Page',
-                'type': 'proposal',
-                'description': 'Pop the question in style',
-                'style': 'elegant'
-            },
-            {
-                'name': 'Love Letter Digital',
-                'type': 'romantic',
-                'description': 'Modern love letters for modern couples',
-                'style': 'modern'
-            },
-            {
-                'name': 'Memory Timeline',
-                'type': 'anniversary',
-                'description': 'Showcase your beautiful memories',
-                'style': 'elegant'
-            },
-            {
-                'name': 'Long Distance Love',
-                'type': 'romantic',
-                'description': 'Bridge the distance with love',
-                'style': 'romantic'
-            },
-            {
-                'name': 'Wedding Invitation',
-                'type': 'wedding',
-                'description': 'Stunning digital wedding invites',
-                'style': 'elegant'
-            }
-        ]
+        # Shared with SEOAutomator, loaded once per catalog file
+        catalog = get_catalog(self.config)
+        total = len(catalog.filter(template_type, style))
         
         all_pins = []
+        pins_file = Path(self.config.output.schedules_directory) / f"{self._output_stem('pinterest_pins', run_name)}.json"
         
-        for i, template in enumerate(templates, 1):
-            print(f"\n[{i}/{len(templates)}] {template['name']}")
-            
-            # Create pin image
-            pin_path = self.create_pinterest_pin(
-                template['name'],
-                template['description'],
-                style=template['style']
-            )
-            
-            # Generate description
-            pin_data = self.generate_pin_description(
-                template['name'],
-                template['type']
-            )
-            
-            # Combine
-            pin_info = {
-                'template_id': template['name'].lower().replace(' ', '_'),
-                'template_name': template['name'],
-                'template_type': template['type'],
-                'pin_image': pin_path,
-                'title': pin_data['title'],
-                'description': pin_data['description'],
-                'hashtags': pin_data['hashtags'],
-                'link': pin_data['link'],
-                'created_at': datetime.now().isoformat(),
-                'status': 'ready'
-            }
-            
-            all_pins.append(pin_info)
-            
-            print(f"  ✓ Pin ready!")
-            time.sleep(0.5)
-        
-        # Save pins data
-        pins_file = Path(self.config['output']['schedules_directory']) / f"pinterest_pins_{datetime.now().strftime('%Y%m%d')}.json"
+        # Pins are written chunk by chunk so large catalogs don't pile up unsaved work
         with open(pins_file, 'w', encoding='utf-8') as f:
-            json.dump(all_pins, f, indent=2, ensure_ascii=False)
+            f.write('[')
+            i = 0
+            for chunk in catalog.chunks(chunk_size, template_type, style):
+                for template in chunk:
+                    i += 1
+                    print(f"\n[{i}/{total}] {template['name']}")
+                    
+                    # Create pin image
+                    pin_path = self.create_pinterest_pin(
+                        template['name'],
+                        template['description'],
+                        template_image_path=template.get('image_path'),
+                        style=template['style']
+                    )
+                    
+                    # Generate description
+                    pin_data = self.generate_pin_description(
+                        template['name'],
+                        template['type']
+                    )
+                    
+                    # Combine
+                    pin_info = {
+                        'template_id': template['id'],
+                        'template_name': template['name'],
+                        'template_type': template['type'],
+                        'style': template['style'],
+                        'pin_image': pin_path,
+                        'title': pin_data['title'],
+                        'description': pin_data['description'],
+                        'hashtags': pin_data['hashtags'],
+                        'link': pin_data['link'],
+                        'created_at': datetime.now().isoformat(),
+                        'status': 'ready'
+                    }
+                    
+                    if all_pins:
+                        f.write(',')
+                    f.write('\n' + json.dumps(pin_info, indent=2, ensure_ascii=False))
+                    all_pins.append(pin_info)
+                    
+                    print(f"  ✓ Pin ready!")
+                
+                f.flush()
+            f.write('\n]\n')
         
         print(f"\n{'='*70}")
         print(f"✅ Created {len(all_pins)} Pinterest pins")
         print(f"💾 Data saved to: {pins_file}")
         print(f"{'='*70}\n")
         
+        self.metrics.print_summary()
+        export_run_metrics(self.metrics, self.config)
+        
         return all_pins
     
-    def create_posting_schedule(self, pins: List[Dict], days: int = 7) -> List[Dict]:
-        """Create Pinterest posting schedule"""
+    def create_posting_schedule(self, pins: List[Dict], days: int = 7, run_name: str = None) -> List[Dict]:
+        """Create Pinterest posting schedule (run_name as for create_pins_for_all_templates)"""
         
         print(f"\n📅 Creating {days}-day posting schedule...")
         
-        pinterest_config = self.config['social_media']['pinterest']
-        daily_pins = pinterest_config['daily_pins']
-        best_times = pinterest_config['best_times']
+        pinterest_config = self.config.social_media.pinterest
+        daily_pins = pinterest_config.daily_pins
+        best_times = pinterest_config.best_times
+        insights = load_insights(self.config)
+        if insights is not None:
+            # The best-performing slots, posted in chronological order
+            best_times = sorted(insights.rank_time_slots(best_times)[:daily_pins])
+            print(f"📈 Posting times chosen from engagement data: {', '.join(best_times)}")
         
         schedule = []
         pin_index = 0
@@ -361,13 +270,15 @@ class PinterestAutomator:
                     'date': date_str,
                     'time': time_slot,
                     'datetime': f"{date_str} {time_slot}",
+                    'schedule_id': schedule_item_id(pin['template_id'], date_str, time_slot),
                     'pin_id': pin['template_id'],
                     'title': pin['title'],
                     'description': pin['description'],
                     'image': pin['pin_image'],
                     'link': pin['link'],
                     'hashtags': ' '.join(pin['hashtags']),
-                    'board': pinterest_config['boards'][0],
+                    'board': pinterest_config.boards[0],
+                    'style': pin.get('style'),
                     'status': 'scheduled'
                 }
                 
@@ -375,7 +286,8 @@ class PinterestAutomator:
                 pin_index += 1
         
         # Save schedule
-        schedule_file = Path(self.config['output']['schedules_directory']) / f"pinterest_schedule_{datetime.now().strftime('%Y%m%d')}.json"
+        stem = self._output_stem('pinterest_schedule', run_name)
+        schedule_file = Path(self.config.output.schedules_directory) / f"{stem}.json"
         with open(schedule_file, 'w', encoding='utf-8') as f:
             json.dump(schedule, f, indent=2, ensure_ascii=False)
         
@@ -383,17 +295,25 @@ class PinterestAutomator:
         print(f"✓ Saved to: {schedule_file}")
         
         # Also create CSV for manual upload
-        self._export_schedule_csv(schedule)
+        self._export_schedule_csv(schedule, stem)
         
         return schedule
     
-    def _export_schedule_csv(self, schedule: List[Dict]):
+    @staticmethod
+    def _output_stem(prefix: str, run_name: str = None) -> str:
+        """Dated output file name, plus the run name if given"""
+        stem = f"{prefix}_{datetime.now().strftime('%Y%m%d')}"
+        if run_name:
+            stem += '_' + ''.join(c if c.isalnum() or c in '-_' else '_' for c in run_name)
+        return stem
+    
+    def _export_schedule_csv(self, schedule: List[Dict], stem: str):
         """Export schedule as CSV for Buffer/Publer"""
         
         try:
             import csv
             
-            csv_file = Path(self.config['output']['schedules_directory']) / f"pinterest_schedule_{datetime.now().strftime('%Y%m%d')}.csv"
+            csv_file = Path(self.config.output.schedules_directory) / f"{stem}.csv"
             
             with open(csv_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=[
@@ -418,97 +338,114 @@ class PinterestAutomator:
         except Exception as e:
             print(f"⚠️ CSV export failed: {e}")
     
-    def create_idea_pins_content(self, topic: str) -> Dict:
-        """Create content for Pinterest Idea Pins (multi-page)"""
+    def create_idea_pins_content(
+        self,
+        topic: str,
+        pages: List[Dict] = None,
+        template_image_path: str = None,
+        style: str = "romantic",
+        slideshow: str = None
+    ) -> Dict:
+        """Create and render Pinterest Idea Pins (multi-page)
+        
+        ``slideshow`` may be 'gif' or 'mp4' to also write an ordered slideshow.
+        """
         
         print(f"\n💡 Creating Idea Pin content for: {topic}")
         
         # Idea pins have multiple pages (2-20)
-        pages = [
-            {
-                'page': 1,
-                'type': 'cover',
-                'text': f"❤️ {topic}",
-                'style': 'bold_title'
-            },
-            {
-                'page': 2,
-                'type': 'tip',
-                'text': "Here's why this matters...",
-                'style': 'text_heavy'
-            },
-            {
-                'page': 3,
-                'type': 'example',
-                'text': "See it in action!",
-                'style': 'image_focus'
-            },
-            {
-                'page': 4,
-                'type': 'cta',
-                'text': "Create yours now!",
-                'style': 'call_to_action'
-            }
-        ]
+        if pages is None:
+            pages = [
+                {
+                    'page': 1,
+                    'type': 'cover',
+                    'text': f"❤️ {topic}",
+                    'style': 'bold_title'
+                },
+                {
+                    'page': 2,
+                    'type': 'tip',
+                    'text': "Here's why this matters...",
+                    'style': 'text_heavy'
+                },
+                {
+                    'page': 3,
+                    'type': 'example',
+                    'text': "See it in action!",
+                    'style': 'image_focus'
+                },
+                {
+                    'page': 4,
+                    'type': 'cta',
+                    'text': "Create yours now!",
+                    'style': 'call_to_action'
+                }
+            ]
+        
+        idea_pins = require('idea_pin_renderer')
+        MIN_PAGES, MAX_PAGES = idea_pins.MIN_PAGES, idea_pins.MAX_PAGES
+        if not MIN_PAGES <= len(pages) <= MAX_PAGES:
+            raise ValueError(f"Idea Pins need {MIN_PAGES}-{MAX_PAGES} pages, got {len(pages)}")
+        
+        # Render every page into an ordered bundle
+        safe_topic = ''.join(c if c.isalnum() else '_' for c in topic.lower())[:50]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        bundle_dir = Path(self.config.output.images_directory) / 'pinterest' / 'idea_pins' / f"{safe_topic}_{timestamp}"
+        
+        with self.metrics.span('idea_pin_render', pages=len(pages)):
+            page_images = self.idea_pin_renderer.render_bundle(pages, bundle_dir, style=style, preview_path=template_image_path)
         
         idea_pin = {
             'topic': topic,
-            'pages': pages,
+            'pages': [dict(page, image=image) for page, image in zip(pages, page_images)],
             'total_pages': len(pages),
             'description': f"Learn how to {topic.lower()} with our easy guide! 💕",
+            'bundle_dir': str(bundle_dir),
+            'slideshow': None,
             'created_at': datetime.now().isoformat()
         }
         
-        print(f"✓ Idea Pin structure created ({len(pages)} pages)")
+        if slideshow:
+            idea_pin['slideshow'] = idea_pins.write_slideshow(page_images, bundle_dir / f"slideshow.{slideshow}")
+        
+        with open(bundle_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(idea_pin, f, indent=2, ensure_ascii=False)
+        
+        print(f"✓ Idea Pin rendered ({len(pages)} pages)")
+        print(f"✓ Bundle saved to: {bundle_dir}")
+        export_run_metrics(self.metrics, self.config)
         
         return idea_pin
 
 
-def main():
-    """Main function"""
+def main(argv: List[str] = None):
+    """Run the full Pinterest automation, or a single CLI subcommand if arguments are given
+    
+    Non-interactive, so it can run under cron or a scheduler:
+        python scripts/pinterest_automator.py                 # pins + 14-day schedule
+        python scripts/pinterest_automator.py schedule --days 7
+        python scripts/pinterest_automator.py idea-pin "Anniversary ideas" --slideshow gif
+    """
+    import sys
+    
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from cli import main as cli_main
+        sys.exit(cli_main(argv))
+    
     print("\n" + "="*70)
     print("📌 Pinterest Automation System")
     print("="*70 + "\n")
+    print("🚀 Running full Pinterest automation...\n")
     
-    automator = PinterestAutomator()
-    
-    print("What would you like to do?")
-    print("1. Create pins for all templates")
-    print("2. Create posting schedule")
-    print("3. Full Pinterest automation (both)")
-    
-    choice = input("\nEnter choice (1-3): ").strip()
+    from job_runner import run_spec
     
-    if choice == '1':
-        pins = automator.create_pins_for_all_templates()
-        print(f"\n✅ Created {len(pins)} pins!")
-        
-    elif choice == '2':
-        # Load existing pins
-        pins_file = list(Path(automator.config['output']['schedules_directory']).glob('pinterest_pins_*.json'))
-        if pins_file:
-            with open(pins_file[-1], 'r') as f:
-                pins = json.load(f)
-            
-            days = int(input("How many days to schedule? (default 7): ") or "7")
-            schedule = automator.create_posting_schedule(pins, days)
-            print(f"\n✅ Created {days}-day schedule with {len(schedule)} posts!")
-        else:
-            print("❌ No pins found. Run option 1 first!")
-        
-    elif choice == '3':
-        print("\n🚀 Running full Pinterest automation...\n")
-        
-        # Create all pins
-        pins = automator.create_pins_for_all_templates()
-        
-        # Create schedule
-        schedule = automator.create_posting_schedule(pins, days=14)
-        
-        print("\n✅ Full Pinterest automation complete!")
-        print(f"   - {len(pins)} pins created")
-        print(f"   - {len(schedule)} posts scheduled")
-        print(f"\n📁 Check the '{automator.config['output']['schedules_directory']}' directory")
+    sys.exit(run_spec({
+        'jobs': [
+            {'id': 'pins', 'task': 'pins'},
+            {'id': 'schedule', 'task': 'schedule', 'days': 14, 'depends_on': ['pins']}
+        ]
+    }))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,282 @@
+"""
+Prompt Registry
+Versioned prompts split into a static, cacheable prefix and a per-call request
+
+Every prompt belongs to a family (``content``, ``seo`` or ``locale``). A
+family's prefix is the brand preamble (business_info) plus the family's
+standing rules; it is identical for every call a brand makes in that family,
+so it goes in the ``system`` blocks with an Anthropic ``cache_control``
+breakpoint and is billed at the cache-read rate after the first call. Only
+the per-call details (topic, style, keyword, outline...) go in the user message.
+A family's rules cover several tasks, so each request still ends with its own
+one-line output format.
+
+The API only caches prefixes above a model minimum (1024 tokens for Sonnet,
+2048 for Haiku), so the breakpoint is only set on prefixes estimated to reach
+the routed model's minimum; shorter ones are sent unmarked. The built-in
+preamble and rules are a few hundred tokens, so caching starts once a brand's
+``brand_guidelines`` push the prefix over the line. Cached vs uncached input
+tokens are reported per run in the metrics report.
+
+Bump a family's or prompt's version when its meaning changes. ``PromptTemplate.key``
+(version plus a digest of the text) identifies a prompt for local caches and
+run reports, so edits never reuse stale cached output.
+"""
+
+import difflib
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from settings import DEFAULT_MODEL_TIERS, ConfigError
+
+# Shortest prefix the API caches, by model family (others: DEFAULT_MIN_CACHE_TOKENS)
+MIN_CACHE_TOKENS = {'haiku': 2048}
+DEFAULT_MIN_CACHE_TOKENS = 1024
+# Rough characters per token, for estimating a prefix's length without a tokenizer
+CHARS_PER_TOKEN = 4
+
+BRAND_PREAMBLE_VERSION = 1
+BRAND_PREAMBLE = """You write marketing content for {name}{website_note}.
+
+Business Context:
+- Brand: {name}
+- Niche: {niche}
+- Audience: {target_audience}
+- Tone: {tone}{guidelines}"""
+
+# Standing rules per family; part of the cached prefix
+FAMILY_GUIDES = {
+    'content': (1, """Social media content rules.
+
+Captions:
+- Include 3-5 relevant emojis
+- Create an emotional hook in the first sentence
+- End with a question or call-to-action to boost engagement
+- Make it shareable and relatable
+- Focus on emotions and relationships
+- Return ONLY the caption text, no explanations
+
+Hashtags:
+- Mix of niche-specific and broad hashtags
+- Include # symbol, no spaces in hashtags
+- Mix of trending and evergreen tags
+- Include variations like #LoveStory #LoveStories
+- Example format: #RomanticGifts #AnniversaryIdeas #LoveMessages
+- Return only the hashtags separated by spaces
+
+Post topics:
+- Topic categories to mix: emotional storytelling (love stories, memorable moments),
+  tips and advice (relationship tips, gift ideas), inspirational quotes, product
+  showcases (template examples), user engagement (questions, polls, challenges),
+  seasonal/trending (holidays, awareness days)
+- Each topic should be 3-8 words and emotionally engaging
+- Some should inspire immediate action; mix educational and entertainment
+- Return one topic per line, no numbers or bullets"""),
+    'seo': (1, """SEO content rules.
+
+Keyword research:
+- Focus on user intent keywords (how to, best way to, ideas for)
+- Specific use cases (birthday, anniversary, proposal, valentine's day)
+- Problem-solving (easy, simple, quick, personalized) and comparisons (vs, alternatives, options)
+- Return one keyword per line, 3-7 words each
+
+Outlines:
+- H1: main title (include keyword); 6-8 H2 sections, each with 2-3 H3 subsections
+- Include: Introduction, How-to steps, Examples, Tips, FAQ, Conclusion
+- Natural keyword integration, focused on user intent
+- Return as a hierarchical list ("H1: Title", "H2: Section", "  H3: Subsection")
+
+Articles:
+- Engaging introduction with hook
+- Natural keyword usage (1-2% density)
+- Use transition words and varied sentence structure
+- Include examples and real-world applications
+- Conversational, friendly tone; actionable tips and steps
+- Strong call-to-action at the end
+- Link suggestions (write as [link: anchor text])
+
+Meta data:
+- Title tag 50-60 characters including the keyword
+- Meta description 150-160 characters including the keyword and a compelling CTA
+- Return as "TITLE: ..." and "DESCRIPTION: ..." lines
+
+Landing pages:
+- H1 title (template name + benefit), hero description (2-3 compelling sentences),
+  5-7 features/benefits, 3-4 use cases, CTA text, meta description (150-160 chars)
+- Return JSON with keys title, hero_description, features, use_cases, cta, meta_description"""),
+    'locale': (1, """Localization rules.
+
+Adapting content for another market:
+- Rewrite each segment as a native writer in the target market would: spelling,
+  vocabulary and idioms; translate it if the target language differs
+- Use the market's currency symbol and natural price points; keep dates in its format
+- Swap holidays and seasonal references for the market's own (or drop ones it doesn't celebrate)
+- Keep the meaning, tone, length and emojis; don't add or remove content
+- Keep markdown, link URLs, hashtags, [link: ...] placeholders and the brand name exactly as written
+- Return every segment, in order, under its own marker line (<<<1>>>, <<<2>>>, ...) and nothing else"""),
+}
+
+
+@dataclass(slots=True)
+class PromptTemplate:
+    """One prompt: its family (cached prefix), version, request template and default route
+
+    max_latency (seconds) is sent as the request timeout, so a slow call fails over
+    to the caller's fallback instead of holding up the batch. ``hedge`` marks a
+    latency-critical task whose slow calls get a second, hedged request.
+    """
+    name: str
+    family: str
+    version: int
+    request: str
+    max_tokens: int
+    tier: str = 'standard'
+    max_latency: Optional[float] = None
+    hedge: bool = False
+
+    @property
+    def key(self) -> str:
+        """Version plus text digest (of the request and family rules) for caches and reports"""
+        guide_version, guide = FAMILY_GUIDES[self.family]
+        text = f"{BRAND_PREAMBLE}\n{guide}\n{self.request}"
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:8]
+        return (f"{self.name}@v{self.version}/{self.family}@v{guide_version}"
+                f"/brand@v{BRAND_PREAMBLE_VERSION}-{digest}")
+
+
+PROMPTS: Dict[str, PromptTemplate] = {prompt.name: prompt for prompt in (
+    PromptTemplate('caption', 'content', 2, """Generate a {style} social media caption for: "{topic}"
+Length: {length_low}-{length_high} characters{goal}
+Return ONLY the caption text, no explanations.""", 500, max_latency=30.0),
+    PromptTemplate('hashtags', 'content', 2, """Generate {count} relevant, popular hashtags for: "{topic}"
+Return only the hashtags separated by spaces.""", 300, tier='fast', max_latency=15.0, hedge=True),
+    PromptTemplate('topics', 'content', 2,
+                   """Generate {count} engaging post topics for a social media campaign.{focus}{avoid}
+Return one topic per line, no numbers or bullets.""", 800, tier='fast', max_latency=30.0),
+    PromptTemplate('related_keywords', 'seo', 1, """Generate 15 related long-tail keyword variations for: "{seed}\"""", 800,
+                   tier='fast', max_latency=30.0),
+    PromptTemplate('outline', 'seo', 1, """Create a detailed blog post outline for the keyword: "{keyword}\"""", 1200,
+                   max_latency=60.0),
+    PromptTemplate('article', 'seo', 1, """Write a comprehensive, SEO-optimized blog post.
+
+Target Keyword: "{keyword}"
+Target Length: {word_count} words
+Outline:
+{outline}
+
+Write the FULL article now. Make it informative, engaging, and valuable.""", 4000, max_latency=300.0),
+    PromptTemplate('article_section', 'seo', 1, """Write one section of an SEO-optimized article.
+
+Target Keyword: "{keyword}"
+Article plan (other sections are written separately):
+{outline}
+
+Write ONLY section {position}:
+{section}
+
+Target Length: about {word_count} words. Start with "## {heading}" and use "###" for subsections.
+{role}""", 1200, max_latency=90.0),
+    PromptTemplate('meta', 'seo', 2, """Create SEO meta data for this article about "{keyword}".
+
+Article excerpt: {excerpt}...{notes}""", 300, tier='fast', max_latency=15.0,
+                   hedge=True),
+    PromptTemplate('landing_page', 'seo', 1, """Create SEO-optimized landing page content for: "{template_name}\"""", 1000,
+                   max_latency=60.0),
+    PromptTemplate('localize', 'locale', 1, """Adapt these {count} text segments from {source} for {target} readers.
+
+Market notes:
+{notes}
+
+{segments}""", 3000, tier='fast', max_latency=90.0),
+)}
+
+
+def min_cache_tokens(model: str) -> int:
+    """Shortest prefix ``model`` caches, in tokens"""
+    return next((tokens for family, tokens in MIN_CACHE_TOKENS.items() if family in (model or '')),
+                DEFAULT_MIN_CACHE_TOKENS)
+
+
+def _task_hint(task: str) -> str:
+    suggestion = difflib.get_close_matches(task, PROMPTS, n=1)
+    return f" (did you mean '{suggestion[0]}'?)" if suggestion else f" (tasks: {', '.join(PROMPTS)})"
+
+
+class PromptRegistry:
+    """Builds ``messages.create`` arguments for one brand, caching its prefixes
+
+    Each task is routed to a model tier with token and latency budgets: the
+    prompt's defaults, overridden per task by ``llm.routes`` (tiers resolve via
+    ``llm.model_tiers``). Records the prompt keys and routes a run used in
+    ``metrics`` (a RunMetrics), if given.
+    """
+
+    def __init__(self, business, metrics=None, llm=None):
+        guidelines = getattr(business, 'brand_guidelines', '')
+        self.preamble = BRAND_PREAMBLE.format(
+            name=business.name,
+            website_note=f" ({business.website})" if business.website else "",
+            niche=business.niche,
+            target_audience=business.target_audience,
+            tone=business.tone,
+            guidelines=f"\n\nBrand Guidelines:\n{guidelines.strip()}" if guidelines.strip() else ""
+        )
+        self.metrics = metrics
+        self.routes = llm.routes if llm is not None else {}
+        unknown = [task for task in self.routes if task not in PROMPTS]
+        if unknown:
+            raise ConfigError('llm.routes', [f"routes.{task}: unknown task{_task_hint(task)}" for task in unknown])
+        self.models = {**DEFAULT_MODEL_TIERS, **(llm.model_tiers if llm is not None else {})}
+        self._systems: Dict[Tuple[str, bool], list] = {}
+        self._lock = threading.Lock()
+
+    def system(self, family: str, model: str = '') -> list:
+        """System blocks for a family (built once, identical on every call)
+
+        The guide carries the cache breakpoint only if the prefix is long enough
+        for ``model`` to cache it; a marker on a shorter prefix does nothing.
+        """
+        guide = FAMILY_GUIDES[family][1]
+        cacheable = (len(self.preamble) + len(guide)) // CHARS_PER_TOKEN >= min_cache_tokens(model)
+        with self._lock:
+            blocks = self._systems.get((family, cacheable))
+            if blocks is None:
+                blocks = self._systems[(family, cacheable)] = [
+                    {'type': 'text', 'text': self.preamble},
+                    {'type': 'text', 'text': guide, **({'cache_control': {'type': 'ephemeral'}} if cacheable else {})}
+                ]
+            return blocks
+
+    def route(self, name: str) -> Dict:
+        """Model, max_tokens, max_latency and hedging for a task"""
+        prompt = PROMPTS[name]
+        override = self.routes.get(name)
+        tier = override.tier if override and override.tier else prompt.tier
+        return {
+            'tier': tier,
+            'model': self.models[tier],
+            'max_tokens': override.max_tokens if override and override.max_tokens else prompt.max_tokens,
+            'max_latency': override.max_latency if override and override.max_latency else prompt.max_latency,
+            'hedge': override.hedge if override and override.hedge is not None else prompt.hedge
+        }
+
+    def request(self, name: str, **fields) -> Dict:
+        """Keyword arguments for ``client.messages.create``, routed for the task"""
+        prompt = PROMPTS[name]
+        route = self.route(name)
+        if self.metrics is not None:
+            self.metrics.use_prompt(name, prompt.key, route)
+        request = {
+            'model': route['model'],
+            'max_tokens': route['max_tokens'],
+            'system': self.system(prompt.family, route['model']),
+            'messages': [{'role': 'user', 'content': prompt.request.format(**fields)}]
+        }
+        if route['max_latency']:
+            request['timeout'] = route['max_latency']
+        if route['hedge']:
+            # Consumed by ProviderChain (llm_providers.py), never sent to the API
+            request['hedge'] = True
+        return request
@@ -0,0 +1,280 @@
+"""
+On-Page SEO Analyzer
+Checks a generated article against the article prompt's rules in one local pass
+
+The article is tokenized once, line by line, into its H2 sections. Keyword and
+phrase density, heading structure against the outline, readability, link
+placeholders, the opening hook and the closing call-to-action are computed
+from those tokens, and the meta title and description are length-checked.
+Every check is 'pass', 'warn' or 'fail'; failures name the sections or meta
+fields to regenerate, so a weak post is repaired piece by piece instead of
+being rewritten.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+# Targets from the seo prompt rules (prompts.py); density is a percentage of words
+KEYWORD_DENSITY = (1.0, 2.0)
+TITLE_LENGTH = (50, 60)
+DESCRIPTION_LENGTH = (150, 160)
+
+# Flesch reading ease: below the target warns, below the floor fails
+READING_EASE_TARGET = 50.0
+READING_EASE_FLOOR = 30.0
+# A section shorter than this share of its word target fails
+MIN_SECTION_SHARE = 0.5
+# Any repeated non-keyword phrase above this density (percent) warns
+PHRASE_DENSITY_LIMIT = 3.0
+
+_STATUS_SCORE = {'pass': 1.0, 'warn': 0.5, 'fail': 0.0}
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+_LINK = re.compile(r'\[link:\s*([^\]]*)\]', re.I)
+_SENTENCE_END = re.compile(r'[.!?]+(?=\s|$)')
+_VOWEL_GROUP = re.compile(r'[aeiouy]+')
+_READER = re.compile(r'\b(you|your|imagine|ever)\b', re.I)
+_CTA = re.compile(r'\b(create|start|try|make|discover|share|join|visit|explore|begin|sign up|get started)\b', re.I)
+_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'how', 'in', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'their', 'this', 'to', 'was', 'with', 'you', 'your'
+})
+
+
+@dataclass(slots=True)
+class SectionStats:
+    """Counts for one H2 section (index 0 may be the text before the first H2)"""
+    heading: str
+    lines: List[str] = field(default_factory=list)
+    words: int = 0
+    sentences: int = 0
+    syllables: int = 0
+    keyword_hits: int = 0
+    first_paragraph: str = ""
+    last_paragraph: str = ""
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines).strip()
+
+    @property
+    def reading_ease(self) -> float:
+        if not self.words:
+            return 100.0
+        return 206.835 - 1.015 * (self.words / max(self.sentences, 1)) - 84.6 * (self.syllables / self.words)
+
+
+@dataclass(slots=True)
+class SEOReport:
+    """Analysis of one article; ``failing_sections`` maps section index to what to fix"""
+    keyword: str
+    word_count: int
+    sections: List[SectionStats]
+    checks: Dict[str, Dict]
+    aligned: bool
+    failing_sections: Dict[int, List[str]] = field(default_factory=dict)
+    failing_meta: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def score(self) -> float:
+        """Share of checks passed (warnings count half), 0-1"""
+        if not self.checks:
+            return 1.0
+        return sum(_STATUS_SCORE[check['status']] for check in self.checks.values()) / len(self.checks)
+
+    @property
+    def passed(self) -> bool:
+        return not self.failing_sections and not self.failing_meta
+
+    def to_dict(self) -> Dict:
+        return {
+            'score': round(self.score, 3),
+            'word_count': self.word_count,
+            'checks': self.checks,
+            'failing_sections': {self.sections[i].heading: problems for i, problems in self.failing_sections.items()},
+            'failing_meta': self.failing_meta
+        }
+
+
+def _check(status: str, value, target, detail: str = "") -> Dict:
+    return {'status': status, 'value': value, 'target': target, 'detail': detail}
+
+
+def _range_status(value: float, low: float, high: float, tolerance: float) -> str:
+    if low <= value <= high:
+        return 'pass'
+    return 'warn' if low - tolerance <= value <= high + tolerance else 'fail'
+
+
+def _count_phrase(tokens: List[str], phrase: Tuple[str, ...]) -> int:
+    size = len(phrase)
+    return sum(1 for i, token in enumerate(tokens) if token == phrase[0] and tuple(tokens[i:i + size]) == phrase)
+
+
+def _tokenize(article: str, keyword: Tuple[str, ...]) -> Tuple[int, List[SectionStats], Counter]:
+    """Single pass over the article: (H1 count, sections, counts of 2-3 word phrases)"""
+    h1_count = 0
+    sections = [SectionStats(heading='')]
+    phrases = Counter()
+    tokens: List[str] = []
+
+    def close(section: SectionStats):
+        section.keyword_hits = _count_phrase(tokens, keyword) if keyword else 0
+        for size in (2, 3):
+            for i in range(len(tokens) - size + 1):
+                gram = tuple(tokens[i:i + size])
+                if gram[0] not in _STOPWORDS and gram[-1] not in _STOPWORDS:
+                    phrases[gram] += 1
+
+    for line in article.split('\n'):
+        heading = _HEADING.match(line.strip())
+        if heading and len(heading.group(1)) <= 2:
+            if len(heading.group(1)) == 1:
+                h1_count += 1
+                continue
+            close(sections[-1])
+            tokens = []
+            sections.append(SectionStats(heading=heading.group(2).strip(), lines=[line]))
+            continue
+
+        section = sections[-1]
+        section.lines.append(line)
+        if heading or not line.strip():
+            continue
+        prose = _LINK.sub(r'\1', line)
+        words = _WORD.findall(prose.lower())
+        tokens.extend(words)
+        section.words += len(words)
+        section.sentences += max(1, len(_SENTENCE_END.findall(prose)))
+        section.syllables += sum(len(_VOWEL_GROUP.findall(word)) or 1 for word in words)
+        section.first_paragraph = section.first_paragraph or line.strip()
+        section.last_paragraph = line.strip()
+    close(sections[-1])
+
+    # Text before the first H2 counts as a section only if it has prose
+    if not sections[0].words:
+        sections = sections[1:]
+    return h1_count, sections, phrases
+
+
+def analyze_article(article: str, keyword: str, outline_sections: Sequence = (),
+                    title: str = None, description: str = None) -> SEOReport:
+    """Check an article (and its meta title/description, if given) against the SEO rules
+
+    ``outline_sections`` are the article_sections.OutlineSection items the article
+    was written from; their headings and word targets drive the structure checks.
+    """
+    keyword_tokens = tuple(_WORD.findall(keyword.lower()))
+    h1_count, sections, phrases = _tokenize(article, keyword_tokens)
+    total_words = sum(section.words for section in sections)
+    checks: Dict[str, Dict] = {}
+    problems: Dict[int, List[str]] = {}
+    failing_meta: Dict[str, str] = {}
+
+    def flag(index: int, problem: str):
+        problems.setdefault(index, []).append(problem)
+
+    # Keyword density
+    hits = sum(section.keyword_hits for section in sections)
+    density = 100.0 * hits * len(keyword_tokens) / total_words if total_words else 0.0
+    low, high = KEYWORD_DENSITY
+    status = _range_status(density, low, high, 0.5)
+    checks['keyword_density'] = _check(status, round(density, 2), [low, high], f"{hits} mentions of '{keyword}'")
+    if status == 'fail' and sections:
+        if density < low:
+            for i, section in enumerate(sections):
+                if not section.keyword_hits:
+                    flag(i, f'mention "{keyword}" naturally at least once')
+        else:
+            densest = max(range(len(sections)), key=lambda i: sections[i].keyword_hits / max(sections[i].words, 1))
+            flag(densest, f'use "{keyword}" less often; prefer natural variations')
+
+    # Repeated phrases other than the keyword
+    top = [
+        (' '.join(gram), round(100.0 * count * len(gram) / total_words, 2))
+        for gram, count in phrases.most_common(10)
+        if count > 1 and gram != keyword_tokens and total_words
+    ][:5]
+    stuffed = [phrase for phrase, phrase_density in top if phrase_density > PHRASE_DENSITY_LIMIT]
+    checks['phrase_density'] = _check('warn' if stuffed else 'pass', dict(top), PHRASE_DENSITY_LIMIT,
+                                      f"overused: {', '.join(stuffed)}" if stuffed else "")
+
+    # Heading structure against the outline
+    headings = [section.heading for section in sections if section.heading]
+    expected = [section.heading for section in outline_sections]
+    found = {heading.lower() for heading in headings}
+    missing = [heading for heading in expected if heading.lower() not in found]
+    # Sections line up one-to-one with the outline, so a failing section can be rewritten in place
+    aligned = bool(expected) and [s.heading.lower() for s in sections] == [h.lower() for h in expected]
+    detail = []
+    if h1_count != 1:
+        detail.append(f"{h1_count} H1 headings")
+    if missing:
+        detail.append(f"missing: {', '.join(missing)}")
+    checks['headings'] = _check('fail' if detail else 'pass', len(headings), len(expected) or None, '; '.join(detail))
+
+    # Section lengths against their targets
+    targets = {heading.lower(): getattr(section, 'word_target', 0) for heading, section in zip(expected, outline_sections)}
+    short = []
+    for i, section in enumerate(sections):
+        target = targets.get(section.heading.lower(), 0)
+        if target and section.words < MIN_SECTION_SHARE * target:
+            short.append(section.heading)
+            flag(i, f"too short ({section.words} words); write about {target} words")
+    checks['section_length'] = _check('fail' if short else 'pass', total_words, sum(targets.values()) or None,
+                                      f"short: {', '.join(short)}" if short else "")
+
+    # Readability
+    ease = (206.835 - 1.015 * (total_words / max(sum(s.sentences for s in sections), 1))
+            - 84.6 * (sum(s.syllables for s in sections) / max(total_words, 1)))
+    hard = []
+    for i, section in enumerate(sections):
+        if section.words and section.reading_ease < READING_EASE_FLOOR:
+            hard.append(section.heading)
+            flag(i, f"hard to read (reading ease {section.reading_ease:.0f}); use shorter sentences and simpler words")
+    status = 'fail' if hard else ('pass' if ease >= READING_EASE_TARGET else 'warn')
+    checks['readability'] = _check(status, round(ease, 1), READING_EASE_TARGET,
+                                   f"hard sections: {', '.join(hard)}" if hard else "")
+
+    # Opening hook and closing call-to-action
+    if sections:
+        opening = sections[0].first_paragraph
+        hook = '?' in opening or '!' in opening or bool(_READER.search(opening))
+        checks['hook'] = _check('pass' if hook else 'fail', hook, True)
+        if not hook:
+            flag(0, "open with an engaging hook: a question or a bold line that speaks to the reader")
+        closing = sections[-1].last_paragraph
+        cta = bool(_CTA.search(closing))
+        checks['call_to_action'] = _check('pass' if cta else 'fail', cta, True)
+        if not cta:
+            flag(len(sections) - 1, "end with a clear call-to-action")
+
+    # Link placeholders
+    links = len(_LINK.findall(article))
+    checks['link_placeholders'] = _check('pass' if links else 'warn', links, 1)
+
+    # Meta title and description
+    for name, value, (low, high) in (('title', title, TITLE_LENGTH), ('description', description, DESCRIPTION_LENGTH)):
+        if value is None:
+            continue
+        issues = []
+        if not low <= len(value) <= high:
+            issues.append(f"is {len(value)} characters; keep it {low}-{high}")
+        if keyword_tokens and _count_phrase(_WORD.findall(value.lower()), keyword_tokens) == 0:
+            issues.append(f'should include "{keyword}"')
+        checks[f"meta_{name}"] = _check('fail' if issues else 'pass', len(value), [low, high], '; '.join(issues))
+        if issues:
+            failing_meta[name] = f"the {name} " + ' and '.join(issues)
+
+    return SEOReport(
+        keyword=keyword,
+        word_count=total_words,
+        sections=sections,
+        checks=checks,
+        aligned=aligned,
+        failing_sections={i: problems[i] for i in sorted(problems)},
+        failing_meta=failing_meta
+    )
@@ -4,126 +4,210 @@ Automates keyword research, blog post generation, and SEO optimization
 """
 
 import json
-import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import time
 
-try:
-    from anthropic import Anthropic
-    import requests
-    from bs4 import BeautifulSoup
-except ImportError as e:
-    print(f"Missing dependency: {e}")
-    exit(1)
+from article_sections import OutlineSection, assign_word_targets, outline_plan, parse_outline, stitch_sections
+from instrumentation import RunMetrics, atomic_write, export_run_metrics
+from keyword_expansion import KeywordExpander, checkpoint_name, parse_keyword_lines
+from ngram_volume import NgramVolumeIndex, volume_points
+from link_index import LINK_PLACEHOLDER, LinkIndex, blog_url, resolve_placeholders
+from lazy_imports import require
+from locales import Localizer, check_focus_locations, join_segments, locale_url, split_segments
+from prompts import PromptRegistry
+from seo_analyzer import analyze_article
+from settings import MarketingConfig, load_config
+from template_catalog import get_catalog
+
+
+# Landing page copy adapted per locale; everything else is shared
+LANDING_LOCALE_FIELDS = ('title', 'hero_description', 'features', 'use_cases', 'cta', 'meta_description')
 
 
 class SEOAutomator:
     """Automate SEO tasks for better organic traffic"""
     
-    def __init__(self, config_path: str = "config.json"):
-        self.config = self._load_config(config_path)
-        self.ai_client = self._init_ai_client()
+    def __init__(self, config_path: str = "config.json", config: MarketingConfig = None, shared=None):
+        # A preloaded config (a brand from tenants.py) wins over config_path;
+        # shared is the tenants.SharedResources every brand in the process reuses
+        self.config = config if config is not None else load_config(config_path)
+        self.shared = shared
+        # Guards the lazily created client, localizer and volume index (job_runner shares automators)
+        self._init_lock = threading.RLock()
+        self._ai_client = None
+        self._ai_client_ready = False
+        self._volume_index = None
+        self._volume_index_ready = False
+        self._localizer = None
         self._setup_directories()
-        
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration"""
-        if not os.path.exists(config_path):
-            config_path = "config.example.json"
-        
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        self.metrics = RunMetrics('seo_automator')
+        self.prompts = PromptRegistry(self.config.business_info, self.metrics, self.config.llm)
+        check_focus_locations(self.config.seo)
+        
+    @property
+    def ai_client(self):
+        """AI client, created on first use so non-AI commands never import the SDK"""
+        if not self._ai_client_ready:
+            self.ensure_ai_client()
+        return self._ai_client
+    
+    def ensure_ai_client(self):
+        """Create the AI client once, even when jobs or worker threads ask for it at the same time"""
+        with self._init_lock:
+            if not self._ai_client_ready:
+                if self.shared is not None:
+                    self._ai_client = self.shared.llm_client(self.config, self._init_ai_client)
+                else:
+                    self._ai_client = self._init_ai_client()
+                self._ai_client_ready = True
+                
+                from llm_providers import provider_stats
+                stats = provider_stats(self._ai_client)
+                if stats is not None:
+                    self.metrics.attach('providers', stats)
+        return self._ai_client
+    
+    @ai_client.setter
+    def ai_client(self, client):
+        with self._init_lock:
+            self._ai_client = client
+            self._ai_client_ready = True
+            self._localizer = None
+    
+    @property
+    def localizer(self) -> Localizer:
+        """Locale fan-out for seo.focus_locations (locales.py), sharing this automator's client"""
+        with self._init_lock:
+            if self._localizer is None:
+                self._localizer = Localizer(self.config, self.ai_client, self.prompts, self.metrics)
+            return self._localizer
     
     def _init_ai_client(self):
-        """Initialize AI client"""
-        api_key = self.config.get('anthropic_api_key')
-        if not api_key or api_key == "YOUR_ANTHROPIC_API_KEY":
+        """Initialize AI client (or a replay/fake client per llm.mode) behind failover"""
+        from llm_clients import create_offline_client, with_recording
+        from llm_providers import build_provider_chain
+        
+        offline_client = create_offline_client(self.config.llm)
+        if offline_client:
+            print(f"🧪 Using offline LLM client (mode: {self.config.llm.mode})")
+            return build_provider_chain(offline_client, self.config)
+        
+        if not self.config.has_anthropic_key:
             print("⚠️ Warning: API key not configured")
-            return None
+            return build_provider_chain(None, self.config)
         
-        return Anthropic(api_key=api_key)
+        Anthropic = require('anthropic').Anthropic
+        client = with_recording(Anthropic(api_key=self.config.anthropic_api_key), self.config.llm)
+        return build_provider_chain(client, self.config)
     
     def _setup_directories(self):
         """Create output directories"""
-        Path(self.config['output']['content_directory']).mkdir(parents=True, exist_ok=True)
-        Path(self.config['output']['reports_directory']).mkdir(parents=True, exist_ok=True)
+        Path(self.config.output.content_directory).mkdir(parents=True, exist_ok=True)
+        Path(self.config.output.reports_directory).mkdir(parents=True, exist_ok=True)
     
-    def research_keywords(self, seed_keywords: List[str] = None) -> List[Dict]:
-        """Research long-tail keywords"""
+    def research_keywords(self, seed_keywords: List[str] = None, resume: bool = False) -> List[Dict]:
+        """Research long-tail keywords, expanding promising ones again (keyword_expansion.py)
+        
+        With resume=True, an expansion of the same seeds that stopped (spent budget,
+        Ctrl-C) continues from its checkpoint instead of starting over.
+        """
         
         if not seed_keywords:
-            seed_keywords = self.config['seo']['target_keywords']
+            seed_keywords = list(self.config.seo.target_keywords)
         
         print(f"\n🔍 Researching keywords...")
         print(f"Seed keywords: {len(seed_keywords)}")
         
-        all_keywords = []
-        
-        for seed in seed_keywords:
-            print(f"\n  Analyzing: '{seed}'")
-            
-            # Get related keywords
-            related = self._get_related_keywords(seed)
-            
-            # Get question-based keywords
-            questions = self._get_question_keywords(seed)
-            
-            # Combine and score
-            for kw in related + questions:
-                all_keywords.append({
-                    'keyword': kw,
-                    'seed': seed,
-                    'type': 'question' if '?' in kw or kw.split()[0].lower() in ['how', 'what', 'why', 'when', 'where'] else 'phrase',
-                    'estimated_difficulty': self._estimate_difficulty(kw),
-                    'priority': self._calculate_priority(kw)
-                })
+        settings = self.config.seo.keyword_expansion
+        if not self.ai_client and settings.max_depth > 1:
+            # Offline suggestions are templates; expanding them again only stacks modifiers
+            settings = replace(settings, max_depth=1)
+        
+        expander = KeywordExpander(
+            self._get_related_keywords,
+            self._score_keywords,
+            settings,
+            Path(self.config.output.reports_directory) / checkpoint_name(seed_keywords, settings),
+            max_workers=self.config.llm.max_concurrency,
+            token_estimate=self.prompts.route('related_keywords')['max_tokens']
+        )
+        if expander.begin(seed_keywords, resume=resume):
+            print(f"  ↻ Resuming: {len(expander.results)} keywords found, {expander.pending} queued, "
+                  f"{expander.calls} calls spent")
+        else:
+            # Question keywords come from templates, so they are not expanded further
+            for seed in expander.seeds:
+                expander.discover({'keyword': seed, 'seed': seed, 'depth': 0}, self._get_question_keywords(seed),
+                                  expandable=False)
+        
+        found = expander.run()
+        expander.finish()
+        volumes = self.volume_index.estimate([item['keyword'] for item in found]) if self.volume_index else None
+        
+        all_keywords = [
+            {
+                'keyword': item['keyword'],
+                'seed': item['seed'],
+                'parent': item['parent'],
+                'depth': item['depth'],
+                'type': 'question' if '?' in item['keyword'] or item['keyword'].split()[0].lower() in ['how', 'what', 'why', 'when', 'where'] else 'phrase',
+                'estimated_difficulty': self._estimate_difficulty(item['keyword']),
+                **({'estimated_volume': round(float(volumes[i]), 1)} if volumes is not None else {}),
+                'priority': item['priority']
+            }
+            for i, item in enumerate(found)
+        ]
         
         # Sort by priority
         all_keywords.sort(key=lambda x: x['priority'], reverse=True)
         
         # Save keyword research
-        output_file = Path(self.config['output']['reports_directory']) / f"keywords_{datetime.now().strftime('%Y%m%d')}.json"
+        output_file = Path(self.config.output.reports_directory) / f"keywords_{datetime.now().strftime('%Y%m%d')}.json"
         with open(output_file, 'w') as f:
             json.dump(all_keywords, f, indent=2)
         
-        print(f"\n✓ Found {len(all_keywords)} keywords")
+        print(f"\n✓ Found {len(all_keywords)} keywords "
+              f"({expander.calls} expansion calls, {expander.tokens} tokens, depth {settings.max_depth})")
+        if expander.pending:
+            print(f"⏸️ Budget spent with {expander.pending} keywords left to expand; raise "
+                  f"seo.keyword_expansion.max_calls/max_tokens and rerun with --resume")
+        if expander.failed:
+            print(f"⚠️ {len(expander.failed)} expansion calls failed; rerun with --resume to retry them")
         print(f"✓ Saved to: {output_file}")
+        export_run_metrics(self.metrics, self.config)
         
         return all_keywords
     
-    def _get_related_keywords(self, seed: str) -> List[str]:
-        """Get related keyword variations"""
+    def _get_related_keywords(self, seed: str, depth: int = 0) -> Tuple[List[str], Optional[int]]:
+        """Get related keyword variations and the tokens the call used (None if the call failed)
+        
+        Runs on expansion worker threads. Fallback suggestions only stand in for seeds.
+        """
         
+        fallback = self._fallback_related_keywords(seed) if depth == 0 else []
         if not self.ai_client:
-            return self._fallback_related_keywords(seed)
+            return fallback, 0
         
-        prompt = f"""Generate 15 related long-tail keyword variations for: "{seed}"
-
-Context: Romantic digital pages, anniversary gifts, love messages
-
-Focus on:
-- User intent keywords (how to, best way to, ideas for)
-- Specific use cases (birthday, anniversary, proposal, valentine's day)
-- Problem-solving (easy, simple, quick, personalized)
-- Comparisons (vs, alternatives, options)
-
-Return one keyword per line, 3-7 words each."""
+        request = self.prompts.request('related_keywords', seed=seed)
 
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=800,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('related_keywords') as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
-            keywords = [line.strip() for line in message.content[0].text.strip().split('\n') if line.strip()]
-            keywords = [k.strip('- 0123456789.').lower() for k in keywords]
-            return keywords[:15]
+            usage = message.usage
+            tokens = sum(getattr(usage, key, 0) or 0 for key in (
+                'input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens'))
+            return parse_keyword_lines(message.content[0].text)[:15], tokens
             
         except Exception as e:
             print(f"  ⚠️ Error: {e}")
-            return self._fallback_related_keywords(seed)
+            return fallback, None
     
     def _fallback_related_keywords(self, seed: str) -> List[str]:
         """Fallback keyword suggestions"""
@@ -165,6 +249,29 @@ Return one keyword per line, 3-7 words each."""
         else:
             return 'hard'
     
+    @property
+    def volume_index(self):
+        """N-gram volume index from seo.volume_table (memory-mapped on first use), or None"""
+        if not self._volume_index_ready:
+            with self._init_lock:
+                if not self._volume_index_ready:
+                    path = self.config.seo.volume_table
+                    if path:
+                        try:
+                            self._volume_index = NgramVolumeIndex(path)
+                        except (OSError, ValueError) as e:
+                            print(f"⚠️ Volume table unavailable, ranking keywords by heuristics only: {e}")
+                    self._volume_index_ready = True
+        return self._volume_index
+    
+    def _score_keywords(self, keywords: List[str]) -> List[int]:
+        """Priority for a batch of keywords: heuristics plus estimated search volume, if a table is set"""
+        scores = [self._calculate_priority(keyword) for keyword in keywords]
+        if not keywords or not self.volume_index:
+            return scores
+        points = volume_points(self.volume_index.estimate(keywords), self.config.seo.volume_weight)
+        return [score + int(bonus) for score, bonus in zip(scores, points)]
+    
     def _calculate_priority(self, keyword: str) -> int:
         """Calculate keyword priority score"""
         score = 0
@@ -204,59 +311,61 @@ Return one keyword per line, 3-7 words each."""
         # Generate meta data
         meta = self._generate_meta_data(keyword, article)
         
+        # Check the post locally; only failing sections and meta fields are regenerated
+        article, meta, report = self._review_article(keyword, outline, word_count, article, meta)
+        
+        # Point link placeholders at our own best-matching pages
+        url = blog_url(keyword)
+        article, internal_links = self._link_article(url, keyword, article)
+        
         blog_post = {
             'keyword': keyword,
+            'url': url,
             'title': meta['title'],
             'meta_description': meta['description'],
             'outline': outline,
             'content': article,
-            'word_count': len(article.split()),
-            'internal_links': self._suggest_internal_links(keyword),
+            'word_count': report.word_count,
+            'seo_report': report.to_dict(),
+            'internal_links': internal_links,
             'images_needed': self._suggest_images(outline),
             'created_at': datetime.now().isoformat()
         }
         
+        # Variants for the other focus locations share the outline, links and images
+        variants = self.localizer.localize_fields({'title': blog_post['title'],
+                                                   'meta_description': blog_post['meta_description'],
+                                                   'content': split_segments(article)})
+        if variants:
+            blog_post['locale'] = self.localizer.base_code
+            blog_post['locales'] = {code: {**variant, 'url': locale_url(code, url),
+                                           'content': join_segments(variant['content'])}
+                                    for code, variant in variants.items()}
+        
         # Save blog post
         safe_filename = keyword.replace(' ', '_').replace('/', '_')[:50]
-        output_file = Path(self.config['output']['content_directory']) / f"blog_{safe_filename}_{datetime.now().strftime('%Y%m%d')}.json"
+        output_file = Path(self.config.output.content_directory) / f"blog_{safe_filename}_{datetime.now().strftime('%Y%m%d')}.json"
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(blog_post, f, indent=2, ensure_ascii=False)
+        # Concurrent jobs index this directory (link_index.py); they must never read a partial file
+        atomic_write(output_file, json.dumps(blog_post, indent=2, ensure_ascii=False))
         
-        print(f"✓ Blog post generated: {len(article.split())} words")
+        print(f"✓ Blog post generated: {report.word_count} words (SEO score {report.score:.0%})")
+        if variants:
+            print(f"✓ Locale variants: {', '.join(variants)}")
         print(f"✓ Saved to: {output_file}")
+        export_run_metrics(self.metrics, self.config)
         
         return blog_post
     
     def _generate_outline(self, keyword: str) -> List[str]:
         """Generate article outline"""
         
-        prompt = f"""Create a detailed blog post outline for the keyword: "{keyword}"
-
-Context: Business selling romantic digital pages and personalized love messages
-
-Requirements:
-- H1: Main title (include keyword)
-- 6-8 H2 sections
-- Each H2 should have 2-3 H3 subsections
-- Include: Introduction, How-to steps, Examples, Tips, FAQ, Conclusion
-- Natural keyword integration
-- Focus on user intent
-
-Return as hierarchical list:
-H1: Title
-H2: Section 1
-  H3: Subsection 1.1
-  H3: Subsection 1.2
-H2: Section 2
-..."""
+        request = self.prompts.request('outline', keyword=keyword)
 
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1200,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('outline') as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
             outline_text = message.content[0].text.strip()
             outline = [line.strip() for line in outline_text.split('\n') if line.strip()]
@@ -267,33 +376,19 @@ H2: Section 2
             return [f"H1: {keyword.title()}", "H2: Introduction", "H2: Main Content", "H2: Conclusion"]
     
     def _generate_article(self, keyword: str, outline: List[str], word_count: int) -> str:
-        """Generate full article content"""
+        """Generate full article content (one call per H2 section when seo.article_mode is 'sections')"""
+        
+        if self.config.seo.article_mode == 'sections':
+            title, sections = parse_outline(outline)
+            if len(sections) >= 2:
+                return self._generate_article_sections(keyword, title or keyword.title(), sections, word_count)
+        
+        request = self.prompts.request('article', keyword=keyword, word_count=word_count, outline='\n'.join(outline))
         
-        prompt = f"""Write a comprehensive, SEO-optimized blog post.
-
-Target Keyword: "{keyword}"
-Target Length: {word_count} words
-Outline:
-{chr(10).join(outline)}
-
-Content Requirements:
-- Engaging introduction with hook
-- Natural keyword usage (1-2% density)
-- Use transition words and varied sentence structure
-- Include examples and real-world applications
-- Conversational, friendly tone
-- Actionable tips and steps
-- Strong call-to-action at the end
-- Link suggestions (write as [link: anchor text])
-
-Write the FULL article now. Make it informative, engaging, and valuable."""
-
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('article') as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
             article = message.content[0].text.strip()
             return article
@@ -302,27 +397,110 @@ Write the FULL article now. Make it informative, engaging, and valuable."""
             print(f"  ⚠️ Article generation error: {e}")
             return f"# {keyword.title()}\n\nArticle content here..."
     
-    def _generate_meta_data(self, keyword: str, article: str) -> Dict:
-        """Generate SEO meta data"""
+    def _generate_article_sections(self, keyword: str, title: str, sections: List[OutlineSection],
+                                   word_count: int) -> str:
+        """Write every H2 section concurrently, then stitch them into one article"""
         
-        prompt = f"""Create SEO meta data for this article about "{keyword}".
-
-Article excerpt: {article[:500]}...
-
-Generate:
-1. Title tag (50-60 characters, include keyword)
-2. Meta description (150-160 characters, include keyword, compelling CTA)
+        assign_word_targets(sections, word_count)
+        plan = outline_plan(title, sections)
+        workers = min(len(sections), self.config.llm.max_concurrency)
+        
+        with self.metrics.span('article', sections=len(sections)):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                texts = list(executor.map(
+                    lambda i: self._generate_section(keyword, plan, sections, i), range(len(sections))
+                ))
+        
+        return stitch_sections(title, sections, texts)
+    
+    def _generate_section(self, keyword: str, plan: str, sections: List[OutlineSection], index: int,
+                          notes: str = "", fallback: str = None) -> str:
+        """Generate one article section, retrying it alone up to seo.section_retries times
 
-Return as:
-TITLE: [your title]
-DESCRIPTION: [your description]"""
+        ``notes`` lists what a regenerated section must fix; ``fallback`` is returned
+        if every attempt fails (by default, the section's headings).
+        """
+        
+        section = sections[index]
+        if index == 0:
+            role = "This section opens the article: start with an engaging hook."
+        elif index == len(sections) - 1:
+            role = "This section closes the article: end with a strong call-to-action."
+        else:
+            role = (f"Continue naturally from \"{sections[index - 1].heading}\"; "
+                    "do not re-introduce the topic or wrap up the article.")
+        if notes:
+            role += f"\nThe previous draft of this section needs fixing: {notes}."
+        request = self.prompts.request('article_section', keyword=keyword, outline=plan,
+                                       position=f"{index + 1} of {len(sections)}", section=section.as_outline(),
+                                       heading=section.heading, word_count=section.word_target, role=role)
+        
+        attempts = self.config.seo.section_retries + 1
+        for attempt in range(attempts):
+            try:
+                with self.metrics.span('article_section', section=index + 1) as span:
+                    if attempt:
+                        span.retry()
+                    message = self.ai_client.messages.create(**request)
+                    span.record_usage(message)
+                return message.content[0].text.strip()
+            except Exception as e:
+                print(f"  ⚠️ Section '{section.heading}' error (attempt {attempt + 1}/{attempts}): {e}")
+        
+        if fallback is not None:
+            return fallback
+        return '\n\n'.join([f"## {section.heading}"] + [f"### {sub}" for sub in section.subsections])
+    
+    def _review_article(self, keyword: str, outline: List[str], word_count: int, article: str, meta: Dict):
+        """Analyze the post, regenerating failing sections and meta fields for seo.fix_attempts rounds"""
+        
+        title, sections = parse_outline(outline)
+        title = title or keyword.title()
+        assign_word_targets(sections, word_count)
+        
+        for attempt in range(self.config.seo.fix_attempts + 1):
+            with self.metrics.span('seo_analysis'):
+                report = analyze_article(article, keyword, sections, meta['title'], meta['description'])
+            fix_sections = report.failing_sections if report.aligned else {}
+            if attempt == self.config.seo.fix_attempts or not (fix_sections or report.failing_meta):
+                break
+            
+            if fix_sections:
+                print(f"  🔧 Regenerating {len(fix_sections)} section(s): "
+                      f"{', '.join(sections[i].heading for i in fix_sections)}")
+                article = self._regenerate_sections(keyword, title, sections, report)
+            if report.failing_meta:
+                print(f"  🔧 Regenerating meta {', '.join(report.failing_meta)}")
+                meta = self._fix_meta_data(keyword, article, meta, report.failing_meta)
+        
+        return article, meta, report
+    
+    def _regenerate_sections(self, keyword: str, title: str, sections: List[OutlineSection], report) -> str:
+        """Rewrite only the failing sections (concurrently) and stitch the article back together"""
+        
+        texts = [section.text for section in report.sections]
+        plan = outline_plan(title, sections)
+        workers = min(len(report.failing_sections), self.config.llm.max_concurrency)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            rewritten = {
+                i: executor.submit(self._generate_section, keyword, plan, sections, i, '; '.join(problems), texts[i])
+                for i, problems in report.failing_sections.items()
+            }
+        for i, future in rewritten.items():
+            texts[i] = future.result()
+        
+        return stitch_sections(title, sections, texts)
+    
+    def _generate_meta_data(self, keyword: str, article: str, notes: str = "") -> Dict:
+        """Generate SEO meta data"""
+        
+        request = self.prompts.request('meta', keyword=keyword, excerpt=article[:500], notes=notes)
 
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=300,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('meta') as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
             response = message.content[0].text.strip()
             
@@ -342,13 +520,45 @@ DESCRIPTION: [your description]"""
                 'description': f"Learn everything about {keyword}. Step-by-step guide with tips and examples."
             }
     
-    def _suggest_internal_links(self, keyword: str) -> List[str]:
-        """Suggest internal linking opportunities"""
+    def _fix_meta_data(self, keyword: str, article: str, meta: Dict, failing: Dict[str, str]) -> Dict:
+        """Regenerate meta data, keeping only the fields that failed analysis"""
+        
+        notes = f"\n\nThe previous version needs fixing: {'; '.join(failing.values())}."
+        fixed = self._generate_meta_data(keyword, article, notes)
+        return {**meta, **{name: fixed[name] for name in failing if fixed.get(name)}}
+    
+    def _link_article(self, url: str, keyword: str, article: str):
+        """Resolve [link: anchor] placeholders and related pages from the link index (link_index.py)
+
+        Returns the article with placeholders turned into links, and the post's
+        internal links; both are recorded in the index's link graph.
+        """
+        index = LinkIndex.for_config(self.config)
+        try:
+            with self.metrics.span('link_index'):
+                index.refresh(self.config.output.content_directory)
+                links = index.resolve(LINK_PLACEHOLDER.findall(article), source=url)
+                linked = {url, *(page['url'] for page in links.values() if page)}
+                for page in index.search(keyword, 3, exclude=tuple(linked)):
+                    links[page['title']] = page
+                index.set_links(url, links)
+        finally:
+            index.close()
+        
+        internal_links = [{'anchor': anchor, 'url': page['url'], 'title': page['title']}
+                          for anchor, page in links.items() if page]
+        return resolve_placeholders(article, links), internal_links or self._suggest_internal_links(keyword)
+    
+    def _suggest_internal_links(self, keyword: str) -> List[Dict]:
+        """Suggest internal linking opportunities (used until the link index has pages)
+
+        Same shape as resolved links, so ``internal_links`` always holds anchor/url/title dicts.
+        """
         suggestions = [
-            "/templates - Browse our template collection",
-            "/examples - See example pages",
-            "/create - Start creating your page",
-            "/blog - Related articles"
+            {'anchor': "Browse our template collection", 'url': "/templates", 'title': "Templates"},
+            {'anchor': "See example pages", 'url': "/examples", 'title': "Examples"},
+            {'anchor': "Start creating your page", 'url': "/create", 'title': "Create"},
+            {'anchor': "Related articles", 'url': "/blog", 'title': "Blog"}
         ]
         return suggestions
     
@@ -357,34 +567,32 @@ DESCRIPTION: [your description]"""
         h2_sections = [line for line in outline if line.startswith('H2:')]
         return [f"Feature image for: {section}" for section in h2_sections[:5]]
     
-    def generate_template_landing_pages(self):
-        """Generate SEO landing pages for each template"""
+    def generate_template_landing_pages(self, template_type: str = None, chunk_size: int = 50):
+        """Generate SEO landing pages for each template in the catalog"""
         
         print("\n🎨 Generating template landing pages...")
         
-        # Get templates from your database/config
-        templates = [
-            {"id": "romantic-birthday", "name": "Romantic Birthday Page"},
-            {"id": "anniversary-love", "name": "Anniversary Heartful Page"},
-            {"id": "valentine-special", "name": "Valentine's Day Special"},
-            {"id": "proposal-page", "name": "Proposal Page"},
-            {"id": "wedding-invitation", "name": "Wedding Invitation Page"}
-        ]
-        
-        for template in templates:
-            print(f"\n  Creating landing page for: {template['name']}")
-            
-            landing_page = self._generate_template_landing_page(template)
-            
-            # Save
-            safe_name = template['id']
-            output_file = Path(self.config['output']['content_directory']) / f"landing_{safe_name}.json"
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(landing_page, f, indent=2, ensure_ascii=False)
-            
-            print(f"    ✓ Saved: {output_file}")
-            time.sleep(1)
+        # Shared with PinterestAutomator, loaded once per catalog file
+        catalog = get_catalog(self.config)
+        
+        for chunk in catalog.chunks(chunk_size, template_type):
+            for template in chunk:
+                print(f"\n  Creating landing page for: {template['name']}")
+                
+                landing_page = self._generate_template_landing_page(template)
+                self._localize_landing_page(template, landing_page)
+                
+                # Save
+                safe_name = template['id']
+                output_file = Path(self.config.output.content_directory) / f"landing_{safe_name}.json"
+                
+                atomic_write(output_file, json.dumps(landing_page, indent=2, ensure_ascii=False))
+                
+                print(f"    ✓ Saved: {output_file}")
+                if self.ai_client:
+                    time.sleep(1)
+        
+        export_run_metrics(self.metrics, self.config)
     
     def _generate_template_landing_page(self, template: Dict) -> Dict:
         """Generate landing page for template"""
@@ -392,24 +600,12 @@ DESCRIPTION: [your description]"""
         if not self.ai_client:
             return self._fallback_landing_page(template)
         
-        prompt = f"""Create SEO-optimized landing page content for: "{template['name']}"
-
-Generate:
-1. H1 Title (include template name + benefit)
-2. Hero description (2-3 sentences, compelling)
-3. Feature list (5-7 key features/benefits)
-4. Use cases (3-4 scenarios where this template shines)
-5. CTA text
-6. Meta description (150-160 chars)
-
-Format as JSON."""
+        request = self.prompts.request('landing_page', template_name=template['name'])
 
         try:
-            message = self.ai_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with self.metrics.span('landing_page') as span:
+                message = self.ai_client.messages.create(**request)
+                span.record_usage(message)
             
             # Try to parse JSON from response
             response_text = message.content[0].text.strip()
@@ -425,6 +621,17 @@ Format as JSON."""
         except:
             return self._fallback_landing_page(template)
     
+    def _localize_landing_page(self, template: Dict, landing_page: Dict):
+        """Add variants of a landing page's copy for the other focus locations"""
+        fields = {name: landing_page[name] for name in LANDING_LOCALE_FIELDS
+                  if isinstance(landing_page.get(name), str)
+                  or (isinstance(landing_page.get(name), list) and all(isinstance(v, str) for v in landing_page[name]))}
+        variants = self.localizer.localize_fields(fields)
+        if variants:
+            landing_page['locale'] = self.localizer.base_code
+            landing_page['locales'] = {code: {**variant, 'url': locale_url(code, f"/templates/{template['id']}")}
+                                       for code, variant in variants.items()}
+    
     def _fallback_landing_page(self, template: Dict) -> Dict:
         """Fallback landing page content"""
         return {
@@ -452,7 +659,7 @@ Format as JSON."""
         print("\n🗺️ Generating sitemap data...")
         
         sitemap_urls = []
-        base_url = self.config['business_info']['website']
+        base_url = self.config.business_info.website
         
         # Static pages
         static_pages = [
@@ -470,60 +677,36 @@ Format as JSON."""
         return sitemap_urls
 
 
-def main():
-    """Main function"""
+def main(argv: List[str] = None):
+    """Run the full SEO automation, or a single CLI subcommand if arguments are given
+    
+    Non-interactive, so it can run under cron or a scheduler:
+        python scripts/seo_automator.py                       # keywords, top 5 posts, landing pages, sitemap
+        python scripts/seo_automator.py blog "romantic gift ideas"
+        python scripts/seo_automator.py keywords
+    """
+    import sys
+    
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        from cli import main as cli_main
+        sys.exit(cli_main(argv))
+    
     print("\n" + "="*70)
     print("🔍 SEO Automation System")
     print("="*70 + "\n")
+    print("🚀 Running full SEO automation...\n")
     
-    seo = SEOAutomator()
-    
-    # Menu
-    print("What would you like to do?")
-    print("1. Research keywords")
-    print("2. Generate blog post")
-    print("3. Generate template landing pages")
-    print("4. Generate sitemap data")
-    print("5. Full SEO automation (all of the above)")
-    
-    choice = input("\nEnter choice (1-5): ").strip()
+    from job_runner import run_spec
     
-    if choice == '1':
-        keywords = seo.research_keywords()
-        print(f"\n✓ Found {len(keywords)} keywords")
-        
-    elif choice == '2':
-        keyword = input("Enter target keyword: ").strip()
-        blog_post = seo.generate_blog_post(keyword)
-        print(f"\n✓ Generated {blog_post.get('word_count', 0)} word article")
-        
-    elif choice == '3':
-        seo.generate_template_landing_pages()
-        print("\n✓ Template landing pages generated")
-        
-    elif choice == '4':
-        sitemap = seo.generate_sitemap_data()
-        print(f"\n✓ Generated sitemap with {len(sitemap)} URLs")
-        
-    elif choice == '5':
-        print("\n🚀 Running full SEO automation...\n")
-        
-        # 1. Keyword research
-        keywords = seo.research_keywords()
-        
-        # 2. Generate blog posts for top keywords
-        top_keywords = [k['keyword'] for k in keywords[:5]]
-        for keyword in top_keywords:
-            seo.generate_blog_post(keyword)
-            time.sleep(2)
-        
-        # 3. Template landing pages
-        seo.generate_template_landing_pages()
-        
-        # 4. Sitemap
-        seo.generate_sitemap_data()
-        
-        print("\n✅ Full SEO automation complete!")
+    sys.exit(run_spec({
+        'jobs': [
+            {'id': 'keywords', 'task': 'keywords'},
+            {'id': 'blog', 'task': 'blog', 'top': 5, 'depends_on': ['keywords']},
+            {'id': 'landing-pages', 'task': 'landing-pages'},
+            {'id': 'sitemap', 'task': 'sitemap', 'depends_on': ['blog', 'landing-pages']}
+        ]
+    }))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,568 @@
+"""
+Typed Marketing Config
+Validated config model loaded once per file and shared by every automator
+
+``load_config`` parses and validates config.json into slotted dataclasses,
+reporting every problem (typos, wrong types, bad values) at once before any
+LLM call is made. Configs are cached by file path and modification
+time, so all automators in a process share one instance; ``ConfigWatcher``
+polls for changes so daemon mode can hot reload without a restart.
+
+Config objects are shared across threads and brands: treat them as read-only
+and reload instead of mutating them.
+
+Keys starting with ``_`` are ignored and can be used for comments.
+"""
+
+import difflib
+import json
+import os
+import re
+import threading
+import typing
+from dataclasses import MISSING, dataclass, field, fields, is_dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+MARKETING_DIR = Path(__file__).resolve().parent.parent
+EXAMPLE_CONFIG = "config.example.json"
+
+LLM_MODES = ('live', 'record', 'replay', 'fake')
+# Secondary LLM providers for failover ('' disables failover to another provider)
+SECONDARY_PROVIDERS = ('', 'openai', 'fake')
+# 'sections' writes each outline H2 in its own concurrent call (article_sections.py)
+ARTICLE_MODES = ('sections', 'single')
+# Model per tier; llm.model_tiers overrides or adds tiers, llm.routes picks them per task
+DEFAULT_MODEL_TIERS = {
+    'fast': "claude-3-5-haiku-20241022",
+    'standard': "claude-sonnet-4-20250514"
+}
+
+_TIME_RE = re.compile(r'^([01]\d|2[0-3]):[0-5]\d$')
+_HEX_COLOR_RE = re.compile(r'^#[0-9A-Fa-f]{6}$')
+
+
+class ConfigError(ValueError):
+    """The config file is missing, unreadable or fails validation"""
+
+    def __init__(self, source: str, problems: List[str]):
+        self.source = source
+        self.problems = problems
+        details = '\n'.join(f"  - {problem}" for problem in problems)
+        super().__init__(f"Invalid config {source}:\n{details}")
+
+
+def _check_times(times, path: str) -> List[str]:
+    return [f"{path}[{i}]: '{value}' is not a HH:MM time" for i, value in enumerate(times) if not _TIME_RE.match(value)]
+
+
+def _check_url(url: str, path: str) -> List[str]:
+    return [] if not url or url.startswith(('http://', 'https://')) else [f"{path}: '{url}' must start with http:// or https://"]
+
+
+def _check_non_negative(obj, names: Tuple[str, ...]) -> List[str]:
+    return [f"{name}: must be >= 0 (got {getattr(obj, name)})" for name in names if getattr(obj, name) < 0]
+
+
+# --- Sections -----------------------------------------------------------------
+
+@dataclass(slots=True)
+class BusinessInfo:
+    name: str
+    niche: str = ""
+    website: str = ""
+    target_audience: str = ""
+    brand_colors: Tuple[str, ...] = ()
+    tone: str = ""
+    brand_guidelines: str = ""
+
+    def _problems(self) -> List[str]:
+        problems = [] if self.name.strip() else ["name: must not be empty"]
+        problems += [f"brand_colors[{i}]: '{color}' is not a #RRGGBB color"
+                     for i, color in enumerate(self.brand_colors) if not _HEX_COLOR_RE.match(color)]
+        return problems + _check_url(self.website, 'website')
+
+
+@dataclass(slots=True)
+class PinterestAPI:
+    access_token: str = ""
+    board_id: str = ""
+
+
+@dataclass(slots=True)
+class PinterestSettings:
+    enabled: bool = True
+    boards: Tuple[str, ...] = ("Romantic Ideas",)
+    daily_pins: int = 5
+    best_times: Tuple[str, ...] = ("09:00", "13:00", "19:00", "21:00")
+
+    def _problems(self) -> List[str]:
+        problems = _check_times(self.best_times, 'best_times') + _check_non_negative(self, ('daily_pins',))
+        if not self.boards:
+            problems.append("boards: at least one board is required")
+        if not self.best_times:
+            problems.append("best_times: at least one posting time is required")
+        return problems
+
+
+@dataclass(slots=True)
+class InstagramSettings:
+    enabled: bool = True
+    handle: str = ""
+    daily_posts: int = 2
+    stories_per_day: int = 3
+    best_times: Tuple[str, ...] = ("10:00", "18:00")
+
+    def _problems(self) -> List[str]:
+        return _check_times(self.best_times, 'best_times') + _check_non_negative(self, ('daily_posts', 'stories_per_day'))
+
+
+@dataclass(slots=True)
+class FacebookGroup:
+    name: str
+    url: str = ""
+    posting_frequency: str = "daily"
+    best_time: str = "18:00"
+
+    def _problems(self) -> List[str]:
+        return _check_times((self.best_time,), 'best_time') + _check_url(self.url, 'url')
+
+
+@dataclass(slots=True)
+class FacebookSettings:
+    enabled: bool = True
+    groups: Tuple[FacebookGroup, ...] = ()
+
+
+@dataclass(slots=True)
+class TikTokSettings:
+    enabled: bool = False
+    note: str = ""
+
+
+@dataclass(slots=True)
+class SocialMediaSettings:
+    pinterest: PinterestSettings = field(default_factory=PinterestSettings)
+    instagram: InstagramSettings = field(default_factory=InstagramSettings)
+    facebook: FacebookSettings = field(default_factory=FacebookSettings)
+    tiktok: TikTokSettings = field(default_factory=TikTokSettings)
+
+
+@dataclass(slots=True)
+class KeywordExpansionSettings:
+    """Recursive keyword research (keyword_expansion.py): depth, what to expand and the LLM budget"""
+    max_depth: int = 2
+    min_priority: int = 50
+    max_calls: int = 100
+    # 0: no token budget (max_calls still caps the run)
+    max_tokens: int = 200000
+    checkpoint_every: int = 10
+
+    def _problems(self) -> List[str]:
+        problems = _check_non_negative(self, ('min_priority', 'max_tokens'))
+        for name in ('max_depth', 'max_calls', 'checkpoint_every'):
+            if getattr(self, name) < 1:
+                problems.append(f"{name}: must be >= 1 (got {getattr(self, name)})")
+        return problems
+
+
+@dataclass(slots=True)
+class SEOSettings:
+    target_keywords: Tuple[str, ...] = ()
+    competitor_sites: Tuple[str, ...] = ()
+    blog_posts_per_week: int = 3
+    # First one is the locale content is written in; the rest get adapted variants (locales.py checks the names)
+    focus_locations: Tuple[str, ...] = ()
+    localize: bool = True
+    article_mode: str = "sections"
+    section_retries: int = 1
+    fix_attempts: int = 1
+    keyword_expansion: KeywordExpansionSettings = field(default_factory=KeywordExpansionSettings)
+    # Built n-gram volume index (ngram_volume.py); '' ranks keywords by heuristics alone
+    volume_table: str = ""
+    volume_weight: float = 10.0
+
+    def _problems(self) -> List[str]:
+        problems = _check_non_negative(self, ('blog_posts_per_week', 'section_retries', 'fix_attempts',
+                                              'volume_weight'))
+        if self.article_mode not in ARTICLE_MODES:
+            problems.append(f"article_mode: '{self.article_mode}' must be one of {', '.join(ARTICLE_MODES)}")
+        for i, site in enumerate(self.competitor_sites):
+            problems += _check_url(site, f'competitor_sites[{i}]')
+        return problems
+
+
+@dataclass(slots=True)
+class ContentStrategy:
+    daily_content_count: int = 10
+    content_types: Dict[str, float] = field(default_factory=lambda: {'inspirational': 1.0})
+    hashtag_count: int = 8
+    emoji_usage: str = "high"
+    variation_count: int = 3
+    topic_history_days: int = 30
+    topic_similarity: float = 0.5
+
+    def _problems(self) -> List[str]:
+        problems = _check_non_negative(self, ('daily_content_count', 'hashtag_count', 'topic_history_days'))
+        if self.variation_count < 1:
+            problems.append(f"variation_count: must be >= 1 (got {self.variation_count})")
+        if not 0.0 < self.topic_similarity <= 1.0:
+            problems.append(f"topic_similarity: must be in (0, 1] (got {self.topic_similarity})")
+        if any(weight < 0 for weight in self.content_types.values()):
+            problems.append("content_types: weights must be >= 0")
+        elif self.content_types and abs(sum(self.content_types.values()) - 1.0) > 0.01:
+            problems.append(f"content_types: weights must sum to 1.0 (got {sum(self.content_types.values()):.2f})")
+        if self.emoji_usage not in ('none', 'low', 'medium', 'high'):
+            problems.append(f"emoji_usage: '{self.emoji_usage}' must be one of none, low, medium, high")
+        return problems
+
+
+@dataclass(slots=True)
+class AutomationSettings:
+    mode: str = "semi_automated"
+    max_posts_per_day: int = 15
+    delay_between_posts: Tuple[int, int] = (180, 420)
+    use_scheduling: bool = True
+    auto_approve: bool = False
+    backup_content: bool = True
+
+    def _problems(self) -> List[str]:
+        low, high = self.delay_between_posts
+        problems = _check_non_negative(self, ('max_posts_per_day',))
+        if not 0 <= low <= high:
+            problems.append(f"delay_between_posts: expected [min, max] with 0 <= min <= max (got [{low}, {high}])")
+        return problems
+
+
+@dataclass(slots=True)
+class ModelRoute:
+    """Overrides for one task's route; unset fields keep the prompt's defaults (prompts.py)"""
+    tier: Optional[str] = None
+    max_tokens: Optional[int] = None
+    max_latency: Optional[float] = None
+    hedge: Optional[bool] = None
+
+    def _problems(self) -> List[str]:
+        problems = []
+        if self.max_tokens is not None and self.max_tokens < 1:
+            problems.append(f"max_tokens: must be >= 1 (got {self.max_tokens})")
+        if self.max_latency is not None and self.max_latency <= 0:
+            problems.append(f"max_latency: must be > 0 seconds (got {self.max_latency})")
+        return problems
+
+
+@dataclass(slots=True)
+class FailoverSettings:
+    """Secondary provider, circuit breaker and hedging for LLM calls (llm_providers.py)"""
+    secondary: str = ""
+    models: Dict[str, str] = field(default_factory=dict)
+    failure_threshold: int = 3
+    reset_seconds: float = 30.0
+    hedge_delay: Optional[float] = None
+    hedge_min_samples: int = 10
+
+    def _problems(self) -> List[str]:
+        problems = _check_non_negative(self, ('reset_seconds',))
+        if self.secondary not in SECONDARY_PROVIDERS:
+            problems.append(f"secondary: '{self.secondary}' must be one of "
+                            f"{', '.join(repr(name) for name in SECONDARY_PROVIDERS)}")
+        if self.failure_threshold < 1:
+            problems.append(f"failure_threshold: must be >= 1 (got {self.failure_threshold})")
+        if self.hedge_delay is not None and self.hedge_delay <= 0:
+            problems.append(f"hedge_delay: must be > 0 seconds (got {self.hedge_delay})")
+        if self.hedge_min_samples < 1:
+            problems.append(f"hedge_min_samples: must be >= 1 (got {self.hedge_min_samples})")
+        return problems
+
+
+@dataclass(slots=True)
+class LLMSettings:
+    mode: str = "live"
+    cassette_path: str = "./cassettes/llm.jsonl"
+    latency: Union[float, str] = 0.0
+    latency_scale: float = 1.0
+    latency_jitter: float = 0.0
+    error_rate: float = 0.0
+    replay_miss: str = "error"
+    seed: Optional[int] = None
+    requests_per_minute: Optional[float] = None
+    max_concurrency: int = 4
+    model_tiers: Dict[str, str] = field(default_factory=dict)
+    routes: Dict[str, ModelRoute] = field(default_factory=dict)
+    failover: FailoverSettings = field(default_factory=FailoverSettings)
+
+    def _problems(self) -> List[str]:
+        problems = _check_non_negative(self, ('latency_scale', 'latency_jitter'))
+        if self.mode not in LLM_MODES:
+            problems.append(f"mode: '{self.mode}' must be one of {', '.join(LLM_MODES)}")
+        if isinstance(self.latency, str) and self.latency != 'recorded':
+            problems.append(f"latency: expected seconds or 'recorded' (got '{self.latency}')")
+        elif self.latency == 'recorded' and self.mode != 'replay':
+            problems.append("latency: 'recorded' is only available in replay mode")
+        elif not isinstance(self.latency, str) and self.latency < 0:
+            problems.append(f"latency: must be >= 0 (got {self.latency})")
+        if not 0.0 <= self.error_rate <= 1.0:
+            problems.append(f"error_rate: must be between 0 and 1 (got {self.error_rate})")
+        if self.replay_miss not in ('error', 'fake'):
+            problems.append(f"replay_miss: '{self.replay_miss}' must be 'error' or 'fake'")
+        if self.requests_per_minute is not None and self.requests_per_minute <= 0:
+            problems.append(f"requests_per_minute: must be > 0 (got {self.requests_per_minute})")
+        if self.max_concurrency < 1:
+            problems.append(f"max_concurrency: must be >= 1 (got {self.max_concurrency})")
+        tiers = {**DEFAULT_MODEL_TIERS, **self.model_tiers}
+        # Task names are checked by PromptRegistry, which owns them
+        for task, route in self.routes.items():
+            if route.tier is not None and route.tier not in tiers:
+                problems.append(f"routes.{task}.tier: '{route.tier}' must be one of {', '.join(tiers)}")
+        for tier in self.failover.models:
+            if tier not in tiers:
+                problems.append(f"failover.models.{tier}: unknown tier (tiers: {', '.join(tiers)})")
+        return problems
+
+
+@dataclass(slots=True)
+class InstrumentationSettings:
+    prometheus_textfile: str = ""
+
+
+@dataclass(slots=True)
+class TemplateSettings:
+    catalog_path: str = ""
+    sqlite_table: str = "templates"
+
+
+@dataclass(slots=True)
+class AnalyticsSettings:
+    feedback: bool = True
+    min_samples: int = 3
+    prior_weight: float = 5.0
+
+    def _problems(self) -> List[str]:
+        return _check_non_negative(self, ('min_samples', 'prior_weight'))
+
+
+@dataclass(slots=True)
+class OutputSettings:
+    content_directory: str = "./generated_content"
+    images_directory: str = "./generated_content/images"
+    reports_directory: str = "./reports"
+    schedules_directory: str = "./schedules"
+    analytics_directory: str = "./analytics"
+    site_directory: str = "./site"
+    site_templates: str = ""
+
+
+@dataclass(slots=True)
+class MarketingConfig:
+    business_info: BusinessInfo
+    anthropic_api_key: str = ""
+    openai_api_key: str = ""
+    buffer_api_key: str = ""
+    serp_api_key: str = ""
+    pinterest_api: PinterestAPI = field(default_factory=PinterestAPI)
+    social_media: SocialMediaSettings = field(default_factory=SocialMediaSettings)
+    seo: SEOSettings = field(default_factory=SEOSettings)
+    content_strategy: ContentStrategy = field(default_factory=ContentStrategy)
+    automation_settings: AutomationSettings = field(default_factory=AutomationSettings)
+    llm: LLMSettings = field(default_factory=LLMSettings)
+    instrumentation: InstrumentationSettings = field(default_factory=InstrumentationSettings)
+    templates: TemplateSettings = field(default_factory=TemplateSettings)
+    analytics: AnalyticsSettings = field(default_factory=AnalyticsSettings)
+    output: OutputSettings = field(default_factory=OutputSettings)
+
+    @property
+    def has_anthropic_key(self) -> bool:
+        return bool(self.anthropic_api_key) and self.anthropic_api_key != "YOUR_ANTHROPIC_API_KEY"
+
+    @classmethod
+    def from_dict(cls, data: Dict, source: str = '<dict>') -> 'MarketingConfig':
+        """Build and validate a config, raising ConfigError listing every problem"""
+        problems: List[str] = []
+        config = _build(cls, data, '', problems)
+        if problems:
+            raise ConfigError(source, problems)
+        return config
+
+
+# --- Schema-driven construction -----------------------------------------------
+
+_TYPE_NAMES = {str: 'a string', int: 'an integer', float: 'a number', bool: 'true/false'}
+
+
+def _convert(hint, value, path: str, problems: List[str]):
+    """Convert a JSON value to ``hint``, appending a problem (and returning None) on mismatch"""
+    origin = typing.get_origin(hint)
+
+    if origin is Union:
+        options = typing.get_args(hint)
+        if value is None and type(None) in options:
+            return None
+        for option in options:
+            if option is not type(None):
+                attempt: List[str] = []
+                converted = _convert(option, value, path, attempt)
+                if not attempt:
+                    return converted
+        names = ' or '.join(_TYPE_NAMES.get(o, str(o)) for o in options if o is not type(None))
+        problems.append(f"{path}: expected {names} (got {value!r})")
+        return None
+
+    if origin is tuple:
+        args = typing.get_args(hint)
+        if not isinstance(value, list):
+            problems.append(f"{path}: expected a list (got {value!r})")
+            return None
+        if len(args) == 2 and args[1] is Ellipsis:
+            return tuple(_convert(args[0], item, f"{path}[{i}]", problems) for i, item in enumerate(value))
+        if len(value) != len(args):
+            problems.append(f"{path}: expected {len(args)} items (got {len(value)})")
+            return None
+        return tuple(_convert(arg, item, f"{path}[{i}]", problems) for i, (arg, item) in enumerate(zip(args, value)))
+
+    if origin is dict:
+        key_type, value_type = typing.get_args(hint)
+        if not isinstance(value, dict):
+            problems.append(f"{path}: expected a mapping (got {value!r})")
+            return None
+        return {str(k): _convert(value_type, v, f"{path}.{k}", problems) for k, v in value.items()}
+
+    if is_dataclass(hint):
+        return _build(hint, value, path, problems)
+
+    # bool is an int subclass, so check it explicitly both ways
+    if hint is bool:
+        ok = isinstance(value, bool)
+    elif hint is int:
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    elif hint is float:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        value = float(value) if ok else value
+    else:
+        ok = isinstance(value, hint)
+    if not ok:
+        problems.append(f"{path}: expected {_TYPE_NAMES.get(hint, hint.__name__)} (got {value!r})")
+        return None
+    return value
+
+
+def _build(cls, data, path: str, problems: List[str]):
+    """Instantiate dataclass ``cls`` from a mapping, collecting problems instead of stopping at the first"""
+    if not isinstance(data, dict):
+        problems.append(f"{path or 'config'}: expected a mapping (got {data!r})")
+        return None
+
+    hints = typing.get_type_hints(cls)
+    known = {f.name: f for f in fields(cls)}
+    prefix = f"{path}." if path else ''
+    start = len(problems)
+
+    for key in data:
+        if key not in known and not key.startswith('_'):
+            suggestion = difflib.get_close_matches(key, known, n=1)
+            hint = f" (did you mean '{suggestion[0]}'?)" if suggestion else ''
+            problems.append(f"{prefix}{key}: unknown setting{hint}")
+
+    values = {}
+    for name, f in known.items():
+        if name in data:
+            values[name] = _convert(hints[name], data[name], prefix + name, problems)
+        elif f.default is MISSING and f.default_factory is MISSING:
+            problems.append(f"{prefix}{name}: required setting is missing")
+
+    if len(problems) > start:
+        return None
+    instance = cls(**values)
+
+    check = getattr(instance, '_problems', None)
+    if check is not None:
+        problems.extend(f"{prefix}{problem}" for problem in check())
+    return instance
+
+
+# --- Loading and hot reload ----------------------------------------------------
+
+_cache: Dict[str, Tuple[Tuple[int, int], MarketingConfig]] = {}
+_cache_lock = threading.Lock()
+
+
+def resolve_config_path(config_path: str) -> str:
+    """The config file to read, falling back (with a warning) to config.example.json"""
+    if os.path.exists(config_path):
+        return config_path
+    for candidate in (EXAMPLE_CONFIG, MARKETING_DIR / EXAMPLE_CONFIG):
+        if os.path.exists(candidate):
+            print(f"⚠️ {config_path} not found, using {candidate}")
+            return str(candidate)
+    raise ConfigError(config_path, ["file not found (create it from config.example.json)"])
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_config_dict(path: str) -> Dict:
+    """Raw JSON of a config file, raising ConfigError if it cannot be parsed"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except OSError as e:
+        raise ConfigError(path, [f"cannot read file: {e}"])
+    except json.JSONDecodeError as e:
+        raise ConfigError(path, [f"invalid JSON at line {e.lineno}, column {e.colno}: {e.msg}"])
+
+
+def load_config(config_path: str = "config.json") -> MarketingConfig:
+    """Load and validate a config, returning the cached instance while the file is unchanged"""
+    path = resolve_config_path(config_path)
+    key = os.path.abspath(path)
+    signature = _file_signature(path)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    config = MarketingConfig.from_dict(read_config_dict(path), source=path)
+    with _cache_lock:
+        _cache[key] = (signature, config)
+    return config
+
+
+class ConfigWatcher:
+    """Poll files for changes and reload them, keeping the last good version on errors
+
+    Each watched file has its own loader (``load_config`` by default) and an
+    ``on_change(path, loaded)`` callback that runs only after a successful reload.
+    """
+
+    def __init__(self):
+        self._watched: Dict[str, list] = {}
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._watched
+
+    def watch(self, path: str, on_change: Callable[[str, object], None], loader: Callable[[str], object] = load_config):
+        """Start watching path (no-op if it is already watched or does not exist)"""
+        if path not in self._watched and os.path.exists(path):
+            self._watched[path] = [_file_signature(path), loader, on_change]
+
+    def check(self) -> List[str]:
+        """Reload every changed file that still validates; returns the paths that were reloaded"""
+        reloaded = []
+        for path, entry in self._watched.items():
+            signature, loader, on_change = entry
+            try:
+                current = _file_signature(path)
+                if current == signature:
+                    continue
+                entry[0] = current
+                loaded = loader(path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Change to {path} ignored, keeping the previous version: {e}")
+                continue
+
+            print(f"🔄 Reloaded {path}")
+            on_change(path, loaded)
+            reloaded.append(path)
+        return reloaded
@@ -0,0 +1,513 @@
+"""
+Static Site Build
+Renders blog post and landing page JSON to minified static HTML, incrementally and in parallel
+
+Every ``blog_*.json`` and ``landing_*.json`` in ``output.content_directory`` becomes
+``<site_directory>/<url>/index.html`` at the URL the link index uses
+(``/blog/<slug>``, ``/templates/<id>``), with canonical and meta tags and a
+JSON-LD block. Locale variants saved in a page's ``locales`` (locales.py) are
+rendered at ``/<locale>/<url>``, and every page of the group lists the others
+as hreflang alternates. Templates are compiled once per worker process into
+minified literal parts and field names, and rendered markup is emitted without
+whitespace, so pages come out minified without a pass over each page. A build
+manifest records each page's source hash and template hash, so a build
+re-renders only pages whose JSON or template changed, deletes pages whose
+source is gone, and never needs a full rebuild for a new post.
+
+Templates are built in; files named ``layout.html``, ``blog.html`` or
+``landing.html`` in ``output.site_templates`` replace them. Fields are written
+as ``{{ name }}`` and are inserted as given (values are escaped before rendering).
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from link_index import blog_url, item_text, item_texts
+from locales import locale_url
+from settings import ConfigError
+
+MANIFEST_FILE = '.build_manifest.json'
+# Bump when the renderer (markdown, minifier, JSON-LD) changes output for the same templates
+RENDERER_VERSION = 3
+# Builds with fewer changed pages than this render in-process instead of starting workers
+MIN_PARALLEL_PAGES = 32
+
+DEFAULT_TEMPLATES = {
+    'layout': """<!DOCTYPE html>
+<html lang="{{ lang }}">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>{{ title }}</title>
+  <meta name="description" content="{{ description }}">
+  <link rel="canonical" href="{{ canonical }}">
+  {{ alternates }}
+  <meta property="og:title" content="{{ title }}">
+  <meta property="og:description" content="{{ description }}">
+  <meta property="og:url" content="{{ canonical }}">
+  <meta property="og:type" content="{{ og_type }}">
+  <style>body{max-width:46rem;margin:0 auto;padding:1.5rem;font:1.05rem/1.6 Georgia,serif;color:#2d2a32}
+a{color:#b0306a}h1,h2,h3{line-height:1.25}.cta{display:inline-block;padding:.7rem 1.4rem;background:#b0306a;color:#fff;border-radius:2rem;text-decoration:none}</style>
+  <script type="application/ld+json">{{ jsonld }}</script>
+</head>
+<body>
+  <header><a href="/">{{ site_name }}</a></header>
+  <main>
+{{ content }}
+  </main>
+  <footer>&copy; {{ year }} {{ site_name }}</footer>
+</body>
+</html>
+""",
+    'blog': """<article>
+  <p><time datetime="{{ published }}">{{ published_label }}</time></p>
+  {{ body }}
+</article>
+""",
+    'landing': """<section>
+  <h1>{{ title }}</h1>
+  <p>{{ hero }}</p>
+  <p><a class="cta" href="{{ cta_url }}">{{ cta }}</a></p>
+</section>
+<section>
+  <h2>Features</h2>
+  <ul>{{ features }}</ul>
+</section>
+<section>
+  <h2>Perfect for</h2>
+  <ul>{{ use_cases }}</ul>
+</section>
+<p><a class="cta" href="{{ cta_url }}">{{ cta }}</a></p>
+""",
+}
+
+TEMPLATE_FIELDS = {
+    'layout': ('title', 'description', 'canonical', 'lang', 'alternates', 'og_type', 'jsonld', 'site_name',
+               'content', 'year'),
+    'blog': ('title', 'body', 'keyword', 'published', 'published_label'),
+    'landing': ('title', 'hero', 'features', 'use_cases', 'cta', 'cta_url'),
+}
+
+_FIELD = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class CompiledTemplate:
+    """A template split once into minified literal text and field names, rendered by a single join"""
+
+    def __init__(self, text: str, fields=None, source: str = '<template>'):
+        parts = _FIELD.split(text)
+        self.literals = [minify_html(literal) for literal in parts[0::2]]
+        self.fields = parts[1::2]
+        unknown = sorted(set(self.fields) - set(fields)) if fields is not None else []
+        if unknown:
+            raise ConfigError(source, [f"unknown template field(s) {', '.join(unknown)} "
+                                       f"(expected {', '.join(fields)})"])
+
+    def render(self, values: Dict[str, str]) -> str:
+        out = [self.literals[0]]
+        for name, literal in zip(self.fields, self.literals[1:]):
+            out.append(values[name])
+            out.append(literal)
+        return ''.join(out)
+
+
+def load_templates(template_dir: str = '') -> Dict[str, str]:
+    """Template text per page kind: built-ins, replaced by files in ``template_dir``"""
+    templates = dict(DEFAULT_TEMPLATES)
+    if template_dir:
+        for name in templates:
+            path = Path(template_dir) / f"{name}.html"
+            if path.exists():
+                templates[name] = path.read_text(encoding='utf-8')
+    return templates
+
+
+def template_hashes(templates: Dict[str, str], site: Dict[str, str]) -> Dict[str, str]:
+    """Hash per page kind of everything besides its JSON that shapes the page"""
+    shared = json.dumps([RENDERER_VERSION, templates['layout'], site], sort_keys=True)
+    return {kind: hashlib.sha256(f"{shared}\n{templates[kind]}".encode('utf-8')).hexdigest()[:16]
+            for kind in ('blog', 'landing')}
+
+
+# --- Markdown -----------------------------------------------------------------
+
+_MD_HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*$')
+_MD_BULLET = re.compile(r'^\s*[-*+]\s+(.*)$')
+_MD_NUMBERED = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+_MD_LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+_MD_BOLD = re.compile(r'\*\*(.+?)\*\*|__(.+?)__')
+_MD_ITALIC = re.compile(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])')
+_MD_CODE = re.compile(r'`([^`]+)`')
+# http(s), site-absolute or relative link targets; anything else (javascript:, data:...) stays plain text
+_SAFE_HREF = re.compile(r'(?:https?://|/|[^:/?#]*(?:[/?#]|$))', re.I)
+
+
+def _inline(text: str) -> str:
+    # Quotes escaped too, so link URLs are safe inside href="..."
+    text = html.escape(text)
+    text = _MD_CODE.sub(r'<code>\1</code>', text)
+    text = _MD_LINK.sub(lambda m: f'<a href="{m.group(2)}">{m.group(1)}</a>' if _SAFE_HREF.match(m.group(2))
+                        else m.group(1), text)
+    text = _MD_BOLD.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+    return _MD_ITALIC.sub(r'<em>\1</em>', text)
+
+
+def markdown_to_html(text: str) -> str:
+    """HTML for the markdown the article prompts produce: headings, paragraphs, lists, quotes, emphasis, links"""
+    out: List[str] = []
+    paragraph: List[str] = []
+    list_tag: Optional[str] = None
+
+    def flush():
+        nonlocal list_tag
+        if paragraph:
+            out.append(f"<p>{_inline(' '.join(paragraph))}</p>")
+            paragraph.clear()
+        if list_tag:
+            out.append(f"</{list_tag}>")
+            list_tag = None
+
+    for line in text.split('\n'):
+        stripped = line.strip()
+        heading = _MD_HEADING.match(stripped)
+        item = _MD_BULLET.match(line) or _MD_NUMBERED.match(line)
+        if not stripped:
+            flush()
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif item:
+            tag = 'ul' if _MD_BULLET.match(line) else 'ol'
+            if paragraph or list_tag != tag:
+                flush()
+                out.append(f"<{tag}>")
+                list_tag = tag
+            out.append(f"<li>{_inline(item.group(1))}</li>")
+        elif stripped.startswith('>'):
+            flush()
+            out.append(f"<blockquote><p>{_inline(stripped.lstrip('> '))}</p></blockquote>")
+        elif stripped in ('---', '***'):
+            flush()
+            out.append('<hr>')
+        else:
+            if list_tag:
+                flush()
+            paragraph.append(stripped)
+    flush()
+    return ''.join(out)
+
+
+# --- Rendering ----------------------------------------------------------------
+
+_BLOCK_TAG = re.compile(
+    r'\s*(</?(?:html|head|body|meta|link|title|style|script|header|main|footer|article|section|nav|div|'
+    r'h[1-6]|p|ul|ol|li|blockquote|hr)\b[^>]*>)\s*'
+)
+_WHITESPACE = re.compile(r'\s+')
+_COMMENT = re.compile(r'<!--(?!\[).*?-->', re.S)
+
+
+def minify_html(markup: str) -> str:
+    """Drop comments and whitespace around block-level tags; collapse other whitespace (no <pre> in our pages)"""
+    markup = _COMMENT.sub('', markup)
+    markup = _WHITESPACE.sub(' ', markup)
+    return _BLOCK_TAG.sub(r'\1', markup)
+
+
+def _attr(value) -> str:
+    return html.escape(str(value or ''), quote=True)
+
+
+def _jsonld(data: Dict) -> str:
+    # Safe inside <script>: no "</" can close the tag early
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+def _strip_title(body: str) -> str:
+    """Article markdown without its leading H1 (the page title is rendered by the template)"""
+    lines = body.lstrip().split('\n')
+    if lines and re.match(r'^#\s', lines[0]):
+        lines = lines[1:]
+    return '\n'.join(lines)
+
+
+def render_blog(data: Dict, site: Dict, templates: Dict[str, CompiledTemplate], url: str) -> Tuple[str, Dict]:
+    title = item_text(data.get('title')) or item_text(data.get('keyword'))
+    published = item_text(data.get('created_at'))[:10]
+    canonical = site['base_url'] + url
+    jsonld = {
+        '@context': 'https://schema.org', '@type': 'BlogPosting',
+        'headline': title, 'description': data.get('meta_description', ''),
+        'keywords': data.get('keyword', ''), 'wordCount': data.get('word_count'),
+        'datePublished': published or None, 'url': canonical, 'mainEntityOfPage': canonical,
+        'inLanguage': data.get('locale'),
+        'author': {'@type': 'Organization', 'name': site['name']},
+        'publisher': {'@type': 'Organization', 'name': site['name'], 'url': site['base_url'] or None},
+    }
+    try:
+        label = datetime.fromisoformat(published).strftime('%B %d, %Y') if published else ''
+    except ValueError:
+        # Hand-edited or foreign created_at: show it as given
+        label = published
+    content = templates['blog'].render({
+        'title': _attr(title),
+        'body': f"<h1>{_attr(title)}</h1>" + markdown_to_html(_strip_title(item_text(data.get('content')))),
+        'keyword': _attr(data.get('keyword')),
+        'published': _attr(published),
+        'published_label': _attr(label),
+    })
+    return content, {'title': title, 'description': data.get('meta_description', ''), 'og_type': 'article',
+                     'jsonld': {k: v for k, v in jsonld.items() if v is not None}, 'canonical': canonical}
+
+
+def render_landing(data: Dict, site: Dict, templates: Dict[str, CompiledTemplate], url: str) -> Tuple[str, Dict]:
+    title = item_text(data.get('title'))
+    canonical = site['base_url'] + url
+    jsonld = {
+        '@context': 'https://schema.org', '@type': 'WebPage',
+        'name': title, 'description': data.get('meta_description', ''), 'url': canonical,
+        'inLanguage': data.get('locale'),
+        'publisher': {'@type': 'Organization', 'name': site['name'], 'url': site['base_url'] or None},
+    }
+    content = templates['landing'].render({
+        'title': _attr(title),
+        'hero': _inline(item_text(data.get('hero_description'))),
+        # LLM-written lists sometimes hold objects ({"title": ..., "description": ...}) instead of strings
+        'features': ''.join(f"<li>{_inline(item)}</li>" for item in item_texts(data.get('features'))),
+        'use_cases': ''.join(f"<li>{_inline(item)}</li>" for item in item_texts(data.get('use_cases'))),
+        'cta': _attr(item_text(data.get('cta')) or 'Get Started'),
+        'cta_url': _attr(site['base_url'] or '/'),
+    })
+    return content, {'title': title, 'description': data.get('meta_description', ''), 'og_type': 'website',
+                     'jsonld': {k: v for k, v in jsonld.items() if v is not None}, 'canonical': canonical}
+
+
+RENDERERS = {'blog': render_blog, 'landing': render_landing}
+
+# Per-process state, set once by _init_worker (in each worker, or in-process for small builds)
+_WORKER: Dict = {}
+
+
+def _init_worker(templates: Dict[str, str], site: Dict, template_dir: str):
+    _WORKER['site'] = site
+    _WORKER['templates'] = {
+        name: CompiledTemplate(text, TEMPLATE_FIELDS[name], str(Path(template_dir or '.') / f"{name}.html"))
+        for name, text in templates.items()
+    }
+
+
+def localized(data: Dict, locale: Optional[str]) -> Dict:
+    """A page's JSON as seen by one of its locale variants (None for the page itself)"""
+    if locale is None:
+        return data
+    return {**data, **data['locales'][locale], 'locale': locale, 'base_locale': data.get('locale')}
+
+
+def _alternates(data: Dict, site: Dict, base_url: str) -> str:
+    """hreflang links to every locale of a page, the base locale doubling as x-default"""
+    if not data.get('locales'):
+        return ''
+    base = data.get('base_locale') or data.get('locale')
+    hrefs = [(base, base_url)] + [(code, locale_url(code, base_url)) for code in data['locales']]
+    hrefs.append(('x-default', base_url))
+    return ''.join(f'<link rel="alternate" hreflang="{_attr(code)}" href="{_attr(site["base_url"] + href)}">'
+                   for code, href in hrefs)
+
+
+def render_page(kind: str, data: Dict, url: str, locale: str = None) -> str:
+    """Full minified HTML for one page, or with ``locale`` one of its variants (after _init_worker)
+
+    ``url`` is the page's own URL; a variant's is ``locale_url(locale, url)``.
+    """
+    site, templates = _WORKER['site'], _WORKER['templates']
+    page = localized(data, locale)
+    content, head = RENDERERS[kind](page, site, templates, locale_url(locale, url) if locale else url)
+    return templates['layout'].render({
+        'title': _attr(head['title']),
+        'description': _attr(head['description']),
+        'canonical': _attr(head['canonical']),
+        'lang': _attr(page.get('locale') or 'en'),
+        'alternates': _alternates(page, site, url),
+        'og_type': head['og_type'],
+        'jsonld': _jsonld(head['jsonld']),
+        'site_name': _attr(site['name']),
+        'content': content,
+        'year': site['year'],
+    })
+
+
+def _build_page(job: Tuple[str, str, str, str, Optional[str], Optional[str]]) -> Tuple[str, str, bool, str]:
+    """Render one page unless its source is byte-identical to the last build
+
+    Returns (url, source hash, rendered, error); a source that cannot be read or
+    rendered gives an error message instead of failing the whole build. The
+    job's URL is the page's own; a locale variant's job also names its locale.
+    """
+    url, kind, source, output, previous_hash, locale = job
+    try:
+        raw = Path(source).read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()[:16]
+        if digest == previous_hash and Path(output).exists():
+            return url, digest, False, ''
+
+        base_url = url[len(locale_url(locale, '')):] if locale else url
+        page = render_page(kind, json.loads(raw), base_url, locale)
+    except Exception as e:
+        return url, '', False, f"{Path(source).name}: {type(e).__name__}: {e}"
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(page, encoding='utf-8')
+    os.replace(tmp, path)
+    return url, digest, True, ''
+
+
+# --- Build --------------------------------------------------------------------
+
+def _page_urls(kind: str, path: Path) -> Tuple[str, List[str]]:
+    """(URL, variant locale codes) of a page file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    locales = sorted(data.get('locales') or {})
+    if kind == 'landing':
+        return f"/templates/{path.stem[len('landing_'):]}", locales
+    # Posts saved before the 'url' field existed get the URL link_index gives them
+    return data.get('url') or blog_url(data.get('keyword') or path.stem[len('blog_'):]), locales
+
+
+def collect_sources(content_directory: str,
+                    known: Dict[str, List] = None) -> Tuple[Dict[str, Tuple[str, Path, Optional[str]]], Dict]:
+    """(URL -> (kind, source file, locale), source file -> [mtime_ns, size, URL, variant locales])
+
+    Locale variants get their own URLs, with the locale they render. ``known`` is
+    the second value from the previous build, so only new or changed files are
+    opened to read their URLs. When a keyword was regenerated on a later day,
+    the newest file (``blog_<keyword>_<YYYYMMDD>.json`` sorts by date) wins.
+    A file that cannot be parsed keeps its previous URLs (its render then fails
+    and is reported), or is skipped with a warning if it was never built.
+    """
+    known = known or {}
+    sources: Dict[str, Tuple[str, Path, Optional[str]]] = {}
+    files: Dict[str, List] = {}
+    for kind in ('blog', 'landing'):
+        for path in sorted(Path(content_directory).glob(f"{kind}_*.json")):
+            stat = path.stat()
+            cached = known.get(str(path))
+            # Manifests from before locale variants have no locale list
+            if cached and len(cached) == 4 and cached[:2] == [stat.st_mtime_ns, stat.st_size]:
+                url, locales = cached[2:]
+            else:
+                try:
+                    url, locales = _page_urls(kind, path)
+                except (OSError, ValueError, TypeError, AttributeError) as e:
+                    if not cached or len(cached) != 4:
+                        print(f"⚠️ Site: skipping {path.name} ({type(e).__name__}: {e})")
+                        continue
+                    url, locales = cached[2:]
+            files[str(path)] = [stat.st_mtime_ns, stat.st_size, url, locales]
+            sources[url] = (kind, path, None)
+            for code in locales:
+                sources[locale_url(code, url)] = (kind, path, code)
+    return sources, files
+
+
+def _load_manifest(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        # Unreadable manifest: rebuild everything once
+        return {}
+
+
+def build_site(config, full: bool = False, workers: int = None) -> Dict:
+    """Render changed pages to ``output.site_directory``; returns page counts, workers used and timing"""
+    started = datetime.now()
+    site_dir = Path(config.output.site_directory)
+    manifest_path = site_dir / MANIFEST_FILE
+    manifest = {} if full else _load_manifest(manifest_path)
+    previous = manifest.get('pages', {})
+
+    templates = load_templates(config.output.site_templates)
+    site = {'name': config.business_info.name, 'base_url': (config.business_info.website or '').rstrip('/'),
+            'year': str(started.year)}
+    hashes = template_hashes(templates, site)
+
+    pages, jobs = {}, []
+    counts = {'rendered': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+    sources, files = collect_sources(config.output.content_directory, manifest.get('files'))
+    for url, (kind, source, locale) in sources.items():
+        mtime_ns, size = files[str(source)][:2]
+        entry = {'kind': kind, 'source': str(source), 'mtime_ns': mtime_ns, 'size': size, 'locale': locale,
+                 'template': hashes[kind], 'output': str(site_dir / url.strip('/') / 'index.html')}
+        old = previous.get(url, {})
+        same_template = old.get('template') == entry['template'] and old.get('source') == entry['source']
+        if same_template and (old.get('mtime_ns'), old.get('size')) == (mtime_ns, size) \
+                and Path(entry['output']).exists():
+            entry['hash'] = old['hash']
+            counts['unchanged'] += 1
+        else:
+            # Touched but identical sources are hashed in the worker and skipped there
+            jobs.append((url, kind, str(source), entry['output'], old.get('hash') if same_template else None, locale))
+        pages[url] = entry
+
+    # Pages whose source JSON is gone
+    for url in set(previous) - set(pages):
+        output = Path(previous[url].get('output', ''))
+        if output.is_file():
+            output.unlink()
+            try:
+                output.parent.rmdir()
+            except OSError:
+                pass
+        counts['removed'] += 1
+
+    # Compiled here too, so a bad template fails before any worker starts
+    _init_worker(templates, site, config.output.site_templates)
+    workers = workers or os.cpu_count() or 1
+    if len(jobs) < MIN_PARALLEL_PAGES or workers == 1:
+        workers = 1
+        results = [_build_page(job) for job in jobs]
+    else:
+        # Templates compile once per worker; pages go out in chunks to keep IPC small.
+        # Spawned, not forked: the job runner calls this from a thread
+        chunk = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+                                 initargs=(templates, site, config.output.site_templates)) as pool:
+            results = list(pool.map(_build_page, jobs, chunksize=chunk))
+
+    for url, digest, rendered, error in results:
+        if error:
+            # The last good render (if any) stays up and is retried on the next build
+            print(f"⚠️ Site: could not render {url} ({error})")
+            counts['failed'] += 1
+            if url in previous:
+                pages[url] = previous[url]
+            else:
+                del pages[url]
+            continue
+        pages[url]['hash'] = digest
+        counts['rendered' if rendered else 'unchanged'] += 1
+
+    site_dir.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(f"{MANIFEST_FILE}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'renderer': RENDERER_VERSION, 'built_at': started.isoformat(),
+                   'pages': pages, 'files': files}, f)
+    os.replace(tmp, manifest_path)
+
+    return {**counts, 'pages': len(pages), 'site_directory': str(site_dir),
+            'workers': workers,
+            'seconds': round((datetime.now() - started).total_seconds(), 3)}
@@ -0,0 +1,227 @@
+"""
+Template Catalog
+Streams template records from JSON/JSON Lines/CSV/SQLite exports into one shared, indexed catalog
+"""
+
+import csv
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+# Used when no catalog export is configured or found
+DEFAULT_TEMPLATES = [
+    {'id': 'romantic-birthday', 'name': 'Romantic Birthday Page', 'type': 'birthday',
+     'description': 'Perfect birthday surprise for your loved one', 'style': 'romantic'},
+    {'id': 'anniversary-love', 'name': 'Anniversary Love Story', 'type': 'anniversary',
+     'description': 'Celebrate your journey together', 'style': 'elegant'},
+    {'id': 'valentine-special', 'name': "Valentine's Day Special", 'type': 'valentine',
+     'description': "Express your love this Valentine's Day", 'style': 'romantic'},
+    {'id': 'proposal-page', 'name': 'Proposal Page', 'type': 'proposal',
+     'description': 'Pop the question in style', 'style': 'elegant'},
+    {'id': 'love-letter-digital', 'name': 'Love Letter Digital', 'type': 'romantic',
+     'description': 'Modern love letters for modern couples', 'style': 'modern'},
+    {'id': 'memory-timeline', 'name': 'Memory Timeline', 'type': 'anniversary',
+     'description': 'Showcase your beautiful memories', 'style': 'elegant'},
+    {'id': 'long-distance-love', 'name': 'Long Distance Love', 'type': 'romantic',
+     'description': 'Bridge the distance with love', 'style': 'romantic'},
+    {'id': 'wedding-invitation', 'name': 'Wedding Invitation', 'type': 'wedding',
+     'description': 'Stunning digital wedding invites', 'style': 'elegant'}
+]
+
+_READ_SIZE = 64 * 1024
+
+
+def slugify(name: str) -> str:
+    """Turn a template name into an id ('Proposal Page' -> 'proposal-page')"""
+    slug = ''.join(c if c.isalnum() else '-' for c in name.lower())
+    return '-'.join(part for part in slug.split('-') if part)
+
+
+def normalize_template(record: Dict) -> Dict:
+    """Fill defaults so every record has id, name, type, style and description (as strings)"""
+    name = str(record.get('name') or record.get('id') or '').strip()
+    return {
+        **record,
+        'id': str(record.get('id') or slugify(name)).strip(),
+        'name': name,
+        'type': str(record.get('type') or 'romantic').strip().lower(),
+        'style': str(record.get('style') or 'romantic').strip().lower(),
+        'description': str(record.get('description') or '').strip()
+    }
+
+
+def _iter_json_array(f) -> Iterator[Dict]:
+    """Incrementally decode the objects of a top-level JSON array"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace, the opening bracket and separators
+        buffer = buffer.lstrip()
+        if not started and buffer.startswith('['):
+            buffer = buffer[1:].lstrip()
+            started = True
+        if buffer.startswith(','):
+            buffer = buffer[1:].lstrip()
+        if buffer.startswith(']'):
+            return
+
+        if buffer:
+            try:
+                obj, end = decoder.raw_decode(buffer)
+                yield obj
+                buffer = buffer[end:]
+                continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+
+        if eof:
+            return
+        chunk = f.read(_READ_SIZE)
+        if not chunk:
+            eof = True
+        buffer += chunk
+
+
+def iter_template_records(path: str, table: str = 'templates') -> Iterator[Dict]:
+    """Stream raw template records from a catalog export, one at a time"""
+    suffix = Path(path).suffix.lower()
+
+    if suffix in ('.jsonl', '.ndjson'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    elif suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from _iter_json_array(f)
+
+    elif suffix == '.csv':
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+
+    elif suffix in ('.db', '.sqlite', '.sqlite3'):
+        import sqlite3
+
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            # Iterating the cursor fetches rows lazily
+            for row in conn.execute(f'SELECT * FROM "{table}"'):
+                yield dict(row)
+        finally:
+            conn.close()
+
+    else:
+        raise ValueError(f"Unsupported template catalog format: {path}")
+
+
+class TemplateCatalog:
+    """In-memory template catalog indexed by id, type and style"""
+
+    def __init__(self, templates: Optional[Iterator[Dict]] = None, source: str = None):
+        self.source = source
+        self._templates: List[Dict] = []
+        self._by_id: Dict[str, int] = {}
+        self._by_type: Dict[str, List[int]] = defaultdict(list)
+        self._by_style: Dict[str, List[int]] = defaultdict(list)
+
+        for record in templates or []:
+            self.add(record)
+
+    @classmethod
+    def from_file(cls, path: str, table: str = 'templates') -> 'TemplateCatalog':
+        """Build a catalog by streaming a JSON/JSON Lines/CSV/SQLite export"""
+        return cls(iter_template_records(path, table), source=str(path))
+
+    def add(self, record: Dict):
+        """Add or replace a template"""
+        template = normalize_template(record)
+        if not template['name']:
+            return
+
+        index = self._by_id.get(template['id'])
+        if index is not None:
+            # Later records win, indexes keep pointing at the same slot
+            existing = self._templates[index]
+            self._by_type[existing['type']].remove(index)
+            self._by_style[existing['style']].remove(index)
+            self._templates[index] = template
+        else:
+            index = len(self._templates)
+            self._templates.append(template)
+            self._by_id[template['id']] = index
+
+        self._by_type[template['type']].append(index)
+        self._by_style[template['style']].append(index)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._templates)
+
+    def get(self, template_id: str) -> Optional[Dict]:
+        """Look up a template by id"""
+        index = self._by_id.get(template_id)
+        return self._templates[index] if index is not None else None
+
+    def types(self) -> List[str]:
+        """Template types present in the catalog"""
+        return sorted(t for t, indexes in self._by_type.items() if indexes)
+
+    def styles(self) -> List[str]:
+        """Template styles present in the catalog"""
+        return sorted(s for s, indexes in self._by_style.items() if indexes)
+
+    def filter(self, template_type: str = None, style: str = None) -> List[Dict]:
+        """Templates matching a type and/or style, in catalog order"""
+        if template_type is None and style is None:
+            return list(self._templates)
+
+        candidates = None
+        if template_type is not None:
+            candidates = set(self._by_type.get(template_type.lower(), []))
+        if style is not None:
+            by_style = set(self._by_style.get(style.lower(), []))
+            candidates = by_style if candidates is None else candidates & by_style
+
+        return [self._templates[i] for i in sorted(candidates)]
+
+    def chunks(self, size: int = 50, template_type: str = None, style: str = None) -> Iterator[List[Dict]]:
+        """Yield templates in fixed-size chunks so callers can process and flush incrementally"""
+        templates = self.filter(template_type, style)
+        for start in range(0, len(templates), size):
+            yield templates[start:start + size]
+
+
+_shared_catalogs: Dict[tuple, TemplateCatalog] = {}
+
+
+def get_catalog(config) -> TemplateCatalog:
+    """Return the process-wide catalog for a config, loading it once per file version"""
+    path = config.templates.catalog_path
+    table = config.templates.sqlite_table
+
+    if not path or not os.path.exists(path):
+        if path:
+            print(f"⚠️ Template catalog not found at {path}, using built-in templates")
+        key = ('<default>',)
+        if key not in _shared_catalogs:
+            _shared_catalogs[key] = TemplateCatalog(DEFAULT_TEMPLATES, source='<default>')
+        return _shared_catalogs[key]
+
+    resolved = os.path.abspath(path)
+    key = (resolved, os.stat(resolved).st_mtime_ns, table)
+    if key not in _shared_catalogs:
+        catalog = TemplateCatalog.from_file(resolved, table)
+        _shared_catalogs[key] = catalog
+        print(f"✓ Loaded {len(catalog)} templates from {path}")
+    return _shared_catalogs[key]
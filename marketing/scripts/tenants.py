@@ -0,0 +1,235 @@
+"""
+Multi-Brand (Tenant) Mode
+Runs many brand configs in one process, sharing LLM clients, rate limits, fonts and render caches
+
+Tenants file (JSON or YAML):
+
+    base_config: config.json
+    shared:
+      cache_directory: ./.cache
+      requests_per_minute: 50
+    brands:
+      heartful:
+        business_info: {name: Heartful Pages}
+      lovenotes:
+        business_info: {name: Love Notes, website: https://lovenotes.example}
+
+Each brand's config is the base config deep-merged with its overrides, and
+every output directory is namespaced by brand id (``./reports/heartful``).
+Brands that resolve to the same API key and ``llm`` settings share one client
+and one rate limiter; fonts, pin backgrounds and template previews are shared
+by every brand.
+"""
+
+import copy
+import json
+import os
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from lazy_imports import require
+from settings import MarketingConfig, OutputSettings, load_config, read_config_dict, resolve_config_path
+
+
+def deep_merge(base: Dict, overrides: Dict) -> Dict:
+    """Recursively merge overrides into a copy of base (lists are replaced, not merged)"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def namespace_output(config: Dict, brand_id: str) -> Dict:
+    """Point every output directory, including defaulted ones, at a per-brand subdirectory"""
+    output = {**asdict(OutputSettings()), **config.get('output', {})}
+    config['output'] = {key: str(Path(path) / brand_id) for key, path in output.items()}
+    return config
+
+
+def _read_mapping(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        if str(path).lower().endswith(('.yaml', '.yml')):
+            return require('yaml').safe_load(f) or {}
+        return json.load(f)
+
+
+class SharedResources:
+    """Process-wide resources handed to every automator, whichever brand it serves"""
+
+    def __init__(self, cache_directory: str = "./.cache", requests_per_minute: Optional[float] = None):
+        self.cache_directory = Path(cache_directory)
+        self.requests_per_minute = requests_per_minute
+
+        self._clients: Dict[Tuple, object] = {}
+        self._limiters: Dict[Tuple, object] = {}
+        self._renderers: Dict[Tuple[Tuple[int, int], str], object] = {}
+        self._preview_cache = None
+        self._lock = threading.Lock()
+
+    # llm settings that change what the client itself does (routing and limits do not)
+    _CLIENT_FIELDS = ('mode', 'cassette_path', 'latency', 'latency_scale', 'latency_jitter',
+                      'error_rate', 'replay_miss', 'seed')
+
+    @classmethod
+    def _client_key(cls, config: MarketingConfig) -> Tuple:
+        failover = json.dumps(asdict(config.llm.failover), sort_keys=True)
+        return (config.anthropic_api_key, config.openai_api_key, failover,
+                *(getattr(config.llm, name) for name in cls._CLIENT_FIELDS))
+
+    def llm_client(self, config: MarketingConfig, factory: Callable[[], object]):
+        """One client per (API key, llm settings), rate limited if a limit is configured"""
+        key = self._client_key(config)
+        with self._lock:
+            if key in self._clients:
+                return self._clients[key]
+
+            client = factory()
+            rpm = config.llm.requests_per_minute or self.requests_per_minute
+            if client is not None and rpm:
+                from llm_clients import RateLimitedClient, RateLimiter
+                self._limiters[key] = RateLimiter(rpm)
+                client = RateLimitedClient(client, self._limiters[key])
+            self._clients[key] = client
+            return client
+
+    def pin_renderer(self, pin_size: Tuple[int, int], brand_name: str):
+        """Pin renderer per (size, brand name); backgrounds are shared across all of them"""
+        key = (tuple(pin_size), brand_name)
+        with self._lock:
+            renderer = self._renderers.get(key)
+            if renderer is None:
+                renderer = require('pin_renderer').PinRenderer(pin_size, brand_name)
+                self._renderers[key] = renderer
+            return renderer
+
+    @property
+    def preview_cache(self):
+        """Template preview cache shared by every brand (previews are keyed by source file)"""
+        with self._lock:
+            if self._preview_cache is None:
+                PreviewCache = require('pin_renderer').PreviewCache
+                self._preview_cache = PreviewCache(self.cache_directory / 'previews')
+            return self._preview_cache
+
+    def stats(self) -> Dict:
+        """Counts of shared objects and time spent waiting on rate limits"""
+        return {
+            'llm_clients': len(self._clients),
+            'pin_renderers': len(self._renderers),
+            'rate_limit_wait_seconds': round(sum(limiter.waited for limiter in self._limiters.values()), 3)
+        }
+
+
+class TenantRegistry:
+    """Brand configs loaded from a tenants file, plus the resources they share"""
+
+    def __init__(self, brands: Dict[str, MarketingConfig], shared: SharedResources = None):
+        self.brands = brands
+        self.shared = shared or SharedResources()
+
+    def __contains__(self, brand_id: str) -> bool:
+        return brand_id in self.brands
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self.brands)
+
+    def config(self, brand_id: str) -> MarketingConfig:
+        if brand_id not in self.brands:
+            raise KeyError(f"Unknown brand '{brand_id}' (expected one of {', '.join(self.brands)})")
+        return self.brands[brand_id]
+
+    @classmethod
+    def from_file(cls, path: str) -> 'TenantRegistry':
+        """Load a tenants file and validate every brand's merged config up front
+
+        base_config is resolved relative to the tenants file.
+        """
+        spec = _read_mapping(path)
+        if not isinstance(spec.get('brands'), dict) or not spec['brands']:
+            raise ValueError(f"Tenants file {path} must define a non-empty 'brands' mapping")
+
+        base_path = spec.get('base_config', 'config.json')
+        if not os.path.isabs(base_path):
+            base_path = str(Path(path).parent / base_path)
+        base = read_config_dict(resolve_config_path(base_path))
+
+        brands = {
+            str(brand_id): MarketingConfig.from_dict(
+                namespace_output(deep_merge(base, overrides or {}), str(brand_id)),
+                source=f"{path} (brand '{brand_id}')"
+            )
+            for brand_id, overrides in spec['brands'].items()
+        }
+        shared = spec.get('shared', {})
+        return cls(brands, SharedResources(
+            cache_directory=shared.get('cache_directory', './.cache'),
+            requests_per_minute=shared.get('requests_per_minute')
+        ))
+
+
+class AutomatorPool:
+    """One warmed automator per (kind, config path or brand id), all sharing one SharedResources"""
+
+    def __init__(self, tenants: TenantRegistry = None, shared: SharedResources = None):
+        self.tenants = tenants
+        self.shared = shared or (tenants.shared if tenants else SharedResources())
+        self._instances: Dict[Tuple[str, str], object] = {}
+        self._lock = threading.Lock()
+
+    def use_tenants(self, tenants: TenantRegistry):
+        """Serve brand ids from a tenants registry, keeping the already warm shared resources
+
+        The registry's shared settings apply to clients and caches created from now on.
+        """
+        self.shared.cache_directory = tenants.shared.cache_directory
+        self.shared.requests_per_minute = tenants.shared.requests_per_minute
+        tenants.shared = self.shared
+        self.tenants = tenants
+
+    def invalidate(self, config: str = None):
+        """Drop cached automators for one config path or brand id (or all), so they are rebuilt"""
+        with self._lock:
+            for key in list(self._instances):
+                if config is None or key[1] == config:
+                    del self._instances[key]
+
+    def reload_tenants(self, tenants: TenantRegistry):
+        """Swap in a reloaded tenants registry; brand automators are rebuilt on next use"""
+        self.use_tenants(tenants)
+        self.invalidate()
+
+    def config(self, config: str) -> MarketingConfig:
+        """The validated config for a brand id or config path"""
+        if self.tenants and config in self.tenants:
+            return self.tenants.config(config)
+        return load_config(config)
+
+    def get(self, kind: str, config: str):
+        key = (kind, config)
+        with self._lock:
+            instance = self._instances.get(key)
+            if instance is None:
+                instance = self._create(kind, config)
+                self._instances[key] = instance
+            return instance
+
+    def _create(self, kind: str, config: str):
+        brand_config = self.tenants.config(config) if self.tenants and config in self.tenants else None
+        kwargs = {'config': brand_config, 'shared': self.shared}
+
+        if kind == 'content':
+            from content_generator import ContentGenerator
+            return ContentGenerator(config, **kwargs)
+        if kind == 'pinterest':
+            from pinterest_automator import PinterestAutomator
+            return PinterestAutomator(config, **kwargs)
+        if kind == 'seo':
+            from seo_automator import SEOAutomator
+            return SEOAutomator(config, **kwargs)
+        raise ValueError(f"Unknown automator kind: {kind}")
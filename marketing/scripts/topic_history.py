@@ -0,0 +1,173 @@
+"""
+Topic History and Near-Duplicate Detection
+Remembers recently posted topics and rejects new ones that are too similar
+
+Topics are normalized, split into character shingles and summarized with
+MinHash; an LSH band index finds candidate matches without comparing every
+pair. History is an append-only JSONL file per brand, and only entries within
+``window_days`` of the batch date are indexed.
+"""
+
+import hashlib
+import json
+import re
+import struct
+import threading
+from datetime import date as date_type, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SHINGLE_SIZE = 4
+NUM_PERM = 96
+# 32 bands x 3 rows: a pair at 0.5 similarity shares a band ~98.6% of the time,
+# while unrelated topics (~0.2) rarely become candidates
+BANDS = 32
+DEFAULT_THRESHOLD = 0.5
+
+_MAX_HASH = (1 << 32) - 1
+_unpack_hashes = struct.Struct(f'<{NUM_PERM}I').unpack
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'for', 'from', 'how', 'in', 'is', 'it',
+    'of', 'on', 'or', 'our', 'that', 'the', 'their', 'them', 'this', 'to', 'with', 'your', 'you'
+}
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase, drop punctuation and stopwords, collapse whitespace"""
+    words = re.sub(r"[^\w\s]", ' ', topic.lower()).split()
+    return ' '.join(word for word in words if word not in _STOPWORDS)
+
+
+def shingles(topic: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Character shingles of the normalized topic plus its words, so reordering still matches"""
+    text = normalize_topic(topic)
+    if not text:
+        return set()
+    grams = {text[i:i + size] for i in range(len(text) - size + 1)} or {text}
+    return grams | {f"#{word}" for word in text.split()}
+
+
+def minhash(shingle_set: Iterable[str]) -> Tuple[int, ...]:
+    """MinHash signature (NUM_PERM values) of a shingle set
+
+    One SHAKE-128 digest per shingle supplies NUM_PERM independent 32-bit hashes,
+    which is several times faster in CPython than NUM_PERM modular permutations.
+    """
+    rows = [_unpack_hashes(hashlib.shake_128(shingle.encode('utf-8')).digest(NUM_PERM * 4))
+            for shingle in shingle_set]
+    if not rows:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(map(min, zip(*rows)))
+
+
+def estimated_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity from two MinHash signatures"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def _parse_date(value) -> date_type:
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+class TopicHistory:
+    """Persistent, windowed index of posted topics with LSH near-duplicate lookup
+
+    ``accept`` reserves a topic for the current run (so later topics in the same
+    batch are checked against it); ``commit`` appends reserved topics to disk once
+    the content using them has actually been saved.
+    """
+
+    def __init__(self, path: str, window_days: int = 30, threshold: float = DEFAULT_THRESHOLD):
+        self.path = Path(path)
+        self.window_days = window_days
+        self.threshold = threshold
+
+        self._topics: List[str] = []
+        self._signatures: List[Tuple[int, ...]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        self._pending: List[Dict] = []
+        self._loaded_for: Optional[date_type] = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def _index(self, topic: str, signature: Tuple[int, ...]):
+        position = len(self._topics)
+        self._topics.append(topic)
+        self._signatures.append(signature)
+        rows = NUM_PERM // BANDS
+        for band in range(BANDS):
+            key = (band, signature[band * rows:(band + 1) * rows])
+            self._buckets.setdefault(key, []).append(position)
+
+    def load(self, around: date_type = None):
+        """(Re)build the index from history entries within window_days of ``around``"""
+        around = _parse_date(around or datetime.now().date())
+        with self._lock:
+            if self._loaded_for == around:
+                return
+            self._topics, self._signatures, self._buckets = [], [], {}
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        entry = json.loads(line)
+                        if abs((_parse_date(entry['date']) - around).days) <= self.window_days:
+                            self._index(entry['topic'], minhash(shingles(entry['topic'])))
+            for entry in self._pending:
+                self._index(entry['topic'], minhash(shingles(entry['topic'])))
+            self._loaded_for = around
+
+    def find_duplicate(self, topic: str) -> Optional[str]:
+        """The indexed topic this one nearly duplicates, or None"""
+        with self._lock:
+            return self._find_duplicate(minhash(shingles(topic)))
+
+    def _find_duplicate(self, signature: Tuple[int, ...]) -> Optional[str]:
+        rows = NUM_PERM // BANDS
+        candidates = set()
+        for band in range(BANDS):
+            candidates.update(self._buckets.get((band, signature[band * rows:(band + 1) * rows]), ()))
+
+        best, best_similarity = None, 0.0
+        for position in candidates:
+            similarity = estimated_similarity(signature, self._signatures[position])
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = self._topics[position], similarity
+        return best
+
+    def accept(self, topic: str, on_date=None) -> bool:
+        """Reserve topic if it is not a near-duplicate; returns whether it was accepted"""
+        on_date = _parse_date(on_date or datetime.now().date())
+        signature = minhash(shingles(topic))
+        with self._lock:
+            if not normalize_topic(topic) or self._find_duplicate(signature):
+                self.rejected += 1
+                return False
+            self._index(topic, signature)
+            self._pending.append({'date': on_date.isoformat(), 'topic': topic})
+            return True
+
+    def recent(self, limit: int = 20) -> List[str]:
+        """Most recently indexed topics, newest first (for steering the LLM away from them)"""
+        with self._lock:
+            return self._topics[-limit:][::-1]
+
+    def commit(self, topics: Iterable[str] = None) -> int:
+        """Append reserved topics (all, or only those listed) to the history file"""
+        with self._lock:
+            keep = set(topics) if topics is not None else None
+            entries = [entry for entry in self._pending if keep is None or entry['topic'] in keep]
+            self._pending = [entry for entry in self._pending if keep is not None and entry['topic'] not in keep]
+            if entries:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            return len(entries)